@@ -50,6 +50,7 @@ def _search_duplicate_compilers(error_cls):
 
 import llnl.util.lang
 
+import spack.builder
 import spack.config
 import spack.patch
 import spack.repo
@@ -9,20 +9,23 @@
 import io
 import itertools
 import json
+import multiprocessing.pool
 import os
 import pathlib
+import pickle
 import re
 import shutil
 import sys
 import tarfile
 import tempfile
 import time
+import traceback
 import urllib.error
 import urllib.parse
 import urllib.request
 import warnings
 from contextlib import closing
-from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 from urllib.error import HTTPError, URLError
 
 import llnl.util.filesystem as fsys
@@ -49,6 +52,7 @@
 import spack.store
 import spack.traverse as traverse
 import spack.util.archive
+import spack.util.cpus
 import spack.util.crypto
 import spack.util.file_cache as file_cache
 import spack.util.gpg
@@ -60,7 +64,7 @@
 import spack.util.web as web_util
 from spack.caches import misc_cache_location
 from spack.package_prefs import get_package_dir_permissions, get_package_group
-from spack.relocate_text import utf8_paths_to_single_binary_regex
+from spack.relocate_text import find_prefix_offsets, utf8_paths_to_single_binary_regex
 from spack.spec import Spec
 from spack.stage import Stage
 from spack.util.executable import which
@@ -566,6 +570,46 @@ def read_buildinfo_file(prefix):
         return syaml.load(f)
 
 
+#: Version of the format of the file storing the offsets of prefixes in binaries
+_RELOCATION_OFFSETS_VERSION = 1
+
+
+def relocation_offsets_file_name(prefix):
+    """Filename of the offsets of the old prefixes in the binaries of a package"""
+    return os.path.join(prefix, ".spack", "binary_distribution_offsets.json")
+
+
+def _dump_relocation_offsets(offsets: Dict[str, List[int]]) -> bytes:
+    """Serialize the offsets of prefixes in binaries. The offsets of each binary are
+    sorted, so they are stored as differences between consecutive offsets, which keeps
+    them short. Offsets are not part of the buildinfo file, since they can be many and
+    YAML is slow to parse.
+    """
+    deltas = {
+        path: [offset - previous for previous, offset in zip([0] + values, values)]
+        for path, values in offsets.items()
+    }
+    data = {"version": _RELOCATION_OFFSETS_VERSION, "offsets": deltas}
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def read_relocation_offsets(prefix) -> Optional[Dict[str, List[int]]]:
+    """Read the offsets of the old prefixes in the binaries of a package, or return None
+    if they were not recorded, or can't be read.
+    """
+    try:
+        with open(relocation_offsets_file_name(prefix), "rb") as f:
+            data = json.load(f)
+        if data["version"] != _RELOCATION_OFFSETS_VERSION:
+            return None
+        return {path: list(itertools.accumulate(d)) for path, d in data["offsets"].items()}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        tty.debug(f"Cannot read the offsets of prefixes in binaries: {e}")
+        return None
+
+
 class BuildManifestVisitor(BaseDirectoryVisitor):
     """Visitor that collects a list of files and symlinks
     that can be checked for need of relocation. It knows how
@@ -705,6 +749,18 @@ def hashes_to_prefixes(spec):
 def get_buildinfo_dict(spec):
     """Create metadata for a tarball"""
     manifest = get_buildfile_manifest(spec)
+    hash_to_prefix = hashes_to_prefixes(spec)
+
+    # Offsets of the prefixes in binaries, so that they can be patched without being
+    # searched at install time
+    prefixes = [p.encode("utf-8") for p in hash_to_prefix.values()]
+    prefixes.append(str(spack.store.STORE.layout.root).encode("utf-8"))
+    binary_offsets = {
+        rel_path: find_prefix_offsets(abs_path, prefixes)
+        for rel_path, abs_path in zip(
+            manifest["binary_to_relocate"], manifest["binary_to_relocate_fullpath"]
+        )
+    }
 
     return {
         "sbang_install_path": spack.hooks.sbang.sbang_install_path(),
@@ -713,9 +769,10 @@ def get_buildinfo_dict(spec):
         "relative_prefix": os.path.relpath(spec.prefix, spack.store.STORE.layout.root),
         "relocate_textfiles": manifest["text_to_relocate"],
         "relocate_binaries": manifest["binary_to_relocate"],
+        "relocate_binaries_offsets": binary_offsets,
         "relocate_links": manifest["link_to_relocate"],
         "hardlinks_deduped": manifest["hardlinks_deduped"],
-        "hash_to_prefix": hashes_to_prefixes(spec),
+        "hash_to_prefix": hash_to_prefix,
     }
 
 
@@ -776,7 +833,40 @@ def sign_specfile(key, force, specfile_path):
     spack.util.gpg.sign(key, specfile_path, signed_specfile_path, clearsign=True)
 
 
-def _read_specs_and_push_index(file_list, read_method, cache_prefix, db, temp_dir, concurrency):
+def _spec_hash_from_file_name(file: str) -> Optional[str]:
+    """Return the DAG hash in the name of a spec file, or None if the name has no hash"""
+    name = os.path.basename(file)
+    for ext in (".spec.json.sig", ".spec.json"):
+        if name.endswith(ext):
+            dag_hash = name[: -len(ext)].rsplit("-", 1)[-1]
+            return dag_hash if len(dag_hash) == 32 else None
+    return None
+
+
+def _read_previous_index(cache_prefix: str) -> Optional[Dict[str, Spec]]:
+    """Read the index of a build cache, and return the specs in the build cache by DAG hash,
+    or None if the index cannot be read."""
+    index_url = url_util.join(cache_prefix, "index.json")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        _, _, response = web_util.read_from_url(index_url)
+        index_path = os.path.join(tmpdir, "index.json")
+        with open(index_path, "wb") as f:
+            shutil.copyfileobj(response, f)
+
+        db = BuildCacheDatabase(tmpdir)
+        db._read_from_file(index_path)
+        return {s.dag_hash(): s for s in db.query_local(installed=any, in_buildcache=True)}
+    except Exception as e:
+        tty.debug(f"Cannot read the index at {index_url}, reading all spec files: {e}")
+        return None
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _read_specs_and_push_index(
+    file_list, read_method, cache_prefix, db, temp_dir, concurrency, previous=None
+):
     """Read all the specs listed in the provided list, using thread given thread parallelism,
         generate the index, and push it to the mirror.
 
@@ -788,8 +878,16 @@ def _read_specs_and_push_index(file_list, read_method, cache_prefix, db, temp_di
         db: A spack database used for adding specs and then writing the index.
         temp_dir (str): Location to write index.json and hash for pushing
         concurrency (int): Number of parallel processes to use when fetching
+        previous (dict): specs in the previous index, by DAG hash. Spec files of these specs
+            are not read.
     """
     for file in file_list:
+        dag_hash = _spec_hash_from_file_name(file)
+        if previous and dag_hash in previous:
+            db.add(previous[dag_hash], None)
+            db.mark(previous[dag_hash], "in_buildcache", True)
+            continue
+
         contents = read_method(file)
         # Need full spec.json name or this gets confused with index.json.
         if file.endswith(".json.sig"):
@@ -919,12 +1017,14 @@ def url_read_method(url):
     return file_list, read_fn
 
 
-def _spec_files_from_cache(cache_prefix):
+def _spec_files_from_cache(cache_prefix, sync=True):
     """Get a list of all the spec files in the mirror and a function to
     read them.
 
     Args:
         cache_prefix (str): Base url of mirror (location of spec files)
+        sync (bool): whether spec files on S3 may be downloaded all at once with the aws cli,
+            rather than read one by one
 
     Return:
         A tuple where the first item is a list of absolute file paths or
@@ -933,7 +1033,7 @@ def _spec_files_from_cache(cache_prefix):
         returning the spec read from that location.
     """
     callbacks = []
-    if cache_prefix.startswith("s3"):
+    if sync and cache_prefix.startswith("s3"):
         callbacks.append(_specs_from_cache_aws_cli)
 
     callbacks.append(_specs_from_cache_fallback)
@@ -946,21 +1046,30 @@ def _spec_files_from_cache(cache_prefix):
     raise ListMirrorSpecsError("Failed to get list of specs from {0}".format(cache_prefix))
 
 
-def generate_package_index(cache_prefix, concurrency=32):
+def generate_package_index(cache_prefix, concurrency=32, full=False):
     """Create or replace the build cache index on the given mirror.  The
     buildcache index contains an entry for each binary package under the
     cache_prefix.
 
+    Unless a full update is requested, specs already in the current index
+    are kept without reading their spec files again, so that only spec files
+    pushed since the last update are read. Specs whose spec files were
+    removed are dropped from the index in both cases.
+
     Args:
         cache_prefix(str): Base url of binary mirror.
         concurrency: (int): The desired threading concurrency to use when
             fetching the spec files from the mirror.
+        full (bool): read all spec files, instead of only the ones of specs
+            not in the current index
 
     Return:
         None
     """
+    previous = None if full else _read_previous_index(cache_prefix)
+
     try:
-        file_list, read_fn = _spec_files_from_cache(cache_prefix)
+        file_list, read_fn = _spec_files_from_cache(cache_prefix, sync=previous is None)
     except ListMirrorSpecsError as e:
         raise GenerateIndexError(f"Unable to generate package index: {e}") from e
 
@@ -973,7 +1082,9 @@ def generate_package_index(cache_prefix, concurrency=32):
     db_root_dir = db.database_directory
 
     try:
-        _read_specs_and_push_index(file_list, read_fn, cache_prefix, db, db_root_dir, concurrency)
+        _read_specs_and_push_index(
+            file_list, read_fn, cache_prefix, db, db_root_dir, concurrency, previous
+        )
     except Exception as e:
         raise GenerateIndexError(
             f"Encountered problem pushing package index to {cache_prefix}: {e}"
@@ -1042,11 +1153,14 @@ def tarfile_of_spec_prefix(tar: tarfile.TarFile, prefix: str) -> None:
         raise ValueError(f"prefix '{prefix}' must be an absolute path to a directory")
     stat_key = lambda stat: (stat.st_dev, stat.st_ino)
 
-    try:  # skip buildinfo file if it exists
-        files_to_skip = [stat_key(os.lstat(buildinfo_file_name(prefix)))]
-        skip = lambda entry: stat_key(entry.stat(follow_symlinks=False)) in files_to_skip
-    except OSError:
-        skip = lambda entry: False
+    # skip buildinfo and relocation offsets files if they exist
+    files_to_skip = []
+    for metadata_file in (buildinfo_file_name(prefix), relocation_offsets_file_name(prefix)):
+        try:
+            files_to_skip.append(stat_key(os.lstat(metadata_file)))
+        except OSError:
+            pass
+    skip = lambda entry: stat_key(entry.stat(follow_symlinks=False)) in files_to_skip
 
     spack.util.archive.reproducible_tarfile_from_prefix(
         tar,
@@ -1058,8 +1172,10 @@ def tarfile_of_spec_prefix(tar: tarfile.TarFile, prefix: str) -> None:
     )
 
 
-def _do_create_tarball(tarfile_path: str, binaries_dir: str, buildinfo: dict):
-    with spack.util.archive.gzip_compressed_tarfile(tarfile_path) as (
+def _do_create_tarball(
+    tarfile_path: str, binaries_dir: str, buildinfo: dict, jobs: Optional[int] = None
+):
+    with spack.util.archive.gzip_compressed_tarfile(tarfile_path, jobs=jobs) as (
         tar,
         inner_checksum,
         outer_checksum,
@@ -1067,15 +1183,22 @@ def _do_create_tarball(tarfile_path: str, binaries_dir: str, buildinfo: dict):
         # Tarball the install prefix
         tarfile_of_spec_prefix(tar, binaries_dir)
 
-        # Serialize buildinfo for the tarball
+        # Serialize buildinfo for the tarball, and the offsets of prefixes in binaries
+        # in a file of their own
+        buildinfo = dict(buildinfo)
+        offsets = buildinfo.pop("relocate_binaries_offsets", None)
         bstring = syaml.dump(buildinfo, default_flow_style=True).encode("utf-8")
-        tarinfo = tarfile.TarInfo(
-            name=spack.util.archive.default_path_to_name(buildinfo_file_name(binaries_dir))
-        )
-        tarinfo.type = tarfile.REGTYPE
-        tarinfo.size = len(bstring)
-        tarinfo.mode = 0o644
-        tar.addfile(tarinfo, io.BytesIO(bstring))
+        metadata = [(buildinfo_file_name(binaries_dir), bstring)]
+        if offsets is not None:
+            metadata.append(
+                (relocation_offsets_file_name(binaries_dir), _dump_relocation_offsets(offsets))
+            )
+        for path, bstring in metadata:
+            tarinfo = tarfile.TarInfo(name=spack.util.archive.default_path_to_name(path))
+            tarinfo.type = tarfile.REGTYPE
+            tarinfo.size = len(bstring)
+            tarinfo.mode = 0o644
+            tar.addfile(tarinfo, io.BytesIO(bstring))
 
     return inner_checksum.hexdigest(), outer_checksum.hexdigest()
 
@@ -1093,6 +1216,9 @@ class PushOptions(NamedTuple):
     #: What key to use for signing
     key: Optional[str] = None
 
+    #: Number of threads used to compress the tarball, defaults to the number of build jobs
+    jobs: Optional[int] = None
+
 
 def push_or_raise(spec: Spec, out_url: str, options: PushOptions):
     """
@@ -1110,6 +1236,75 @@ def push_or_raise(spec: Spec, out_url: str, options: PushOptions):
         _build_tarball_in_stage_dir(spec, out_url, stage_dir=tmpdir, options=options)
 
 
+def _push_single_spec(
+    args: Tuple[int, Spec, str, PushOptions, bool]
+) -> Tuple[int, Optional[Exception], Optional[str]]:
+    """Push a spec, and return its index, the error if any, and the formatted traceback of the
+    error if the spec was pushed in a worker process. Errors crossing a process boundary are
+    replaced by a :py:class:`PushToBuildCacheError` if they don't survive pickling."""
+    i, spec, out_url, options, in_process = args
+    try:
+        push_or_raise(spec, out_url, options)
+    except Exception as e:
+        if in_process:
+            return i, e, None
+        # Exceptions with custom constructors may fail to unpickle, or unpickle with other args
+        try:
+            restored = pickle.loads(pickle.dumps(e))
+        except Exception:
+            restored = None
+        if type(restored) is not type(e) or str(restored) != str(e):
+            return i, PushToBuildCacheError(f"{e.__class__.__name__}: {e}"), traceback.format_exc()
+        return i, e, traceback.format_exc()
+    return i, None, None
+
+
+def push_specs(
+    specs: List[Spec], out_url: str, options: PushOptions, pool
+) -> Iterator[Tuple[Spec, Optional[Exception]]]:
+    """Push many specs to a build cache concurrently.
+
+    Each worker of the pool creates, signs and uploads the tarball of one spec at a time, so
+    that these steps overlap across specs. The signing key is selected before any work starts,
+    and the public key and the index are pushed only once, after all specs.
+
+    Args:
+        specs: concrete, installed specs to push
+        out_url: URL of the build cache
+        options: push options, shared by all specs
+        pool: pool of workers, with an ``imap_unordered`` method like
+            ``multiprocessing.pool.Pool``
+
+    Yields:
+        Pairs of spec and error, in order of completion. The error is None if the spec was
+        pushed, and :py:class:`NoOverwriteException` if it was already in the build cache.
+        Errors of worker processes that cannot be pickled are reported as
+        :py:class:`PushToBuildCacheError`, with the type and message of the original error.
+    """
+    key = None if options.unsigned else select_signing_key(options.key)
+    spec_options = options._replace(key=key, regenerate_index=False)
+    in_process = not isinstance(pool, multiprocessing.pool.Pool)
+
+    pushed = False
+    for i, error, formatted_traceback in pool.imap_unordered(
+        _push_single_spec,
+        [(i, spec, out_url, spec_options, in_process) for i, spec in enumerate(specs)],
+    ):
+        if formatted_traceback is not None:
+            tty.debug(f"Failed to push {specs[i].cshort_spec}\n{formatted_traceback}")
+        pushed = pushed or error is None
+        yield specs[i], error
+
+    if not pushed:
+        return
+
+    if key is not None:
+        push_keys(out_url, keys=[key], regenerate_index=options.regenerate_index)
+
+    if options.regenerate_index:
+        generate_package_index(url_util.join(out_url, build_cache_relative_path()))
+
+
 def _build_tarball_in_stage_dir(spec: Spec, out_url: str, stage_dir: str, options: PushOptions):
     cache_prefix = build_cache_prefix(stage_dir)
     tarfile_name = tarball_name(spec, ".spack")
@@ -1155,7 +1350,12 @@ def _build_tarball_in_stage_dir(spec: Spec, out_url: str, stage_dir: str, option
     # create info for later relocation and create tar
     buildinfo = get_buildinfo_dict(spec)
 
-    checksum, _ = _do_create_tarball(tarfile_path, binaries_dir, buildinfo)
+    checksum, _ = _do_create_tarball(
+        tarfile_path,
+        binaries_dir,
+        buildinfo,
+        jobs=options.jobs or spack.util.cpus.determine_number_of_jobs(parallel=True),
+    )
 
     # add sha256 checksum to spec.json
     with open(spec_file, "r") as inputfile:
@@ -1679,6 +1879,9 @@ def is_backup_file(file):
         files_to_relocate = [
             os.path.join(workdir, filename) for filename in buildinfo.get("relocate_binaries")
         ]
+        # Offsets of the old prefixes in binaries, if they were recorded and are still
+        # valid, i.e. if binaries are modified in place only
+        binary_offsets = None
         # If the buildcache was not created with relativized rpaths
         # do the relocation of path in binaries
         platform = spack.platforms.by_name(spec.platform)
@@ -1695,7 +1898,15 @@ def is_backup_file(file):
         elif "elf" in platform.binary_formats and not rel:
             # The new ELF dynamic section relocation logic only handles absolute to
             # absolute relocation.
-            relocate.new_relocate_elf_binaries(files_to_relocate, prefix_to_prefix_bin)
+            rewritten = relocate.new_relocate_elf_binaries(files_to_relocate, prefix_to_prefix_bin)
+            recorded_offsets = read_relocation_offsets(workdir)
+            if recorded_offsets is not None:
+                binary_offsets = {
+                    os.path.join(workdir, filename): offsets
+                    for filename, offsets in recorded_offsets.items()
+                }
+                for filename in rewritten:
+                    binary_offsets.pop(filename, None)
         elif "elf" in platform.binary_formats and rel:
             relocate.relocate_elf_binaries(
                 files_to_relocate,
@@ -1716,7 +1927,9 @@ def is_backup_file(file):
         relocate.relocate_text(text_names, prefix_to_prefix_text)
 
         # relocate the install prefixes in binary files including dependencies
-        changed_files = relocate.relocate_text_bin(files_to_relocate, prefix_to_prefix_bin)
+        changed_files = relocate.relocate_text_bin(
+            files_to_relocate, prefix_to_prefix_bin, offsets=binary_offsets
+        )
 
         # Add ad-hoc signatures to patched macho files when on macOS.
         if "macho" in platform.binary_formats and sys.platform == "darwin":
@@ -1896,6 +2109,11 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
         shutil.rmtree(spec.prefix, ignore_errors=True)
         raise e
     else:
+        # Offsets of the old prefixes are not valid after relocation
+        offsets_file = relocation_offsets_file_name(spec.prefix)
+        if os.path.exists(offsets_file):
+            os.remove(offsets_file)
+
         manifest_file = os.path.join(
             spec.prefix,
             spack.store.STORE.layout.metadata_dir,
@@ -2596,6 +2814,10 @@ class NoOverwriteException(spack.error.SpackError):
 
     def __init__(self, file_path):
         super().__init__(f"Refusing to overwrite the following file: {file_path}")
+        self.file_path = file_path
+
+    def __reduce__(self):
+        return type(self), (self.file_path,)
 
 
 class NoGpgException(spack.error.SpackError):
@@ -2646,6 +2868,10 @@ def __init__(self, path, size, contents, algorithm, expected, computed):
             f"Expected {expected} but got {computed}. "
             f"File size = {size} bytes. Contents = {contents!r}",
         )
+        self._args = (path, size, contents, algorithm, expected, computed)
+
+    def __reduce__(self):
+        return type(self), self._args
 
 
 class NewLayoutException(spack.error.SpackError):
@@ -32,9 +32,11 @@
 Skimming this module is a nice way to get acquainted with the types of
 calls you can make from within the install() function.
 """
+import contextlib
 import inspect
 import io
 import multiprocessing
+import multiprocessing.connection
 import os
 import re
 import sys
@@ -43,7 +45,7 @@
 from collections import defaultdict
 from enum import Flag, auto
 from itertools import chain
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import llnl.util.tty as tty
 from llnl.string import plural
@@ -53,9 +55,6 @@
 from llnl.util.tty.color import cescape, colorize
 from llnl.util.tty.log import MultiProcessFd
 
-import spack.build_systems.cmake
-import spack.build_systems.meson
-import spack.build_systems.python
 import spack.builder
 import spack.compilers
 import spack.config
@@ -148,6 +147,61 @@ def get_effective_jobs(jobs, parallel=True, supports_jobserver=False):
     return jobs
 
 
+class Jobserver:
+    """A GNU make jobserver: a pipe holding tokens that ``make`` processes take before running
+    a job, and give back once the job is done. Since every ``make`` process has an implicit
+    token, the pipe initially holds ``jobs - 1`` tokens.
+    """
+
+    def __init__(self, jobs: int):
+        self.jobs = jobs
+        self.read_fd, self.write_fd = os.pipe()
+        # The pipe is inherited by build processes, and by the make processes they start
+        os.set_inheritable(self.read_fd, True)
+        os.set_inheritable(self.write_fd, True)
+        os.write(self.write_fd, b"+" * (jobs - 1))
+
+    @property
+    def makeflags(self) -> str:
+        """Value of ``MAKEFLAGS`` for ``make`` to use the jobserver"""
+        # GNU make >= 4.2 calls the option --jobserver-auth, but still accepts the old name
+        return f"-j --jobserver-fds={self.read_fd},{self.write_fd}"
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+@contextlib.contextmanager
+def shared_jobserver(jobs: int):
+    """Context manager that runs a jobserver with ``jobs`` job slots, shared by all the
+    builds started in the context, so that concurrent builds don't oversubscribe the
+    machine. Nothing is done if a jobserver is already available, e.g. because Spack was
+    started by ``make``, or on Windows.
+
+    As with GNU make, the first ``make`` process of each build has a job slot in addition
+    to the ones of the jobserver.
+
+    Yields the jobserver, or None if no jobserver was started.
+    """
+    if sys.platform == "win32" or jobs <= 1 or jobserver_enabled():
+        yield None
+        return
+
+    jobserver = Jobserver(jobs)
+    makeflags = os.environ.get("MAKEFLAGS")
+    os.environ["MAKEFLAGS"] = " ".join(x for x in (makeflags, jobserver.makeflags) if x)
+    tty.debug(f"Started a jobserver with {jobs} job slots: MAKEFLAGS={os.environ['MAKEFLAGS']}")
+    try:
+        yield jobserver
+    finally:
+        if makeflags is None:
+            del os.environ["MAKEFLAGS"]
+        else:
+            os.environ["MAKEFLAGS"] = makeflags
+        jobserver.close()
+
+
 class MakeExecutable(Executable):
     """Special callable executable object for make so the user can specify
     parallelism options on a per-invocation basis.  Specifying
@@ -575,6 +629,12 @@ def set_package_py_globals(pkg, context: Context = Context.BUILD):
     """Populate the Python module of a package with some useful global names.
     This makes things easier for package writers.
     """
+    # Build systems derive from the package classes, so import them lazily to avoid a circular
+    # import when spack.package_base is imported first
+    import spack.build_systems.cmake
+    import spack.build_systems.meson
+    import spack.build_systems.python
+
     module = ModuleChangePropagator(pkg)
 
     if context == Context.BUILD:
@@ -746,7 +806,7 @@ def _get_rpath_deps_from_spec(
     return list(by_name.values())
 
 
-def get_rpath_deps(pkg: spack.package_base.PackageBase) -> List[spack.spec.Spec]:
+def get_rpath_deps(pkg: "spack.package_base.PackageBase") -> List[spack.spec.Spec]:
     """Return immediate or transitive dependencies (depending on the package) that need to be
     rpath'ed. If a package occurs multiple times, the newest version is kept."""
     return _get_rpath_deps_from_spec(pkg.spec, pkg.transitive_rpaths)
@@ -1157,7 +1217,7 @@ def _setup_pkg_and_run(
 
         pkg = serialized_pkg.restore()
 
-        if not kwargs.get("fake", False):
+        if not kwargs.get("fake", False) and kwargs.get("setup_environment", True):
             kwargs["unmodified_env"] = os.environ.copy()
             kwargs["env_modifications"] = setup_package(
                 pkg, dirty=kwargs.get("dirty", False), context=Context.from_string(context)
@@ -1225,6 +1285,167 @@ def _setup_pkg_and_run(
             input_multiprocess_fd.close()
 
 
+class BuildProcess:
+    """Child process doing part of a spack build, see ``start_build_process``.
+
+    Unlike ``start_build_process``, which blocks until the child process is done, this
+    class allows a parent to run several child processes at the same time:
+
+    .. code-block:: python
+
+        processes = [BuildProcess(pkg, function, kwargs).start() for pkg in pkgs]
+        for process in wait_for_build_processes(processes):
+            result = process.complete()
+    """
+
+    def __init__(self, pkg, function, kwargs, forward_stdin: bool = True):
+        """
+        Args:
+            pkg (spack.package_base.PackageBase): package whose environment we should set up
+                the child process for.
+            function (typing.Callable): function to run in the child process.
+            kwargs (dict): arguments passed to ``function``
+            forward_stdin: whether the child process can read from the standard input of
+                the parent, e.g. to toggle verbosity. Only one process at a time should.
+        """
+        self.pkg = pkg
+        self.function = function
+        self.kwargs = kwargs
+        self.forward_stdin = forward_stdin
+        self.process: Optional[multiprocessing.Process] = None
+        self.read_pipe: Optional[multiprocessing.connection.Connection] = None
+
+    def start(self) -> "BuildProcess":
+        """Start the child process, and return self"""
+        read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
+        input_multiprocess_fd = None
+        jobserver_fd1 = None
+        jobserver_fd2 = None
+
+        serialized_pkg = spack.subprocess_context.PackageInstallContext(self.pkg)
+
+        try:
+            # Forward sys.stdin when appropriate, to allow toggling verbosity
+            if (
+                self.forward_stdin
+                and sys.platform != "win32"
+                and sys.stdin.isatty()
+                and hasattr(sys.stdin, "fileno")
+            ):
+                input_fd = os.dup(sys.stdin.fileno())
+                input_multiprocess_fd = MultiProcessFd(input_fd)
+            mflags = os.environ.get("MAKEFLAGS")
+            if mflags:
+                m = re.search(r"--jobserver-[^=]*=(\d+),(\d+)", mflags)
+                if m:
+                    # Pass duplicates of the file descriptors, which are closed by the
+                    # parent, so that the original ones are available to other builds
+                    jobserver_fd1 = MultiProcessFd(os.dup(int(m.group(1))))
+                    jobserver_fd2 = MultiProcessFd(os.dup(int(m.group(2))))
+
+            p = multiprocessing.Process(
+                target=_setup_pkg_and_run,
+                args=(
+                    serialized_pkg,
+                    self.function,
+                    self.kwargs,
+                    write_pipe,
+                    input_multiprocess_fd,
+                    jobserver_fd1,
+                    jobserver_fd2,
+                ),
+            )
+
+            p.start()
+
+            # We close the writable end of the pipe now to be sure that p is the
+            # only process which owns a handle for it. This ensures that when p
+            # closes its handle for the writable end, read_pipe.recv() will
+            # promptly report the readable end as being ready.
+            write_pipe.close()
+
+        except InstallError as e:
+            e.pkg = self.pkg
+            raise
+
+        finally:
+            # Close the input stream, and the jobserver, in the parent process
+            for fd in (input_multiprocess_fd, jobserver_fd1, jobserver_fd2):
+                if fd is not None:
+                    fd.close()
+
+        self.process, self.read_pipe = p, read_pipe
+        return self
+
+    def _exitcode_msg(self):
+        assert self.process is not None
+        typ = "exit" if self.process.exitcode >= 0 else "signal"
+        return f"{typ} {abs(self.process.exitcode)}"
+
+    def complete(self):
+        """Wait for the child process to be done, and return the value returned by its
+        function. Errors in the child process are raised in the parent.
+        """
+        p, read_pipe = self.process, self.read_pipe
+        assert p is not None and read_pipe is not None, "the process was not started"
+        try:
+            child_result = read_pipe.recv()
+        except EOFError:
+            p.join()
+            raise InstallError(f"The process has stopped unexpectedly ({self._exitcode_msg()})")
+        finally:
+            read_pipe.close()
+
+        p.join()
+
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, StopPhase):
+            # do not print
+            raise child_result
+
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = self.pkg
+
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here rather
+            # than waiting until the call to SpackError.die() in main(). This
+            # allows exception handling output to be logged from within Spack.
+            # see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        # Fallback. Usually caught beforehand in EOFError above.
+        if p.exitcode != 0:
+            raise InstallError(f"The process failed unexpectedly ({self._exitcode_msg()})")
+
+        return child_result
+
+    def terminate(self) -> None:
+        """Terminate the child process, if it's still running"""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        if self.read_pipe is not None:
+            self.read_pipe.close()
+
+
+def wait_for_build_processes(
+    processes: List[BuildProcess], timeout: Optional[float] = None
+) -> List[BuildProcess]:
+    """Wait until at least one of the processes is done, and return the ones that are.
+
+    Args:
+        processes: processes that have been started
+        timeout: maximum time to wait, in seconds. If None, wait indefinitely
+    """
+    pipes = [p.read_pipe for p in processes if p.read_pipe is not None]
+    ready = multiprocessing.connection.wait(pipes, timeout=timeout)
+    return [p for p in processes if p.read_pipe in ready]
+
+
 def start_build_process(pkg, function, kwargs):
     """Create a child process to do part of a spack build.
 
@@ -1264,92 +1485,7 @@ def child_fun():
     For more information on `multiprocessing` child process creation
     mechanisms, see https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
     """
-    read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
-    input_multiprocess_fd = None
-    jobserver_fd1 = None
-    jobserver_fd2 = None
-
-    serialized_pkg = spack.subprocess_context.PackageInstallContext(pkg)
-
-    try:
-        # Forward sys.stdin when appropriate, to allow toggling verbosity
-        if sys.platform != "win32" and sys.stdin.isatty() and hasattr(sys.stdin, "fileno"):
-            input_fd = os.dup(sys.stdin.fileno())
-            input_multiprocess_fd = MultiProcessFd(input_fd)
-        mflags = os.environ.get("MAKEFLAGS", False)
-        if mflags:
-            m = re.search(r"--jobserver-[^=]*=(\d),(\d)", mflags)
-            if m:
-                jobserver_fd1 = MultiProcessFd(int(m.group(1)))
-                jobserver_fd2 = MultiProcessFd(int(m.group(2)))
-
-        p = multiprocessing.Process(
-            target=_setup_pkg_and_run,
-            args=(
-                serialized_pkg,
-                function,
-                kwargs,
-                write_pipe,
-                input_multiprocess_fd,
-                jobserver_fd1,
-                jobserver_fd2,
-            ),
-        )
-
-        p.start()
-
-        # We close the writable end of the pipe now to be sure that p is the
-        # only process which owns a handle for it. This ensures that when p
-        # closes its handle for the writable end, read_pipe.recv() will
-        # promptly report the readable end as being ready.
-        write_pipe.close()
-
-    except InstallError as e:
-        e.pkg = pkg
-        raise
-
-    finally:
-        # Close the input stream in the parent process
-        if input_multiprocess_fd is not None:
-            input_multiprocess_fd.close()
-
-    def exitcode_msg(p):
-        typ = "exit" if p.exitcode >= 0 else "signal"
-        return f"{typ} {abs(p.exitcode)}"
-
-    try:
-        child_result = read_pipe.recv()
-    except EOFError:
-        p.join()
-        raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
-
-    p.join()
-
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, StopPhase):
-        # do not print
-        raise child_result
-
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
-
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
-
-    # Fallback. Usually caught beforehand in EOFError above.
-    if p.exitcode != 0:
-        raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
-
-    return child_result
-
-
-CONTEXT_BASES = (spack.package_base.PackageBase, spack.build_systems._checks.BaseBuilder)
+    return BuildProcess(pkg, function, kwargs).start().complete()
 
 
 def get_package_context(traceback, context=3):
@@ -1367,6 +1503,9 @@ def get_package_context(traceback, context=3):
     from there.
 
     """
+    import spack.build_systems._checks  # avoid circular import
+
+    context_bases = (spack.package_base.PackageBase, spack.build_systems._checks.BaseBuilder)
 
     def make_stack(tb, stack=None):
         """Tracebacks come out of the system in caller -> callee order.  Return
@@ -1380,7 +1519,7 @@ def make_stack(tb, stack=None):
 
     stack = make_stack(traceback)
 
-    basenames = tuple(base.__name__ for base in CONTEXT_BASES)
+    basenames = tuple(base.__name__ for base in context_bases)
     for tb in stack:
         frame = tb.tb_frame
         if "self" in frame.f_locals:
@@ -1390,7 +1529,7 @@ def make_stack(tb, stack=None):
             func = getattr(obj, tb.tb_frame.f_code.co_name, "")
             if func and hasattr(func, "__qualname__"):
                 typename, *_ = func.__qualname__.partition(".")
-                if isinstance(obj, CONTEXT_BASES) and typename not in basenames:
+                if isinstance(obj, context_bases) and typename not in basenames:
                     break
     else:
         return None
@@ -11,8 +11,6 @@
 
 from llnl.util import lang
 
-import spack.build_environment
-
 #: Builder classes, as registered by the "builder" decorator
 BUILDER_CLS = {}
 
@@ -455,6 +453,8 @@ def _select_phase_fn(self):
         return phase_fn
 
     def _on_phase_start(self, instance):
+        import spack.build_environment  # avoid circular import
+
         # If a phase has a matching stop_before_phase attribute,
         # stop the installation process raising a StopPhase
         if getattr(instance, "stop_before_phase", None) == self.name:
@@ -463,6 +463,8 @@ def _on_phase_start(self, instance):
             )
 
     def _on_phase_exit(self, instance):
+        import spack.build_environment  # avoid circular import
+
         # If a phase has a matching last_phase attribute,
         # stop the installation process raising a StopPhase
         if getattr(instance, "last_phase", None) == self.name:
@@ -25,7 +25,6 @@
 import spack.spec
 import spack.store
 import spack.traverse as traverse
-import spack.user_environment as uenv
 import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
 
@@ -444,6 +443,8 @@ def format_list(specs):
 def filter_loaded_specs(specs):
     """Filter a list of specs returning only those that are
     currently loaded."""
+    import spack.user_environment as uenv
+
     hashes = os.environ.get(uenv.spack_loaded_hashes_var, "").split(":")
     return [x for x in specs if x.dag_hash() in hashes]
 
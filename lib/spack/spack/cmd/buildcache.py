@@ -327,6 +327,12 @@ def setup_parser(subparser: argparse.ArgumentParser):
         action="store_true",
         help="if provided, key index will be updated as well as package index",
     )
+    update_index.add_argument(
+        "--full",
+        default=False,
+        action="store_true",
+        help="read all spec files, instead of only those of specs not in the current index",
+    )
     update_index.set_defaults(func=update_index_fn)
 
 
@@ -353,6 +359,9 @@ def map(self, func, args):
     def starmap(self, func, args):
         return [func(*a) for a in args]
 
+    def imap_unordered(self, func, args):
+        return (func(a) for a in args)
+
     def __enter__(self):
         return self
 
@@ -372,6 +381,15 @@ def _make_pool() -> MaybePool:
         return NoPool()
 
 
+def _jobs_per_worker(pool: MaybePool, tasks: int) -> int:
+    """Number of threads each worker of a pool from ``_make_pool`` can use, so that workers
+    running concurrently use all the jobs together"""
+    jobs = determine_number_of_jobs(parallel=True)
+    if isinstance(pool, NoPool):
+        return jobs
+    return max(1, jobs // max(1, min(tasks, jobs)))
+
+
 def _skip_no_redistribute_for_public(specs):
     remaining_specs = list()
     removed_specs = list()
@@ -484,34 +502,31 @@ def push_fn(args):
     else:
         skipped = []
 
-        for i, spec in enumerate(specs):
-            try:
-                bindist.push_or_raise(
-                    spec,
-                    push_url,
-                    bindist.PushOptions(
-                        force=args.force,
-                        unsigned=unsigned,
-                        key=args.key,
-                        regenerate_index=args.update_index,
-                    ),
-                )
+        with _make_pool() if len(specs) > 1 else NoPool() as pool:
+            options = bindist.PushOptions(
+                force=args.force,
+                unsigned=unsigned,
+                key=args.key,
+                regenerate_index=args.update_index,
+                jobs=_jobs_per_worker(pool, len(specs)),
+            )
+            results = bindist.push_specs(specs, push_url, options, pool)
+            for i, (spec, error) in enumerate(results):
+                if error is None:
+                    msg = f"{_progress(i, len(specs))}Pushed {_format_spec(spec)}"
+                    if len(specs) == 1:
+                        msg += f" to {push_url}"
+                    tty.info(msg)
 
-                msg = f"{_progress(i, len(specs))}Pushed {_format_spec(spec)}"
-                if len(specs) == 1:
-                    msg += f" to {push_url}"
-                tty.info(msg)
+                elif isinstance(error, bindist.NoOverwriteException):
+                    skipped.append(_format_spec(spec))
 
-            except bindist.NoOverwriteException:
-                skipped.append(_format_spec(spec))
+                # Collect any other error unless the fail fast option is set
+                elif args.fail_fast:
+                    raise error
 
-            # Catch any other exception unless the fail fast option is set
-            except Exception as e:
-                if args.fail_fast or isinstance(
-                    e, (bindist.PickKeyException, bindist.NoKeyException)
-                ):
-                    raise
-                failed.append((_format_spec(spec), e))
+                else:
+                    failed.append((_format_spec(spec), error))
 
     if skipped:
         if len(specs) == 1:
@@ -1195,7 +1210,7 @@ def manifest_copy(manifest_file_list, dest_mirror=None):
             copy_buildcache_file(copy_file["src"], dest)
 
 
-def update_index(mirror: spack.mirror.Mirror, update_keys=False):
+def update_index(mirror: spack.mirror.Mirror, update_keys=False, full=False):
     # Special case OCI images for now.
     try:
         image_ref = spack.oci.oci.image_from_mirror(mirror)
@@ -1212,7 +1227,9 @@ def update_index(mirror: spack.mirror.Mirror, update_keys=False):
     # Otherwise, assume a normal mirror.
     url = mirror.push_url
 
-    bindist.generate_package_index(url_util.join(url, bindist.build_cache_relative_path()))
+    bindist.generate_package_index(
+        url_util.join(url, bindist.build_cache_relative_path()), full=full
+    )
 
     if update_keys:
         keys_url = url_util.join(
@@ -1229,7 +1246,7 @@ def update_index(mirror: spack.mirror.Mirror, update_keys=False):
 
 def update_index_fn(args):
     """update a buildcache index"""
-    return update_index(args.mirror, update_keys=args.keys)
+    return update_index(args.mirror, update_keys=args.keys, full=args.full)
 
 
 def buildcache(parser, args):
@@ -10,7 +10,6 @@
 import llnl.util.filesystem
 import llnl.util.tty as tty
 
-import spack.bootstrap
 import spack.caches
 import spack.cmd.test
 import spack.config
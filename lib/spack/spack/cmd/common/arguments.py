@@ -15,8 +15,6 @@
 import spack.deptypes as dt
 import spack.environment as ev
 import spack.mirror
-import spack.modules
-import spack.reporters
 import spack.spec
 import spack.store
 from spack.util.pattern import Args
@@ -158,6 +156,8 @@ def _cdash_reporter(namespace):
     """
 
     def _factory():
+        import spack.reporters  # reporters pull in the build environment, import them lazily
+
         def installed_specs(args):
             if getattr(args, "spec", ""):
                 packages = args.spec
@@ -191,6 +191,8 @@ class CreateReporter(argparse.Action):
     """Create the correct object to generate reports for installation and testing."""
 
     def __call__(self, parser, namespace, values, option_string=None):
+        import spack.reporters
+
         setattr(namespace, self.dest, values)
         if values == "junit":
             setattr(namespace, "reporter", spack.reporters.JUnit)
@@ -8,6 +8,7 @@
 
 import llnl.util.tty as tty
 
+import spack.build_environment
 import spack.cmd
 import spack.config
 import spack.repo
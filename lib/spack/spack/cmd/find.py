@@ -10,7 +10,6 @@
 import llnl.util.tty as tty
 import llnl.util.tty.color as color
 
-import spack.bootstrap
 import spack.cmd as cmd
 import spack.environment as ev
 import spack.repo
@@ -48,6 +48,7 @@ def install_kwargs_from_args(args):
     pkg_use_bc, dep_use_bc = args.use_buildcache
 
     return {
+        "concurrent_packages": args.concurrent_packages,
         "fail_fast": args.fail_fast,
         "keep_prefix": args.keep_prefix,
         "keep_stage": args.keep_stage,
@@ -88,6 +89,13 @@ def setup_parser(subparser):
         help="phase to stop after when installing (default None)",
     )
     arguments.add_common_arguments(subparser, ["jobs"])
+    subparser.add_argument(
+        "--concurrent-packages",
+        type=int,
+        default=1,
+        metavar="N",
+        help="build or extract up to N packages at the same time (default 1)",
+    )
     subparser.add_argument(
         "--overwrite",
         action="store_true",
@@ -330,6 +338,9 @@ def install(parser, args):
         msg = "the '--log-format' must be specified when using '--log-file'"
         tty.die(msg)
 
+    if args.concurrent_packages < 1:
+        tty.die("the '--concurrent-packages' value must be a positive integer")
+
     arguments.sanitize_reporter_options(args)
 
     def reporter_factory(specs):
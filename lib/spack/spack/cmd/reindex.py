@@ -2,6 +2,9 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import time
+
+import llnl.util.tty as tty
 
 import spack.store
 
@@ -11,4 +14,11 @@
 
 
 def reindex(parser, args):
+    start = time.time()
     spack.store.STORE.reindex()
+    elapsed = time.time() - start
+
+    with spack.store.STORE.db.read_transaction():
+        count = len(spack.store.STORE.db.query_local(installed=any))
+    rate = count / elapsed if elapsed > 0 else float(count)
+    tty.msg(f"Reindexed {count} specs in {elapsed:.2f}s ({rate:.1f} specs/s)")
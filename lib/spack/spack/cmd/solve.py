@@ -17,6 +17,7 @@
 import spack.hash_types as ht
 import spack.package_base
 import spack.solver.asp as asp
+import spack.util.spack_json as sjson
 from spack.cmd.common import arguments
 
 description = "concretize a specs using an ASP solver"
@@ -85,6 +86,23 @@ def setup_parser(subparser):
     subparser.add_argument(
         "--stats", action="store_true", default=False, help="print out statistics from clingo"
     )
+    subparser.add_argument(
+        "--profile",
+        default=None,
+        metavar="FILE",
+        help="write a JSON profile of the solve to FILE ('-' for stdout)\n\n"
+        "the profile includes facts and conditions emitted for each package, hit ratios of "
+        "the condition caches, and the time spent profiling. When it is written to stdout, "
+        "solutions are not printed",
+    )
+    subparser.add_argument(
+        "--profile-grounding",
+        action="store_true",
+        default=False,
+        help="also estimate the time spent grounding each logic program in the profile\n\n"
+        "this grounds the problem again once for each logic program, and once for the "
+        "problem instance alone, so the solve takes several times longer to profile",
+    )
     subparser.add_argument("specs", nargs=argparse.REMAINDER, help="specs of packages")
 
     spack.cmd.common.arguments.add_concretizer_args(subparser)
@@ -129,6 +147,21 @@ def _process_result(result, show, required_format, kwargs):
         tty.msg(asp.Result.format_unsolved(result.unsolved_specs))
 
 
+def _write_profile(path, specs, results):
+    data = {
+        "spack": spack.spack_version,
+        "specs": [str(s) for s in specs],
+        "solves": [r.profile for r in results],
+    }
+    if path == "-":
+        sjson.dump(data, sys.stdout)
+        print()
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        sjson.dump(data, f)
+    tty.msg(f"Profile of the solve written to {path}")
+
+
 def solve(parser, args):
     # these are the same options as `spack spec`
     install_status_fn = spack.spec.Spec.install_status
@@ -166,6 +199,14 @@ def solve(parser, args):
         msg = "cannot give explicit specs when an environment is active"
         raise RuntimeError(msg)
 
+    if args.profile_grounding and args.profile is None:
+        raise RuntimeError("--profile-grounding requires --profile")
+
+    # The profile replaces the usual output, when written to stdout
+    quiet = args.profile == "-"
+    if quiet and "asp" in show:
+        raise RuntimeError("cannot write both the profile and the ASP problem to stdout")
+
     specs = list(env.user_specs) if env else spack.cmd.parse_specs(args.specs)
 
     solver = asp.Solver()
@@ -173,6 +214,8 @@ def solve(parser, args):
     setup_only = set(show) == {"asp"}
     unify = spack.config.get("concretizer:unify")
     allow_deprecated = spack.config.get("config:deprecated", False)
+    profile = args.profile is not None and not setup_only
+    results = []
     if unify != "when_possible":
         # set up solver parameters
         # Note: reuse and other concretizer prefs are passed as configuration
@@ -183,8 +226,11 @@ def solve(parser, args):
             stats=args.stats,
             setup_only=setup_only,
             allow_deprecated=allow_deprecated,
+            profile=profile,
+            profile_grounding=args.profile_grounding,
         )
-        if not setup_only:
+        results.append(result)
+        if not setup_only and not quiet:
             _process_result(result, show, required_format, kwargs)
     else:
         for idx, result in enumerate(
@@ -194,8 +240,13 @@ def solve(parser, args):
                 timers=args.timers,
                 stats=args.stats,
                 allow_deprecated=allow_deprecated,
+                profile=profile,
+                profile_grounding=args.profile_grounding,
             )
         ):
+            results.append(result)
+            if quiet:
+                continue
             if "solutions" in show:
                 tty.msg("ROUND {0}".format(idx))
                 tty.msg("")
@@ -203,3 +254,6 @@ def solve(parser, args):
                 print("% END ROUND {0}\n".format(idx))
             if not setup_only:
                 _process_result(result, show, required_format, kwargs)
+
+    if profile:
+        _write_profile(args.profile, specs, results)
@@ -141,6 +141,9 @@ def is_installed(spec):
         record = spack.store.STORE.db.query_local_by_spec_hash(spec.dag_hash())
         return record and record.installed
 
+    # Database specs only know about their dependents once all of them are built
+    spack.store.STORE.db.load_all_specs()
+
     specs = traverse.traverse_nodes(
         specs,
         root=False,
@@ -20,8 +20,11 @@
 """
 import contextlib
 import datetime
+import functools
+import math
 import os
 import pathlib
+import pickle
 import socket
 import sys
 import time
@@ -32,6 +35,7 @@
     Container,
     Dict,
     Generator,
+    Iterable,
     List,
     NamedTuple,
     Optional,
@@ -52,10 +56,13 @@
 import llnl.util.filesystem as fs
 import llnl.util.tty as tty
 
+import spack
 import spack.deptypes as dt
 import spack.hash_types as ht
+import spack.repo
 import spack.spec
 import spack.traverse as tr
+import spack.util.cpus
 import spack.util.lock as lk
 import spack.util.spack_json as sjson
 import spack.version as vn
@@ -87,6 +94,30 @@
     (vn.Version("6"), vn.Version("7")),
 ]
 
+#: Version of the binary cache of the index file. Increment by one whenever the pickled
+#: representation of install records changes.
+_DB_BINARY_CACHE_VERSION = 3
+
+#: Version of the format of the database journal. Increment by one when it changes.
+_DB_JOURNAL_VERSION = 1
+
+#: The journal is compacted into the index file when it grows larger than this
+#: fraction of the index file, or than _DB_JOURNAL_MIN_COMPACTION_SIZE bytes.
+_DB_JOURNAL_COMPACTION_RATIO = 0.25
+_DB_JOURNAL_MIN_COMPACTION_SIZE = 1024 * 1024
+
+#: Attributes of install records that can change after a record is created
+_MUTABLE_RECORD_FIELDS = (
+    "path",
+    "installed",
+    "ref_count",
+    "explicit",
+    "installation_time",
+    "deprecated_for",
+    "in_buildcache",
+    "origin",
+)
+
 #: Default timeout for spack database locks in seconds or None (no timeout).
 #: A balance needs to be struck between quick turnaround for parallel installs
 #: (to avoid excess delays) and waiting long enough when the system is busy
@@ -101,6 +132,9 @@
 #: ensure a failed install is properly tracked).
 _DEFAULT_PKG_LOCK_TIMEOUT = None
 
+#: Width, in seconds, of the installation time buckets used to index install records
+_INSTALL_TIME_BUCKET = 24 * 60 * 60
+
 #: Types of dependencies tracked by the database
 #: We store by DAG hash, so we track the dependencies that the DAG hash includes.
 _TRACKED_DEPENDENCIES = ht.dag_hash.depflag
@@ -117,6 +151,32 @@
 )
 
 
+def _journal_line(data: Dict[str, Any]) -> bytes:
+    """Return the line of the database journal that stores the given data."""
+    line = sjson.dump(data)
+    assert line is not None
+    return line.encode("utf-8") + b"\n"
+
+
+def _truncate_after_last_line(stream, block_size: int = 4096) -> None:
+    """Truncate a file opened for binary reading and appending after its last newline,
+    and leave the stream at its end.
+    """
+    end = stream.seek(0, os.SEEK_END)
+    offset = end
+    while offset > 0:
+        start = max(offset - block_size, 0)
+        stream.seek(start)
+        newline = stream.read(offset - start).rfind(b"\n")
+        if newline != -1:
+            offset = start + newline + 1
+            break
+        offset = start
+    if offset != end:
+        stream.truncate(offset)
+    stream.seek(offset)
+
+
 def reader(version: vn.StandardVersion) -> Type["spack.spec.SpecfileReaderBase"]:
     reader_cls = {
         vn.Version("5"): spack.spec.SpecfileV1,
@@ -190,6 +250,10 @@ class InstallRecord:
     actually remove from the database until a spec has no installed
     dependents left.
 
+    Records read from an index file may be created with :meth:`lazy_from_dict`,
+    in which case only the node dictionary of the spec is kept until the ``spec``
+    attribute is first accessed.
+
     Args:
         spec: spec tracked by the install record
         path: path where the spec has been installed
@@ -212,7 +276,7 @@ def __init__(
         in_buildcache: bool = False,
         origin=None,
     ):
-        self.spec = spec
+        self._spec: Optional["spack.spec.Spec"] = spec
         self.path = str(path) if path else None
         self.installed = bool(installed)
         self.ref_count = ref_count
@@ -222,6 +286,50 @@ def __init__(
         self.in_buildcache = in_buildcache
         self.origin = origin
 
+        # Node dictionary and loader of a spec that has not been built yet
+        self._node_dict: Optional[Dict[str, Any]] = None
+        self._load_spec: Optional[Callable[[], "spack.spec.Spec"]] = None
+
+    @property
+    def spec(self) -> "spack.spec.Spec":
+        """Spec tracked by the install record, built on first access for lazy records"""
+        if self._spec is None and self._load_spec is not None:
+            self._spec = self._load_spec()
+            self._node_dict, self._load_spec = None, None
+        return self._spec  # type: ignore[return-value]
+
+    @spec.setter
+    def spec(self, value: "spack.spec.Spec") -> None:
+        self._spec = value
+        self._node_dict, self._load_spec = None, None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the spec of this record has already been built"""
+        return self._spec is not None
+
+    @property
+    def name(self) -> str:
+        """Name of the package of the spec, which doesn't require building the spec"""
+        if self._node_dict is not None:
+            return self._node_dict["name"]
+        return self.spec.name
+
+    @property
+    def fullname(self) -> str:
+        """Namespace qualified name of the spec, which doesn't require building the spec"""
+        if self._node_dict is not None:
+            namespace = self._node_dict.get("namespace")
+            return f"{namespace}.{self.name}" if namespace else self.name
+        return self.spec.fullname
+
+    @property
+    def external(self) -> bool:
+        """Whether the spec is external, which doesn't require building the spec"""
+        if self._node_dict is not None:
+            return "external" in self._node_dict
+        return self.spec.external
+
     def install_type_matches(self, installed):
         installed = InstallStatuses.canonicalize(installed)
         if self.installed:
@@ -235,7 +343,9 @@ def to_dict(self, include_fields=DEFAULT_INSTALL_RECORD_FIELDS):
         rec_dict = {}
 
         for field_name in include_fields:
-            if field_name == "spec":
+            if field_name == "spec" and self._node_dict is not None:
+                rec_dict.update({"spec": self._node_dict})
+            elif field_name == "spec":
                 rec_dict.update({"spec": self.spec.node_dict_with_hashes()})
             elif field_name == "deprecated_for" and self.deprecated_for:
                 rec_dict.update({"deprecated_for": self.deprecated_for})
@@ -261,6 +371,176 @@ def from_dict(cls, spec, dictionary):
 
         return InstallRecord(spec, **d)
 
+    @classmethod
+    def lazy_from_dict(cls, load_spec: Callable[[], "spack.spec.Spec"], dictionary):
+        """Create a record whose spec is built by ``load_spec`` when first accessed.
+
+        The node dictionary of the spec must be in the current specfile format, since
+        it is written back as-is if the spec is never built.
+        """
+        record = cls.from_dict(None, dictionary)
+        record._node_dict = dictionary["spec"]
+        record._load_spec = load_spec
+        return record
+
+
+class RecordIndex:
+    """Secondary indexes over the install records of a database.
+
+    The indexes map package names, the explicit flag, and installation time buckets
+    to the DAG hashes of the corresponding records. ``Database._query`` uses them to
+    shrink the set of candidate records before calling ``Spec.satisfies``.
+
+    Providers of virtual packages are indexed lazily, the first time a virtual is
+    queried, since that requires loading package classes. Afterwards they are kept
+    up to date incrementally, like the other indexes.
+    """
+
+    def __init__(self) -> None:
+        self.by_name: Dict[str, Set[str]] = {}
+        self.by_virtual: Dict[str, Set[str]] = {}
+        self.by_time: Dict[int, Set[str]] = {}
+        self.explicit: Set[str] = set()
+
+        # Maps each hash to the (name, fullname, time bucket) it is indexed under
+        self._keys: Dict[str, Tuple[str, str, int]] = {}
+
+        # Maps each hash to the order in which it was first added, like keys of a dict
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+
+        # Memoizes the names of the virtuals that a package can provide
+        self._virtuals_by_pkg: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, hash_key: str) -> bool:
+        return hash_key in self._keys
+
+    def clear(self) -> None:
+        """Remove every record from the index."""
+        self.by_name.clear()
+        self.by_virtual.clear()
+        self.by_time.clear()
+        self.explicit.clear()
+        self._keys.clear()
+        self._positions.clear()
+
+    def rebuild(self, data: Dict[str, InstallRecord]) -> None:
+        """Rebuild the index from scratch, from the records passed as argument."""
+        self.clear()
+        for hash_key, record in data.items():
+            self.add(hash_key, record)
+
+    def add(self, hash_key: str, record: InstallRecord) -> None:
+        """Index a record. If the hash was already indexed, its entries are updated."""
+        position = self._positions.get(hash_key)
+        if hash_key in self._keys:
+            self.remove(hash_key)
+
+        if position is None:
+            position, self._next_position = self._next_position, self._next_position + 1
+        self._positions[hash_key] = position
+
+        name, fullname = record.name, record.fullname
+        bucket = _time_bucket(record.installation_time)
+        self._keys[hash_key] = (name, fullname, bucket)
+        self.by_name.setdefault(name, set()).add(hash_key)
+        self.by_time.setdefault(bucket, set()).add(hash_key)
+        if record.explicit:
+            self.explicit.add(hash_key)
+
+        for virtual, providers in self.by_virtual.items():
+            if virtual in self._provided_virtuals(fullname):
+                providers.add(hash_key)
+
+    def update(self, hash_key: str, record: InstallRecord) -> None:
+        """Update the entries of a record whose attributes may have changed."""
+        self.add(hash_key, record)
+
+    def remove(self, hash_key: str) -> None:
+        """Remove a record from the index. Unknown hashes are ignored."""
+        keys = self._keys.pop(hash_key, None)
+        if keys is None:
+            return
+
+        del self._positions[hash_key]
+
+        name, _, bucket = keys
+        _discard(self.by_name, name, hash_key)
+        _discard(self.by_time, bucket, hash_key)
+        self.explicit.discard(hash_key)
+        for providers in self.by_virtual.values():
+            providers.discard(hash_key)
+
+    def ordered(self, hashes: Iterable[str]) -> List[str]:
+        """Return hashes in the order they were added to the index, which is the order of the
+        records in the database."""
+        return sorted(hashes, key=lambda x: self._positions.get(x, math.inf))
+
+    def named(self, name: str) -> Set[str]:
+        """Return the hashes of the records with the given package name."""
+        return self.by_name.get(name, set())
+
+    def providers(self, virtual: str) -> Set[str]:
+        """Return the hashes of the records whose package may provide a virtual.
+
+        The result is a superset of the records satisfying the virtual, since
+        conditional ``provides`` directives are not evaluated here.
+        """
+        if virtual not in self.by_virtual:
+            self.by_virtual[virtual] = set(
+                hash_key
+                for hash_key, (_, fullname, _) in self._keys.items()
+                if virtual in self._provided_virtuals(fullname)
+            )
+        return self.by_virtual[virtual]
+
+    def installed_between(self, start: float, end: float) -> Set[str]:
+        """Return the hashes of the records in the time buckets overlapping an interval.
+
+        Either end of the interval may be infinite.
+        """
+        result: Set[str] = set()
+        for bucket, hashes in self.by_time.items():
+            if (
+                bucket + 1
+            ) * _INSTALL_TIME_BUCKET > start and bucket * _INSTALL_TIME_BUCKET <= end:
+                result.update(hashes)
+        return result
+
+    def _provided_virtuals(self, fullname: str) -> Set[str]:
+        if fullname not in self._virtuals_by_pkg:
+            try:
+                pkg_cls = spack.repo.PATH.get_pkg_class(fullname)
+                virtuals = set(pkg_cls.provided_virtual_names())
+            except spack.repo.UnknownEntityError:
+                # Packages we know nothing about cannot satisfy a virtual query
+                virtuals = set()
+            self._virtuals_by_pkg[fullname] = virtuals
+        return self._virtuals_by_pkg[fullname]
+
+
+def _record_state(record: InstallRecord) -> Tuple:
+    """Return the attributes of a record that may change after it is created"""
+    return tuple(getattr(record, field_name) for field_name in _MUTABLE_RECORD_FIELDS)
+
+
+def _time_bucket(timestamp: float) -> int:
+    """Return the installation time bucket for a timestamp"""
+    return int(timestamp // _INSTALL_TIME_BUCKET)
+
+
+def _discard(index: Dict[Any, Set[str]], key: Any, hash_key: str) -> None:
+    """Remove a hash from an index entry, and drop the entry if it becomes empty"""
+    hashes = index.get(key)
+    if hashes is None:
+        return
+    hashes.discard(hash_key)
+    if not hashes:
+        del index[key]
+
 
 class ForbiddenLockError(SpackError):
     """Raised when an upstream DB attempts to acquire a lock"""
@@ -598,6 +878,7 @@ def __init__(
         upstream_dbs: Optional[List["Database"]] = None,
         is_upstream: bool = False,
         lock_cfg: LockConfiguration = DEFAULT_LOCK_CFG,
+        journal: bool = False,
     ) -> None:
         """Database for Spack installations.
 
@@ -617,12 +898,18 @@ def __init__(
             is_upstream: whether this repository is an upstream.
             lock_cfg: configuration for the locks to be used by this repository.
                 Relevant only if the repository is not an upstream.
+            journal: whether write transactions append the changed records to a journal
+                next to the index file, instead of rewriting the index. The journal is
+                compacted into the index when it grows too large. A journal, if present,
+                is always read, regardless of this argument.
         """
         self.root = root
         self.database_directory = os.path.join(self.root, _DB_DIRNAME)
 
         # Set up layout of database files within the db dir
         self._index_path = os.path.join(self.database_directory, "index.json")
+        self._binary_cache_path = os.path.join(self.database_directory, "index.bin")
+        self._journal_path = os.path.join(self.database_directory, "index.journal")
         self._verifier_path = os.path.join(self.database_directory, "index_verifier")
         self._lock_path = os.path.join(self.database_directory, "lock")
 
@@ -657,6 +944,9 @@ def __init__(
             )
         self._data: Dict[str, InstallRecord] = {}
 
+        # Secondary indexes on the records in self._data, used to speed-up queries
+        self._index = RecordIndex()
+
         # For every installed spec we keep track of its install prefix, so that
         # we can answer the simple query whether a given path is already taken
         # before installing a different spec.
@@ -675,17 +965,30 @@ def __init__(
         self._write_transaction_impl = lk.WriteTransaction
         self._read_transaction_impl = lk.ReadTransaction
 
+        self.journal = journal
+        # State of the records at the start of the current write transaction, used
+        # to compute the entries appended to the journal
+        self._journal_snapshot: Optional[Dict[str, Tuple]] = None
+        # Header of the journal matching the index file that was read last, and
+        # offset of the first journal entry that has not been replayed yet
+        self._journal_header: Optional[Dict[str, Any]] = None
+        self._journal_offset = 0
+        # Whether the index file that was read last has the current format
+        self._index_is_current = False
+
     def write_transaction(self):
         """Get a write lock context manager for use in a `with` block."""
-        return self._write_transaction_impl(self.lock, acquire=self._read, release=self._write)
+        return self._write_transaction_impl(
+            self.lock, acquire=self._read_for_write, release=self._write
+        )
 
     def read_transaction(self):
         """Get a read lock context manager for use in a `with` block."""
         return self._read_transaction_impl(self.lock, acquire=self._read)
 
-    def _write_to_file(self, stream):
+    def _write_to_file(self, stream) -> Dict[str, Dict[str, Any]]:
         """Write out the database in JSON format to the stream passed
-        as argument.
+        as argument, and return the installation records that were written.
 
         This function does not do any locking or transactions.
         """
@@ -713,7 +1016,8 @@ def _write_to_file(self, stream):
         try:
             sjson.dump(database, stream)
         except (TypeError, ValueError) as e:
-            raise sjson.SpackJSONError("error writing JSON database:", str(e))
+            raise sjson.SpackJSONError("error writing JSON database:", e)
+        return installs
 
     def _read_spec_from_dict(self, spec_reader, hash_key, installs, hash=ht.dag_hash):
         """Recursively construct a spec from a hash in a YAML database.
@@ -774,42 +1078,118 @@ def query_local_by_spec_hash(self, hash_key):
         with self.read_transaction():
             return self._data.get(hash_key, None)
 
-    def _assign_dependencies(self, spec_reader, hash_key, installs, data):
-        # Add dependencies from other records in the install DB to
-        # form a full spec.
-        spec = data[hash_key].spec
+    def _dependency_records(self, spec_reader, hash_key, installs, data):
+        """Yield the name, hash, deptypes, virtuals and install record of each dependency
+        of a record being read. The install record is None if the dependency is missing.
+        """
         spec_node_dict = installs[hash_key]["spec"]
         if "name" not in spec_node_dict:
             # old format
-            spec_node_dict = spec_node_dict[spec.name]
-        if "dependencies" in spec_node_dict:
-            yaml_deps = spec_node_dict["dependencies"]
-            for dname, dhash, dtypes, _, virtuals in spec_reader.read_specfile_dep_specs(
-                yaml_deps
-            ):
-                # It is important that we always check upstream installations
-                # in the same order, and that we always check the local
-                # installation first: if a downstream Spack installs a package
-                # then dependents in that installation could be using it.
-                # If a hash is installed locally and upstream, there isn't
-                # enough information to determine which one a local package
-                # depends on, so the convention ensures that this isn't an
-                # issue.
-                upstream, record = self.query_by_spec_hash(dhash, data=data)
-                child = record.spec if record else None
-
-                if not child:
-                    msg = "Missing dependency not in database: " "%s needs %s-%s" % (
-                        spec.cformat("{name}{/hash:7}"),
-                        dname,
-                        dhash[:7],
-                    )
-                    if self._fail_when_missing_deps:
-                        raise MissingDependenciesError(msg)
-                    tty.warn(msg)
-                    continue
+            spec_node_dict = next(iter(spec_node_dict.values()))
+        if "dependencies" not in spec_node_dict:
+            return
+
+        yaml_deps = spec_node_dict["dependencies"]
+        for dname, dhash, dtypes, _, virtuals in spec_reader.read_specfile_dep_specs(yaml_deps):
+            # It is important that we always check upstream installations
+            # in the same order, and that we always check the local
+            # installation first: if a downstream Spack installs a package
+            # then dependents in that installation could be using it.
+            # If a hash is installed locally and upstream, there isn't
+            # enough information to determine which one a local package
+            # depends on, so the convention ensures that this isn't an
+            # issue.
+            upstream, record = self.query_by_spec_hash(dhash, data=data)
+            yield dname, dhash, dtypes, virtuals, record
+
+    def _missing_dependency(self, spec_str, dname, dhash):
+        msg = "Missing dependency not in database: " "%s needs %s-%s" % (
+            spec_str,
+            dname,
+            dhash[:7],
+        )
+        if self._fail_when_missing_deps:
+            raise MissingDependenciesError(msg)
+        tty.warn(msg)
+
+    def _assign_dependencies(self, spec, spec_reader, hash_key, installs, data, warn=True):
+        # Add dependencies from other records in the install DB to
+        # form a full spec.
+        for dname, dhash, dtypes, virtuals, record in self._dependency_records(
+            spec_reader, hash_key, installs, data
+        ):
+            if not record:
+                if warn:
+                    self._missing_dependency(spec.cformat("{name}{/hash:7}"), dname, dhash)
+                continue
+
+            spec._add_dependency(record.spec, depflag=dt.canonicalize(dtypes), virtuals=virtuals)
+
+    def _check_dependencies(self, spec_reader, hash_key, installs, data):
+        """Report missing dependencies of a lazy record, without building its spec."""
+        for dname, dhash, _, _, record in self._dependency_records(
+            spec_reader, hash_key, installs, data
+        ):
+            if not record:
+                self._missing_dependency(f"{data[hash_key].name}/{hash_key[:7]}", dname, dhash)
+
+    def _load_lazy_spec(self, spec_reader, hash_key, installs, data):
+        """Build the spec of a lazy record, and connect it to its dependencies.
+
+        The specs of dependents are not built, see ``load_all_specs``. Missing dependencies
+        are not reported, since that was done when reading the record.
+        """
+        try:
+            spec = self._read_spec_from_dict(spec_reader, hash_key, installs)
+            self._assign_dependencies(spec, spec_reader, hash_key, installs, data, warn=False)
+            spec._mark_root_concrete()
+        except CorruptDatabaseError:
+            raise
+        except Exception as e:
+            raise self._invalid_record(hash_key, e) from e
+        return spec
+
+    def _invalid_record(self, hash_key: str, error: Exception) -> "CorruptDatabaseError":
+        return CorruptDatabaseError(
+            f"Invalid record in Spack database: hash: {hash_key}, cause: "
+            f"{type(error).__name__}: {error}",
+            self._index_path,
+        )
+
+    def _read_lazy_records(self, spec_reader, installs: Dict[str, Dict[str, Any]]) -> None:
+        """Fill the database with records in the current format, read lazily: their specs
+        are built only when first accessed, after building the specs of their dependencies.
+        Here we only check that their dependencies are in the database.
+
+        Does not do any locking.
+        """
+        data: Dict[str, InstallRecord] = {}
+        installed_prefixes = set()
+        for hash_key, rec in installs.items():
+            try:
+                rec["spec"][ht.dag_hash.name] = hash_key
+                load_spec = functools.partial(
+                    self._load_lazy_spec, spec_reader, hash_key, installs, data
+                )
+                record = InstallRecord.lazy_from_dict(load_spec, rec)
+                data[hash_key] = record
+
+                if not record.external and record.installed:
+                    installed_prefixes.add(record.path)
+            except Exception as e:
+                raise self._invalid_record(hash_key, e) from e
 
-                spec._add_dependency(child, depflag=dt.canonicalize(dtypes), virtuals=virtuals)
+        for hash_key in data:
+            try:
+                self._check_dependencies(spec_reader, hash_key, installs, data)
+            except MissingDependenciesError:
+                raise
+            except Exception as e:
+                raise self._invalid_record(hash_key, e) from e
+
+        self._data = data
+        self._index.rebuild(data)
+        self._installed_prefixes = installed_prefixes
 
     def _read_from_file(self, filename):
         """Fill database from file, do not maintain old data.
@@ -839,6 +1219,7 @@ def check(cond, msg):
 
         # TODO: better version checking semantics.
         version = vn.Version(db["version"])
+        self._index_is_current = version == _DB_VERSION
         if version > _DB_VERSION:
             raise InvalidDatabaseVersionError(self, _DB_VERSION, version)
         elif version < _DB_VERSION and not any(
@@ -855,15 +1236,14 @@ def check(cond, msg):
             installs = db["installs"]
 
         spec_reader = reader(version)
+        if version == _DB_VERSION:
+            self._read_lazy_records(spec_reader, installs)
+            return
 
-        def invalid_record(hash_key, error):
-            return CorruptDatabaseError(
-                f"Invalid record in Spack database: hash: {hash_key}, cause: "
-                f"{type(error).__name__}: {error}",
-                self._index_path,
-            )
+        data: Dict[str, InstallRecord] = {}
+        installed_prefixes = set()
 
-        # Build up the database in three passes:
+        # Older formats are built up in three passes:
         #
         #   1. Read in all specs without dependencies.
         #   2. Hook dependencies up among specs.
@@ -873,8 +1253,6 @@ def invalid_record(hash_key, error):
         # (i.e., its specs are a true Merkle DAG, unlike most specs.)
 
         # Pass 1: Iterate through database and build specs w/o dependencies
-        data = {}
-        installed_prefixes = set()
         for hash_key, rec in installs.items():
             try:
                 # This constructs a spec DAG from the list of all installs
@@ -889,16 +1267,17 @@ def invalid_record(hash_key, error):
                 if not spec.external and "installed" in rec and rec["installed"]:
                     installed_prefixes.add(rec["path"])
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
         # Pass 2: Assign dependencies once all specs are created.
         for hash_key in data:
             try:
-                self._assign_dependencies(spec_reader, hash_key, installs, data)
+                spec = data[hash_key].spec
+                self._assign_dependencies(spec, spec_reader, hash_key, installs, data)
             except MissingDependenciesError:
                 raise
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
         # Pass 3: Mark all specs concrete.  Specs representing real
         # installations must be explicitly marked.
@@ -909,6 +1288,7 @@ def invalid_record(hash_key, error):
             rec.spec._mark_root_concrete()
 
         self._data = data
+        self._index.rebuild(data)
         self._installed_prefixes = installed_prefixes
 
     def reindex(self, directory_layout):
@@ -924,10 +1304,11 @@ def reindex(self, directory_layout):
         def _read_suppress_error():
             try:
                 if os.path.isfile(self._index_path):
-                    self._read_from_file(self._index_path)
+                    self._read_index()
             except CorruptDatabaseError as e:
                 self._error = e
                 self._data = {}
+                self._index.clear()
                 self._installed_prefixes = set()
 
         transaction = lk.WriteTransaction(
@@ -946,6 +1327,7 @@ def _read_suppress_error():
             except BaseException:
                 # If anything explodes, restore old data, skip write.
                 self._data = old_data
+                self._index.rebuild(old_data)
                 self._installed_prefixes = old_installed_prefixes
                 raise
 
@@ -979,12 +1361,14 @@ def _construct_from_directory_layout(self, directory_layout, old_data):
         with directory_layout.disable_upstream_check():
             # Initialize data in the reconstructed DB
             self._data = {}
+            self._index.clear()
             self._installed_prefixes = set()
 
             # Start inspecting the installed prefixes
             processed_specs = set()
 
-            for spec in directory_layout.all_specs():
+            processes = spack.util.cpus.determine_number_of_jobs(parallel=True)
+            for spec in directory_layout.all_specs(processes=processes):
                 self._construct_entry_from_directory_layout(directory_layout, old_data, spec)
                 processed_specs.add(spec)
 
@@ -1066,6 +1450,8 @@ def _write(self, type, value, traceback):
 
         This routine does no locking.
         """
+        snapshot, self._journal_snapshot = self._journal_snapshot, None
+
         # Do not write if exceptions were raised
         if type is not None:
             # A failure interrupted a transaction, so we should record that
@@ -1074,19 +1460,25 @@ def _write(self, type, value, traceback):
             self._state_is_inconsistent = True
             return
 
+        if snapshot is not None and self._can_append_to_journal():
+            self._append_to_journal(snapshot)
+            return
+
         temp_file = self._index_path + (".%s.%s.temp" % (socket.getfqdn(), os.getpid()))
 
         # Write a temporary database file them move it into place
         try:
             with open(temp_file, "w") as f:
-                self._write_to_file(f)
+                installs = self._write_to_file(f)
             fs.rename(temp_file, self._index_path)
+            self._write_binary_cache(installs)
 
-            if _use_uuid:
-                with open(self._verifier_path, "w") as f:
-                    new_verifier = str(uuid.uuid4())
-                    f.write(new_verifier)
-                    self.last_seen_verifier = new_verifier
+            # The index now contains all the changes recorded in the journal
+            if os.path.exists(self._journal_path):
+                os.remove(self._journal_path)
+            self._journal_header, self._journal_offset = self._new_journal_header(), 0
+
+            self._write_verifier()
         except BaseException as e:
             tty.debug(e)
             # Clean up temp file if something goes wrong.
@@ -1094,6 +1486,164 @@ def _write(self, type, value, traceback):
                 os.remove(temp_file)
             raise
 
+    def _write_verifier(self):
+        if _use_uuid:
+            with open(self._verifier_path, "w") as f:
+                new_verifier = str(uuid.uuid4())
+                f.write(new_verifier)
+                self.last_seen_verifier = new_verifier
+
+    def _read_for_write(self):
+        """Read the database at the start of a write transaction. This does no locking."""
+        self._read()
+        if self.journal:
+            self._journal_snapshot = {key: _record_state(rec) for key, rec in self._data.items()}
+
+    def _new_journal_header(self) -> Dict[str, Any]:
+        """Return the header of a journal to be applied on top of the current index file."""
+        stat = os.stat(self._index_path)
+        return {"version": _DB_JOURNAL_VERSION, "index": [stat.st_mtime_ns, stat.st_size]}
+
+    def _read_journal_header(self, stream) -> Optional[Dict[str, Any]]:
+        line = stream.readline()
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            return sjson.load(line.decode("utf-8"))
+        except ValueError:
+            return None
+
+    def _can_append_to_journal(self) -> bool:
+        """Whether the changes of a write transaction can be appended to the journal,
+        instead of rewriting the index file. This does no locking.
+        """
+        if self._journal_header is None:
+            return False
+
+        try:
+            if self._journal_header != self._new_journal_header():
+                return False
+            journal_size = 0
+            if os.path.exists(self._journal_path):
+                # A journal for another index file must be removed by compaction
+                with open(self._journal_path, "rb") as f:
+                    if self._read_journal_header(f) != self._journal_header:
+                        return False
+                journal_size = os.path.getsize(self._journal_path)
+        except OSError:
+            return False
+
+        max_size = os.path.getsize(self._index_path) * _DB_JOURNAL_COMPACTION_RATIO
+        return journal_size < max(max_size, _DB_JOURNAL_MIN_COMPACTION_SIZE)
+
+    def _append_to_journal(self, snapshot: Dict[str, Tuple]):
+        """Append the records that changed since the snapshot to the journal.
+
+        This routine does no locking.
+        """
+        records: Dict[str, Optional[Dict[str, Any]]] = {}
+        for key, rec in self._data.items():
+            state = snapshot.get(key)
+            if state == _record_state(rec):
+                continue
+            entry = rec.to_dict(include_fields=self.record_fields)
+            # The spec of a record never changes, so it's written only for new records
+            if state is not None:
+                del entry["spec"]
+            records[key] = entry
+        for key in snapshot.keys() - self._data.keys():
+            records[key] = None
+
+        if not records:
+            return
+
+        assert self._journal_header is not None
+        with open(self._journal_path, "a+b") as f:
+            # Drop an incomplete entry left by an interrupted writer, so that the new
+            # entry doesn't get appended to it
+            _truncate_after_last_line(f)
+            if f.tell() == 0:
+                f.write(_journal_line(self._journal_header))
+            f.write(_journal_line({"records": records}))
+            self._journal_offset = f.tell()
+
+        self._write_verifier()
+
+    def _replay_journal(self) -> bool:
+        """Apply the journal entries that were not replayed yet to the in-memory records.
+
+        Returns False if the journal doesn't apply to the index file that was read last,
+        True otherwise. This routine does no locking.
+        """
+        if self._journal_header is None:
+            return False
+
+        try:
+            f = open(self._journal_path, "rb")
+        except FileNotFoundError:
+            # There is no journal yet for the current index
+            return self._journal_offset == 0 and self._journal_header == self._new_journal_header()
+
+        with f:
+            if self._read_journal_header(f) != self._journal_header:
+                return False
+            f.seek(max(self._journal_offset, f.tell()))
+            for line in f:
+                # Skip an incomplete entry, e.g. from a writer that was interrupted
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = sjson.load(line.decode("utf-8"))
+                except ValueError as e:
+                    raise CorruptDatabaseError(
+                        f"Invalid entry in Spack database journal: {e}", self._journal_path
+                    ) from e
+                self._apply_journal_records(entry["records"])
+                self._journal_offset = f.tell()
+        return True
+
+    def _apply_journal_records(self, records: Dict[str, Optional[Dict[str, Any]]]):
+        """Apply the records of a journal entry to the in-memory database."""
+        assert isinstance(_DB_VERSION, vn.StandardVersion)
+        spec_reader = reader(_DB_VERSION)
+        new_keys = []
+        for key, entry in records.items():
+            old = self._data.get(key)
+            if old is not None and not old.external and old.installed:
+                self._installed_prefixes.discard(old.path)
+
+            if entry is None:
+                if old is None:
+                    continue
+                del self._data[key]
+                self._index.remove(key)
+                if old.is_loaded:
+                    old.spec.detach(deptype=_TRACKED_DEPENDENCIES)
+                continue
+
+            if old is None:
+                entry["spec"][ht.dag_hash.name] = key
+                load_spec = functools.partial(
+                    self._load_lazy_spec, spec_reader, key, {key: entry}, self._data
+                )
+                record = InstallRecord.lazy_from_dict(load_spec, entry)
+                self._data[key] = record
+                new_keys.append((key, entry))
+            else:
+                record = old
+                updated = InstallRecord.from_dict(None, entry)
+                for field_name in _MUTABLE_RECORD_FIELDS:
+                    if field_name in entry:
+                        setattr(record, field_name, getattr(updated, field_name))
+
+            if not record.external and record.installed and record.path:
+                self._installed_prefixes.add(record.path)
+            self._index.update(key, record)
+
+        # Dependencies may be added later in the same entry, so check them at the end
+        for key, entry in new_keys:
+            self._check_dependencies(spec_reader, key, {key: entry}, self._data)
+
     def _read(self):
         """Re-read Database from the data in the set location. This does no locking."""
         if os.path.isfile(self._index_path):
@@ -1106,15 +1656,125 @@ def _read(self):
                     pass
             if (current_verifier != self.last_seen_verifier) or (current_verifier == ""):
                 self.last_seen_verifier = current_verifier
-                # Read from file if a database exists
-                self._read_from_file(self._index_path)
+                # Replay the journal if the index file didn't change, otherwise read
+                # from file if a database exists
+                if self._state_is_inconsistent or not self._replay_journal():
+                    self._read_index()
             elif self._state_is_inconsistent:
-                self._read_from_file(self._index_path)
+                self._read_index()
                 self._state_is_inconsistent = False
             return
         elif self.is_upstream:
             tty.warn("upstream not found: {0}".format(self._index_path))
 
+    def _load_all_specs(self):
+        """Build the specs of all lazy records. Does no locking."""
+        for rec in self._data.values():
+            rec.spec
+
+    def load_all_specs(self):
+        """Build the specs of all the records in this database and in its upstreams.
+
+        Specs of records are built lazily, and each spec only knows about the dependents
+        whose spec has already been built. This must be called before traversing specs
+        from the database towards their dependents.
+        """
+        with self.read_transaction():
+            self._load_all_specs()
+        for db in self.upstream_dbs:
+            db._load_all_specs()
+
+    def _read_index(self):
+        """Fill the database from its index file, using the binary cache if it is valid,
+        and replay the journal on top of it.
+
+        A stale or missing binary cache is regenerated from the index file, if the database
+        directory is writable. Does not do any locking.
+        """
+        if not self._read_from_binary_cache():
+            self._read_from_file(self._index_path)
+            if self._index_is_current and os.access(self.database_directory, os.W_OK):
+                self._write_binary_cache(
+                    {k: v.to_dict(include_fields=self.record_fields) for k, v in self._data.items()}
+                )
+
+        self._journal_header, self._journal_offset = None, 0
+        if self._index_is_current:
+            self._journal_header = self._new_journal_header()
+            self._replay_journal()
+
+    def _binary_cache_header(self) -> Dict[str, Any]:
+        """Return the metadata used to check that the binary cache matches the index file.
+
+        The index file is replaced by a rename on each write, so its modification time, size
+        and inode are enough to tell whether it changed, without reading it.
+        """
+        stat = os.stat(self._index_path)
+        return {
+            "version": _DB_BINARY_CACHE_VERSION,
+            "spack": spack.spack_version,
+            "db_version": str(_DB_VERSION),
+            "python": tuple(sys.version_info[:2]),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "inode": stat.st_ino,
+        }
+
+    def _binary_cache_is_trusted(self, stat: os.stat_result) -> bool:
+        """Whether the binary cache can be unpickled, i.e. whether it is owned by the current
+        user or by the owner of the store, who can write the index file anyway.
+        """
+        if sys.platform == "win32":
+            return True
+        return stat.st_uid in (os.getuid(), os.stat(self.root).st_uid)
+
+    def _write_binary_cache(self, installs: Dict[str, Dict[str, Any]]):
+        """Write the binary cache of the index file, next to it, from the installation
+        records that were written to the index file.
+
+        The JSON index file is the source of truth, so errors here are not fatal.
+        This routine does no locking.
+        """
+        temp_file = self._binary_cache_path + (".%s.%s.temp" % (socket.getfqdn(), os.getpid()))
+        try:
+            with open(temp_file, "wb") as f:
+                pickle.dump(self._binary_cache_header(), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(installs, f, protocol=pickle.HIGHEST_PROTOCOL)
+            fs.rename(temp_file, self._binary_cache_path)
+        except Exception as e:
+            tty.debug(f"Cannot write the binary cache of the database: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(temp_file)
+
+    def _read_from_binary_cache(self) -> bool:
+        """Fill the database from the binary cache of the index file. Like records read
+        from the index file, records read from the binary cache are lazy.
+
+        Returns True on success, False if the cache is missing, stale, or unreadable.
+        This routine does no locking.
+        """
+        if not os.path.isfile(self._binary_cache_path):
+            return False
+
+        try:
+            with open(self._binary_cache_path, "rb") as f:
+                if not self._binary_cache_is_trusted(os.fstat(f.fileno())):
+                    tty.debug(f"Ignoring binary cache of another user {self._binary_cache_path}")
+                    return False
+                header = pickle.load(f)
+                if header != self._binary_cache_header():
+                    tty.debug(f"Ignoring stale binary cache {self._binary_cache_path}")
+                    return False
+                installs = pickle.load(f)
+        except Exception as e:
+            tty.debug(f"Cannot read the binary cache of the database: {e}")
+            return False
+
+        assert isinstance(_DB_VERSION, vn.StandardVersion)
+        self._read_lazy_records(reader(_DB_VERSION), installs)
+        self._index_is_current = True
+        return True
+
     def _add(
         self,
         spec,
@@ -1229,6 +1889,7 @@ def _add(
             self._data[key].installation_time = _now()
 
         self._data[key].explicit = explicit
+        self._index.update(key, self._data[key])
 
     @_autospec
     def add(self, spec, directory_layout, explicit=False):
@@ -1272,6 +1933,7 @@ def _decrement_ref_count(self, spec):
 
         if rec.ref_count == 0 and not rec.installed:
             del self._data[key]
+            self._index.remove(key)
 
             for dep in spec.dependencies(deptype=_TRACKED_DEPENDENCIES):
                 self._decrement_ref_count(dep)
@@ -1300,6 +1962,7 @@ def _remove(self, spec):
             return rec.spec
 
         del self._data[key]
+        self._index.remove(key)
 
         # Remove any reference to this node from dependencies and
         # decrement the reference count
@@ -1373,8 +2036,10 @@ def mark(self, spec, key, value):
             return self._mark(spec, key, value)
 
     def _mark(self, spec, key, value):
-        record = self._data[self._get_matching_spec_key(spec)]
+        hash_key = self._get_matching_spec_key(spec)
+        record = self._data[hash_key]
         setattr(record, key, value)
+        self._index.update(hash_key, record)
 
     @_autospec
     def deprecate(self, spec, deprecator):
@@ -1394,8 +2059,14 @@ def installed_relatives(
         if direction not in ("parents", "children"):
             raise ValueError("Invalid direction: %s" % direction)
 
+        with self.read_transaction():
+            # Dependents are known only for specs that have been built
+            if direction == "parents":
+                self.load_all_specs()
+            specs = self.query(spec)
+
         relatives = set()
-        for spec in self.query(spec):
+        for spec in specs:
             if transitive:
                 to_add = spec.traverse(direction=direction, root=False, deptype=deptype)
             elif direction == "parents":
@@ -1545,61 +2216,92 @@ def _query(
                 else:
                     return []
 
-        # Abstract specs require more work -- currently we test
-        # against everything.
-        results = []
+        # Abstract specs require more work -- first we use the indexes to restrict
+        # the set of candidate records, then we test against each candidate.
+        candidates = self._query_candidates(explicit, start_date, end_date)
+
         start_date = start_date or datetime.datetime.min
         end_date = end_date or datetime.datetime.max
 
-        # save specs whose name doesn't match for last, to avoid a virtual check
-        deferred = []
-
-        for key, rec in self._data.items():
-            if hashes is not None and rec.spec.dag_hash() not in hashes:
-                continue
+        def matches_filters(key, rec):
+            if hashes is not None and key not in hashes:
+                return False
 
             if origin and not (origin == rec.origin):
-                continue
+                return False
 
             if not rec.install_type_matches(installed):
-                continue
+                return False
 
             if in_buildcache is not any and rec.in_buildcache != in_buildcache:
-                continue
+                return False
 
             if explicit is not any and rec.explicit != explicit:
-                continue
+                return False
 
-            if known is not any and known(rec.spec.name):
-                continue
+            if known is not any and known(rec.name):
+                return False
 
-            if start_date or end_date:
-                inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
-                if not (start_date < inst_date < end_date):
-                    continue
+            inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
+            return start_date < inst_date < end_date
 
-            if query_spec is any:
-                results.append(rec.spec)
-                continue
+        def select(keys=None):
+            if keys is None and candidates is None:
+                keys = self._data.keys()
+            else:
+                if keys is None:
+                    keys = candidates
+                elif candidates is not None:
+                    keys = keys & candidates
+                # Keep the order of the records in the database, regardless of the index used
+                keys = self._index.ordered(keys)
+            records = ((key, self._data[key]) for key in keys if key in self._data)
+            return [rec.spec for key, rec in records if matches_filters(key, rec)]
+
+        if query_spec is any:
+            return select()
+
+        # anonymous specs are checked against every candidate
+        if not query_spec.name:
+            return [spec for spec in select() if spec.satisfies(query_spec)]
+
+        # check exact name matches first
+        results = [
+            spec
+            for spec in select(self._index.named(query_spec.name))
+            if spec.satisfies(query_spec)
+        ]
 
-            # check anon specs and exact name matches first
-            if not query_spec.name or rec.spec.name == query_spec.name:
-                if rec.spec.satisfies(query_spec):
-                    results.append(rec.spec)
+        # Checking for virtuals is expensive, so we do it last and only if needed. If we
+        # found something, the query spec can't be virtual b/c we matched an actual package
+        # installation, so skip the virtual check entirely. If we *didn't* find anything,
+        # check the indexed providers *if* the query is virtual.
+        if not results and query_spec.virtual:
+            providers = self._index.providers(query_spec.name)
+            results = [spec for spec in select(providers) if spec.satisfies(query_spec)]
 
-            # save potential virtual matches for later, but not if we already found a match
-            elif not results:
-                deferred.append(rec.spec)
+        return results
 
-        # Checking for virtuals is expensive, so we save it for last and only if needed.
-        # If we get here, we didn't find anything in the DB that matched by name.
-        # If we did fine something, the query spec can't be virtual b/c we matched an actual
-        # package installation, so skip the virtual check entirely. If we *didn't* find anything,
-        # check all the deferred specs *if* the query is virtual.
-        if not results and query_spec is not any and deferred and query_spec.virtual:
-            results = [spec for spec in deferred if spec.satisfies(query_spec)]
+    def _query_candidates(self, explicit, start_date, end_date) -> Optional[Set[str]]:
+        """Return the hashes of the records that may match the query arguments, using
+        the secondary indexes, or None if the indexes can't restrict the search.
+        """
+        candidates = None
+        if explicit is True:
+            candidates = set(self._index.explicit)
 
-        return results
+        if start_date or end_date:
+            try:
+                start = start_date.timestamp() if start_date else -math.inf
+                end = end_date.timestamp() if end_date else math.inf
+            except (OverflowError, OSError, ValueError):
+                # Dates that can't be represented as timestamps don't restrict the search
+                return candidates
+
+            in_range = self._index.installed_between(start, end)
+            candidates = in_range if candidates is None else candidates & in_range
+
+        return candidates
 
     if _query.__doc__ is None:
         _query.__doc__ = ""
@@ -1726,6 +2428,9 @@ def update_explicit(self, spec, explicit):
                 status = "explicit" if explicit else "implicit"
                 tty.debug(message.format(status, s=spec))
                 rec.explicit = explicit
+                key = rec.spec.dag_hash()
+                if self._data.get(key) is rec:
+                    self._index.update(key, rec)
 
 
 class UpstreamDatabaseLockingError(SpackError):
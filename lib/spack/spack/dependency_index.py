@@ -0,0 +1,244 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Classes and functions to compute the possible dependencies of packages, without loading
+package classes."""
+import glob
+import hashlib
+import inspect
+import os
+import sys
+import types
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Set
+
+import llnl.util.lang
+
+import spack
+import spack.deptypes as dt
+import spack.error
+import spack.paths
+import spack.util.naming as nm
+import spack.util.spack_json as sjson
+
+
+@llnl.util.lang.memoized
+def sources_digest() -> str:
+    """Digest of the Spack version, and of the sources that determine the dependencies of a
+    package besides its ``package.py``: build system base classes, directives, and the static
+    reader of package metadata. Indexes computed with a different digest are outdated."""
+    module_path = spack.paths.module_path
+    paths = sorted(glob.glob(os.path.join(module_path, "build_systems", "*.py")))
+    paths.extend(
+        os.path.join(module_path, *name.split("/"))
+        for name in (
+            "dependency.py",
+            "dependency_index.py",
+            "directives.py",
+            "util/package_metadata.py",
+        )
+    )
+    sha = hashlib.sha256(spack.spack_version.encode("utf-8"))
+    for path in paths:
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def class_dependencies(pkg_cls) -> Dict[str, dt.DepFlag]:
+    """Returns the direct dependencies of a package class, mapped to the union of their types"""
+    result: Dict[str, dt.DepFlag] = {}
+    for name, dependencies in pkg_cls.dependencies_by_name().items():
+        for dependency in dependencies:
+            result[name] = result.get(name, 0) | dependency.depflag
+    return result
+
+
+def imported_package_modules(pkg_cls) -> List[str]:
+    """Returns the names of the modules of other packages in the same repository, that the
+    module of a package class imports from, or that define its base classes. The dependencies
+    of the package class may change when those modules change."""
+    namespace, _, own_module = pkg_cls.__module__.rpartition(".")
+    own_module = nm.spack_module_to_python_module(own_module)
+    objs = [*pkg_cls.__mro__]
+    module = sys.modules.get(pkg_cls.__module__)
+    if module is not None:
+        objs.extend(vars(module).values())
+
+    result = set()
+    for obj in objs:
+        if isinstance(obj, types.ModuleType):
+            module_name = obj.__name__
+        elif inspect.isclass(obj) or inspect.isfunction(obj):
+            module_name = obj.__module__
+        else:
+            continue
+        parent, _, name = module_name.rpartition(".")
+        name = nm.spack_module_to_python_module(name)
+        if parent == namespace and name != own_module:
+            result.add(name)
+    return sorted(result)
+
+
+class DependencyIndex(Mapping):
+    """Maps package names to their direct dependencies, and to the union of the types of
+    each dependency. Virtual dependencies are expanded with the provider index of the
+    repository.
+
+    For packages whose modules import from the modules of other packages, the names of those
+    modules are also stored, so that the packages can be indexed again when they change."""
+
+    def __init__(self, repository):
+        self._dependencies: Dict[str, Dict[str, dt.DepFlag]] = {}
+        self._imports: Dict[str, List[str]] = {}
+        self.repository = repository
+
+    def to_json(self, stream):
+        sjson.dump({"dependencies": self._dependencies, "imports": self._imports}, stream)
+
+    @staticmethod
+    def from_json(stream, repository):
+        d = sjson.load(stream)
+
+        if not isinstance(d, dict):
+            raise DependencyIndexError("DependencyIndex data was not a dict.")
+
+        if "dependencies" not in d:
+            raise DependencyIndexError("DependencyIndex data does not start with 'dependencies'")
+
+        r = DependencyIndex(repository=repository)
+        r._dependencies = d["dependencies"]
+        r._imports = d.get("imports", {})
+        return r
+
+    def __getitem__(self, pkg_name):
+        return self._dependencies[pkg_name]
+
+    def __iter__(self):
+        return iter(self._dependencies)
+
+    def __len__(self):
+        return len(self._dependencies)
+
+    def merge(self, other):
+        """Merge another dependency index into this one. Packages in the other index take
+        precedence over packages with the same name in this one.
+
+        Args:
+            other (DependencyIndex): dependency index to be merged
+        """
+        self._dependencies.update((name, dict(deps)) for name, deps in other.items())
+
+    def update_package(self, pkg_name, dependencies=None, imports=None):
+        """Updates a package in the dependency index.
+
+        Args:
+            pkg_name (str): name of the package to be updated
+            dependencies (dict): dependencies of the package, mapped to their types. If not
+                given, they are read from the package, together with its imports
+            imports (list): modules of other packages imported by the module of the package
+        """
+        if dependencies is None:
+            dependencies, imports = self.package_dependencies(pkg_name)
+        self._dependencies[pkg_name] = dict(sorted(dependencies.items()))
+        if imports:
+            self._imports[pkg_name] = sorted(imports)
+        else:
+            self._imports.pop(pkg_name, None)
+
+    def package_dependencies(self, pkg_name):
+        """Returns the dependencies of a package, as stored in the index, and the modules of
+        other packages it imports."""
+        pkg_cls = self.repository.get_pkg_class(pkg_name)
+        return class_dependencies(pkg_cls), imported_package_modules(pkg_cls)
+
+    def packages_importing(self, pkg_names) -> Set[str]:
+        """Returns the names of the packages whose modules import from the modules of the
+        given packages."""
+        modules = {nm.spack_module_to_python_module(name) for name in pkg_names}
+        return {name for name, imports in self._imports.items() if modules.intersection(imports)}
+
+    def dependencies_of_type(self, pkg_name: str, depflag: dt.DepFlag) -> Set[str]:
+        """Returns the names of the dependencies of a package that can possibly have these
+        types, like ``PackageBase.dependencies_of_type``."""
+        return {
+            name for name, flag in self._dependencies.get(pkg_name, {}).items() if depflag & flag
+        }
+
+    def possible_dependencies(
+        self,
+        *pkg_names: str,
+        transitive: bool = True,
+        expand_virtuals: bool = True,
+        depflag: dt.DepFlag = dt.ALL,
+        visited: Optional[dict] = None,
+        missing: Optional[dict] = None,
+        virtuals: Optional[set] = None,
+        overrides: Optional[Dict[str, Dict[str, dt.DepFlag]]] = None,
+    ) -> Dict[str, Set[str]]:
+        """Return the possible dependencies of packages, computed from the index.
+
+        The arguments and the result are the same as for ``PackageBase.possible_dependencies``.
+        Direct dependencies of the packages in ``overrides`` are taken from there, instead of
+        from the index, e.g. for package classes that are not in the repository.
+        """
+        visited = {} if visited is None else visited
+        missing = {} if missing is None else missing
+        dependencies = self._dependencies
+        if overrides:
+            dependencies = {**self._dependencies, **overrides}
+        providers: Dict[str, Set[str]] = {}
+
+        def _providers(name):
+            if name not in providers:
+                providers[name] = {x.name for x in self.repository.providers_for(name)}
+            return providers[name]
+
+        def _visit(pkg_name):
+            visited.setdefault(pkg_name, set())
+
+            for name, flag in dependencies[pkg_name].items():
+                # check whether this dependency could be of the type asked for
+                if not (depflag & flag):
+                    continue
+
+                # expand virtuals if enabled, otherwise just stop at virtuals
+                if self.repository.is_virtual(name):
+                    if virtuals is not None:
+                        virtuals.add(name)
+                    if not expand_virtuals:
+                        visited[pkg_name].add(name)
+                        visited.setdefault(name, set())
+                        continue
+                    dep_names = sorted(_providers(name))
+                else:
+                    dep_names = [name]
+
+                visited[pkg_name].update(dep_names)
+
+                for dep_name in dep_names:
+                    if dep_name in visited:
+                        continue
+
+                    visited.setdefault(dep_name, set())
+
+                    # skip the rest if not transitive
+                    if not transitive:
+                        continue
+
+                    if dep_name not in dependencies or not self.repository.exists(dep_name):
+                        # log unknown packages
+                        missing.setdefault(pkg_name, set()).add(dep_name)
+                        continue
+
+                    _visit(dep_name)
+
+        for pkg_name in pkg_names:
+            _visit(pkg_name)
+
+        return visited
+
+
+class DependencyIndexError(spack.error.SpackError):
+    """Raised when there is a problem with a DependencyIndex."""
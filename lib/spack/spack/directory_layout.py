@@ -12,6 +12,7 @@
 import sys
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict
 
 import llnl.util.filesystem as fs
 import llnl.util.tty as tty
@@ -20,6 +21,7 @@
 import spack.config
 import spack.hash_types as ht
 import spack.spec
+import spack.util.parallel
 import spack.util.spack_json as sjson
 from spack.error import SpackError
 
@@ -39,6 +41,48 @@ def _check_concrete(spec):
         raise ValueError("Specs passed to a DirectoryLayout must be concrete!")
 
 
+#: Minimum number of installation prefixes probed by each task in ``all_specs``
+_PREFIXES_PER_TASK = 64
+
+
+def _spec_file_tasks(layout, prefixes, processes):
+    """Split a list of installation prefixes into contiguous chunks, so that merging the
+    results of ``_read_spec_files`` by task index preserves the order of the prefixes.
+    """
+    ntasks = max(1, min(4 * processes, len(prefixes) // _PREFIXES_PER_TASK))
+    if processes <= 1:
+        ntasks = 1
+    size, extra = divmod(len(prefixes), ntasks)
+    tasks, start = [], 0
+    for i in range(ntasks):
+        end = start + size + (1 if i < extra else 0)
+        tasks.append((i, layout, prefixes[start:end]))
+        start = end
+    return tasks
+
+
+def _read_spec_files(args):
+    """Read the spec files of a chunk of installation prefixes.
+
+    Errors are returned as ``(message, long_message)`` tuples, so that they can be
+    reported with their original type by the parent process.
+    """
+    idx, layout, prefixes = args
+    specs, errors = [], []
+    for prefix in prefixes:
+        metadata_dir = os.path.join(prefix, layout.metadata_dir)
+        for name in (layout.spec_file_name, layout._spec_file_name_yaml):
+            path = os.path.join(metadata_dir, name)
+            if not os.path.isfile(path):
+                continue
+            try:
+                specs.append(layout.read_spec(path))
+            except SpecReadError as e:
+                errors.append((e.message, e.long_message))
+            break
+    return idx, specs, errors
+
+
 class DirectoryLayout:
     """A directory layout is used to associate unique paths with specs.
     Different installations are going to want different layouts for their
@@ -271,22 +315,44 @@ def ensure_installed(self, spec):
                 "Spec file in %s does not match hash!" % spec_file_path
             )
 
-    def all_specs(self):
+    def all_specs(self, processes: int = 1):
+        """Read the specs of all the installations under the root of this layout.
+
+        Args:
+            processes: number of worker processes used to look for spec files in the
+                installation prefixes and to parse them
+        """
         if not os.path.isdir(self.root):
             return []
 
-        specs = []
+        # Listing the candidate prefixes is cheap, probing and parsing their
+        # spec files is what dominates on large stores and network filesystems
+        prefixes: Dict[str, None] = {}
         for _, path_scheme in self.projections.items():
             path_elems = ["*"] * len(path_scheme.split(posixpath.sep))
-            # NOTE: Does not validate filename extension; should happen later
-            path_elems += [self.metadata_dir, "spec.json"]
             pattern = os.path.join(self.root, *path_elems)
-            spec_files = glob.glob(pattern)
-            if not spec_files:  # we're probably looking at legacy yaml...
-                path_elems += [self.metadata_dir, "spec.yaml"]
-                pattern = os.path.join(self.root, *path_elems)
-                spec_files = glob.glob(pattern)
-            specs.extend([self.read_spec(s) for s in spec_files])
+            prefixes.update((p, None) for p in glob.glob(pattern))
+
+        tasks = _spec_file_tasks(self, list(prefixes), processes)
+        results = []
+        for i, result in enumerate(
+            spack.util.parallel.imap_unordered(
+                _read_spec_files, tasks, processes=min(processes, len(tasks)), debug=tty.is_debug()
+            )
+        ):
+            results.append(result)
+            percentage = (i + 1) / len(tasks) * 100
+            tty.debug(f"[{percentage:3.0f}%] read {len(result[1])} spec files")
+
+        # Merge results in a deterministic order, and report the first error, if any
+        results.sort(key=lambda x: x[0])
+        specs = []
+        for _, chunk, errors in results:
+            if errors:
+                raise SpecReadError(*errors[0])
+            for spec in chunk:
+                spec._mark_concrete()
+            specs.extend(chunk)
         return specs
 
     def all_deprecated_specs(self):
@@ -25,7 +25,6 @@
 from llnl.util.symlink import readlink, symlink
 
 import spack.compilers
-import spack.concretize
 import spack.config
 import spack.deptypes as dt
 import spack.error
@@ -40,8 +39,6 @@
 import spack.spec
 import spack.stage
 import spack.store
-import spack.subprocess_context
-import spack.user_environment as uenv
 import spack.util.cpus
 import spack.util.environment
 import spack.util.hash
@@ -53,7 +50,6 @@
 import spack.util.url
 import spack.version
 from spack import traverse
-from spack.installer import PackageInstaller
 from spack.schema.env import TOP_LEVEL_KEY
 from spack.spec import Spec
 from spack.spec_list import InvalidSpecConstraintError, SpecList
@@ -1553,6 +1549,8 @@ def _concretize_together(
         """Concretization strategy that concretizes all the specs
         in the same DAG.
         """
+        import spack.concretize
+
         # Exit early if the set of concretized specs is the set of user specs
         new_user_specs, kept_user_specs, specs_to_concretize = self._get_specs_to_concretize()
         if not new_user_specs:
@@ -1800,6 +1798,8 @@ def check_views(self):
     def _env_modifications_for_view(
         self, view: ViewDescriptor, reverse: bool = False
     ) -> spack.util.environment.EnvironmentModifications:
+        import spack.user_environment as uenv
+
         try:
             with spack.store.STORE.db.read_transaction():
                 installed_roots = [s for s in self.concrete_roots() if s.installed]
@@ -1822,6 +1822,8 @@ def add_view_to_env(
         Args:
             env_mod: the environment modifications object that is modified.
             view: the name of the view to activate."""
+        import spack.user_environment as uenv
+
         descriptor = self.views.get(view)
         if not descriptor:
             return env_mod
@@ -1844,6 +1846,8 @@ def rm_view_from_env(
         Args:
             env_mod: the environment modifications object that is modified.
             view: the name of the view to deactivate."""
+        import spack.user_environment as uenv
+
         descriptor = self.views.get(view)
         if not descriptor:
             return env_mod
@@ -1944,6 +1948,8 @@ def install_all(self, **install_args):
         self.install_specs(None, **install_args)
 
     def install_specs(self, specs: Optional[List[Spec]] = None, **install_args):
+        from spack.installer import PackageInstaller
+
         roots = self.concrete_roots()
         specs = specs if specs is not None else roots
 
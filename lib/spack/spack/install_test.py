@@ -24,7 +24,6 @@
 import spack.error
 import spack.paths
 import spack.util.spack_json as sjson
-from spack.installer import InstallError
 from spack.spec import Spec
 from spack.util.prefix import Prefix
 
@@ -114,6 +113,8 @@ def cache_extra_test_sources(pkg: Pb, srcs: ListOrStringType):
             or do not exist
             under the build stage
     """
+    from spack.installer import InstallError  # avoid circular import
+
     errors = []
     paths = [srcs] if isinstance(srcs, str) else srcs
     for path in paths:
@@ -345,7 +346,7 @@ def status(self, name: str, status: "TestStatus", msg: Optional[str] = None):
         self.counts[status] += 1
 
     def phase_tests(
-        self, builder: spack.builder.Builder, phase_name: str, method_names: List[str]
+        self, builder: "spack.builder.Builder", phase_name: str, method_names: List[str]
     ):
         """Execute the builder's package phase-time tests.
 
@@ -26,18 +26,23 @@
 installations of packages in a Spack instance.
 """
 
+import collections
+import contextlib
 import copy
+import functools
 import glob
 import heapq
 import io
 import itertools
+import json
 import os
 import shutil
 import sys
+import threading
 import time
 from collections import defaultdict
 from gzip import GzipFile
-from typing import Dict, Iterator, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import llnl.util.filesystem as fs
 import llnl.util.lock as lk
@@ -48,7 +53,9 @@
 
 import spack.binary_distribution as binary_distribution
 import spack.build_environment
+import spack.caches
 import spack.compilers
+import spack.concretize
 import spack.config
 import spack.database
 import spack.deptypes as dt
@@ -60,7 +67,9 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.util.cpus
 import spack.util.executable
+import spack.util.file_cache
 import spack.util.path
 import spack.util.timer as timer
 from spack.util.environment import EnvironmentModifications, dump_environment
@@ -91,6 +100,15 @@
 #: queue invariants).
 STATUS_REMOVED = "removed"
 
+#: Error message when the installation is stopped at the first failure
+FAIL_FAST_ERR = "Terminating after first install failure"
+
+#: Maximum number of binary packages downloaded at the same time ahead of their installation
+BINARY_PREFETCH_WORKERS = 4
+
+#: Seconds to wait for running downloads of binary packages when the installation stops
+BINARY_PREFETCH_SHUTDOWN_TIMEOUT = 5.0
+
 
 def _write_timer_json(pkg, timer, cache):
     extra_attributes = {"name": pkg.name, "cache": cache, "hash": pkg.spec.dag_hash()}
@@ -102,6 +120,211 @@ def _write_timer_json(pkg, timer, cache):
         return
 
 
+class BuildDurations:
+    """Persistent record of the time needed to build packages from sources.
+
+    Durations are read from the ``install_times.json`` file of each package built from
+    sources, and stored in the misc cache keyed by package name and version. They are
+    used to estimate the critical path of an installation.
+    """
+
+    #: Key of the record in the misc cache
+    cache_key = "build_durations.json"
+
+    #: File cache storing the record, if not the misc cache
+    cache: Optional[spack.util.file_cache.FileCache] = None
+
+    def __init__(self) -> None:
+        self._durations: Optional[Dict[str, Dict[str, float]]] = None
+
+    @property
+    def durations(self) -> Dict[str, Dict[str, float]]:
+        if self._durations is None:
+            self._durations = self._read()
+        return self._durations
+
+    def _file_cache(self):
+        return spack.caches.MISC_CACHE if self.cache is None else self.cache
+
+    def _read(self) -> Dict[str, Dict[str, float]]:
+        try:
+            cache = self._file_cache()
+            if not cache.init_entry(self.cache_key):
+                return {}
+            with cache.read_transaction(self.cache_key) as f:
+                return json.load(f)["durations"]
+        except (OSError, ValueError, KeyError, spack.error.SpackError) as e:
+            tty.debug(f"Cannot read build durations: {e}")
+            return {}
+
+    def get(self, spec: "spack.spec.Spec") -> Optional[float]:
+        """Return the time needed to build a spec, in seconds, or None if unknown.
+
+        If the version of the spec was never built, the mean over the other versions
+        of the same package is returned.
+        """
+        by_version = self.durations.get(spec.name)
+        if not by_version:
+            return None
+        version = str(spec.version)
+        if version in by_version:
+            return by_version[version]
+        return sum(by_version.values()) / len(by_version)
+
+    def record(self, pkg: "spack.package_base.PackageBase") -> None:
+        """Record the time needed to build a package, from its ``install_times.json``"""
+        try:
+            with open(pkg.times_log_path) as f:
+                seconds = float(json.load(f)["total"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            tty.debug(f"Cannot read the build time of {pkg.name}: {e}")
+            return
+
+        try:
+            cache = self._file_cache()
+            cache.init_entry(self.cache_key)
+            with cache.write_transaction(self.cache_key) as (old, new):
+                durations = json.load(old)["durations"] if old else {}
+                by_version = durations.setdefault(pkg.name, {})
+                by_version[str(pkg.spec.version)] = seconds
+                json.dump({"durations": durations}, new)
+        except (OSError, ValueError, KeyError, spack.error.SpackError) as e:
+            tty.debug(f"Cannot record the build time of {pkg.name}: {e}")
+            return
+        self._durations = durations
+
+
+class BinaryPrefetcher:
+    """Download binary packages ahead of their installation, in a bounded number of threads,
+    so that downloads overlap with the extraction and relocation of other packages.
+
+    Packages are downloaded in the order they are submitted. Since forking a process while
+    other threads are running is unsafe, downloads must be paused while build processes
+    are started, and resume as soon as the child processes are running.
+    """
+
+    def __init__(self, workers: int = BINARY_PREFETCH_WORKERS) -> None:
+        self.workers = workers
+        self.paused = False
+        self.stopped = threading.Event()
+        # Guards results, which are written by the download threads
+        self.lock = threading.Lock()
+        self.pending: "collections.OrderedDict[str, Tuple[spack.spec.Spec, Optional[bool], list]]"
+        self.pending = collections.OrderedDict()
+        self.running: Dict[str, threading.Thread] = {}
+        self.results: Dict[str, Tuple[Optional[dict], Optional[Exception]]] = {}
+
+    def __contains__(self, spec: "spack.spec.Spec") -> bool:
+        key = spec.dag_hash()
+        return key in self.pending or key in self.running or key in self.results
+
+    def submit(self, spec: "spack.spec.Spec", unsigned: Optional[bool]) -> None:
+        """Queue the download of the binary package of a spec, if any mirror has one"""
+        key = spec.dag_hash()
+        if spec in self:
+            return
+        matches = binary_distribution.get_mirrors_for_spec(spec, index_only=True)
+        if not matches:
+            return
+        self.pending[key] = (spec, unsigned, matches)
+        self._start_downloads()
+
+    def download(
+        self, spec: "spack.spec.Spec", unsigned: Optional[bool] = False, mirrors_for_spec=None
+    ) -> Optional[dict]:
+        """Return the result of ``binary_distribution.download_tarball`` for a spec, waiting
+        for its download to be done if it was submitted, or downloading it now otherwise.
+
+        Args:
+            spec: concrete spec of the binary package
+            unsigned: signature verification override, used if the spec was not submitted
+            mirrors_for_spec: mirrors to look at first, used if the spec was not submitted
+        """
+        key = spec.dag_hash()
+        if key in self.pending:
+            spec, unsigned, matches = self.pending.pop(key)
+            return binary_distribution.download_tarball(spec, unsigned, matches)
+
+        if key in self.running:
+            self.running.pop(key).join()
+            self._start_downloads()
+
+        with self.lock:
+            entry = self.results.pop(key, None)
+        if entry is None:
+            return binary_distribution.download_tarball(spec, unsigned, mirrors_for_spec)
+
+        result, error = entry
+        if error is not None:
+            raise error
+        return result
+
+    def _download(self, key: str, spec: "spack.spec.Spec", unsigned: Optional[bool], matches):
+        if self.stopped.is_set():
+            return
+        entry: Tuple[Optional[dict], Optional[Exception]]
+        try:
+            entry = (binary_distribution.download_tarball(spec, unsigned, matches), None)
+        except Exception as e:
+            entry = (None, e)
+
+        with self.lock:
+            if not self.stopped.is_set():
+                self.results[key] = entry
+                return
+
+        # The prefetcher was shut down while downloading, so nobody will use the result
+        if entry[0] is not None:
+            binary_distribution._delete_staged_downloads(entry[0])
+
+    def _start_downloads(self) -> None:
+        for key, thread in list(self.running.items()):
+            if not thread.is_alive():
+                del self.running[key]
+
+        while (
+            not self.paused
+            and not self.stopped.is_set()
+            and self.pending
+            and len(self.running) < self.workers
+        ):
+            key, args = self.pending.popitem(last=False)
+            thread = threading.Thread(target=self._download, args=(key, *args), daemon=True)
+            self.running[key] = thread
+            thread.start()
+
+    @contextlib.contextmanager
+    def paused_downloads(self):
+        """Wait for running downloads to be done, and don't start new ones in the context"""
+        self.paused = True
+        for thread in self.running.values():
+            thread.join()
+        try:
+            yield
+        finally:
+            self.paused = False
+            self._start_downloads()
+
+    def shutdown(self, timeout: float = BINARY_PREFETCH_SHUTDOWN_TIMEOUT) -> None:
+        """Stop downloading packages, and remove the ones that were not installed.
+
+        Running downloads can't be interrupted, so they are waited for at most ``timeout``
+        seconds in total. Downloads that are still running afterwards remove their result
+        when they are done.
+        """
+        self.stopped.set()
+        self.pending.clear()
+        deadline = time.monotonic() + timeout
+        for thread in self.running.values():
+            thread.join(max(deadline - time.monotonic(), 0))
+        self.running.clear()
+        with self.lock:
+            for result, _ in self.results.values():
+                if result is not None:
+                    binary_distribution._delete_staged_downloads(result)
+            self.results.clear()
+
+
 class InstallAction:
     #: Don't perform an install
     NONE = 0
@@ -382,7 +605,10 @@ def _print_timer(pre: str, pkg_id: str, timer: timer.BaseTimer) -> None:
 
 
 def _install_from_cache(
-    pkg: "spack.package_base.PackageBase", explicit: bool, unsigned: Optional[bool] = False
+    pkg: "spack.package_base.PackageBase",
+    explicit: bool,
+    unsigned: Optional[bool] = False,
+    prefetcher: Optional[BinaryPrefetcher] = None,
 ) -> bool:
     """
     Install the package from binary cache
@@ -392,15 +618,26 @@ def _install_from_cache(
         explicit: ``True`` if installing the package was explicitly
             requested by the user, otherwise, ``False``
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        prefetcher: downloads of binary packages started ahead of time, if any
 
     Return: ``True`` if the package was extract from binary cache, ``False`` otherwise
     """
     t = timer.Timer()
     installed_from_cache = _try_install_from_binary_cache(
-        pkg, explicit, unsigned=unsigned, timer=t
+        pkg, explicit, unsigned=unsigned, timer=t, prefetcher=prefetcher
     )
     if not installed_from_cache:
         return False
+    _finalize_install_from_cache(pkg, explicit, t)
+    return True
+
+
+def _finalize_install_from_cache(
+    pkg: "spack.package_base.PackageBase", explicit: bool, t: timer.Timer
+) -> None:
+    """Report the installation of a package extracted from binary cache, and run the
+    post-install hooks.
+    """
     t.stop()
 
     pkg_id = package_id(pkg.spec)
@@ -410,7 +647,6 @@ def _install_from_cache(
     _print_timer(pre=_log_prefix(pkg.name), pkg_id=pkg_id, timer=t)
     _print_installed_pkg(pkg.spec.prefix)
     spack.hooks.post_install(pkg.spec, explicit)
-    return True
 
 
 def _process_external_package(pkg: "spack.package_base.PackageBase", explicit: bool) -> None:
@@ -460,6 +696,7 @@ def _process_binary_cache_tarball(
     unsigned: Optional[bool],
     mirrors_for_spec: Optional[list] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    prefetcher: Optional[BinaryPrefetcher] = None,
 ) -> bool:
     """
     Process the binary cache tarball.
@@ -471,15 +708,19 @@ def _process_binary_cache_tarball(
         mirrors_for_spec: Optional list of concrete specs and mirrors
         obtained by calling binary_distribution.get_mirrors_for_spec().
         timer: timer to keep track of binary install phases.
+        prefetcher: if given, the tarball is obtained from the downloads it started
 
     Return:
         bool: ``True`` if the package was extracted from binary cache,
             else ``False``
     """
     with timer.measure("fetch"):
-        download_result = binary_distribution.download_tarball(
-            pkg.spec, unsigned, mirrors_for_spec
-        )
+        if prefetcher is not None:
+            download_result = prefetcher.download(pkg.spec, unsigned, mirrors_for_spec)
+        else:
+            download_result = binary_distribution.download_tarball(
+                pkg.spec, unsigned, mirrors_for_spec
+            )
 
         if download_result is None:
             return False
@@ -487,22 +728,57 @@ def _process_binary_cache_tarball(
     tty.msg(f"Extracting {package_id(pkg.spec)} from binary cache")
 
     with timer.measure("install"), spack.util.path.filter_padding():
-        binary_distribution.extract_tarball(pkg.spec, download_result, force=False, timer=timer)
-        pkg.windows_establish_runtime_linkage()
-
-        if hasattr(pkg, "_post_buildcache_install_hook"):
-            pkg._post_buildcache_install_hook()
-
+        _extract_binary_cache_tarball(pkg, download_result, timer=timer)
         pkg.installed_from_binary_cache = True
         spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
         return True
 
 
+def _extract_binary_cache_tarball(
+    pkg: "spack.package_base.PackageBase",
+    download_result: dict,
+    timer: timer.BaseTimer = timer.NULL_TIMER,
+) -> None:
+    """Extract and relocate a downloaded binary package into the prefix of its spec"""
+    binary_distribution.extract_tarball(pkg.spec, download_result, force=False, timer=timer)
+    pkg.windows_establish_runtime_linkage()
+
+    if hasattr(pkg, "_post_buildcache_install_hook"):
+        pkg._post_buildcache_install_hook()
+
+
+def _download_from_binary_cache(
+    pkg: "spack.package_base.PackageBase",
+    unsigned: Optional[bool],
+    timer: timer.BaseTimer = timer.NULL_TIMER,
+    prefetcher: Optional[BinaryPrefetcher] = None,
+) -> Optional[dict]:
+    """Search for the binary package of a spec, and download it.
+
+    Return:
+        The result of ``binary_distribution.download_tarball``, or ``None`` if there is
+        no binary package for the spec.
+    """
+    if not spack.mirror.MirrorCollection(binary=True):
+        return None
+
+    if prefetcher is not None and pkg.spec in prefetcher:
+        with timer.measure("fetch"):
+            return prefetcher.download(pkg.spec, unsigned)
+
+    with timer.measure("search"):
+        matches = binary_distribution.get_mirrors_for_spec(pkg.spec, index_only=True)
+
+    with timer.measure("fetch"):
+        return binary_distribution.download_tarball(pkg.spec, unsigned, matches)
+
+
 def _try_install_from_binary_cache(
     pkg: "spack.package_base.PackageBase",
     explicit: bool,
     unsigned: Optional[bool] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    prefetcher: Optional[BinaryPrefetcher] = None,
 ) -> bool:
     """
     Try to extract the package from binary cache.
@@ -512,11 +788,17 @@ def _try_install_from_binary_cache(
         explicit: the package was explicitly requested by the user
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
         timer: timer to keep track of binary install phases.
+        prefetcher: downloads of binary packages started ahead of time, if any
     """
     # Early exit if no binary mirrors are configured.
     if not spack.mirror.MirrorCollection(binary=True):
         return False
 
+    if prefetcher is not None and pkg.spec in prefetcher:
+        return _process_binary_cache_tarball(
+            pkg, explicit, unsigned, timer=timer, prefetcher=prefetcher
+        )
+
     tty.debug(f"Searching for binary cache of {package_id(pkg.spec)}")
 
     with timer.measure("search"):
@@ -803,6 +1085,7 @@ def __str__(self) -> str:
     def _add_default_args(self) -> None:
         """Ensure standard install options are set to at least the default."""
         for arg, default in [
+            ("concurrent_packages", 1),
             ("context", "build"),  # installs *always* build
             ("dependencies_cache_only", False),
             ("dependencies_use_cache", True),
@@ -1001,6 +1284,11 @@ def __init__(
             pkg_id for pkg_id in self.dependencies if pkg_id not in installed
         )
 
+        # Estimated time needed to install the package and the longest chain of
+        # dependents depending on it, which is used to break ties among build tasks
+        # with the same priority.
+        self.critical_path = 0.0
+
         # Ensure key sequence-related properties are updated accordingly.
         self.attempts = 0
         self._update()
@@ -1102,9 +1390,9 @@ def cache_only(self) -> bool:
             return self.request.install_args.get("dependencies_cache_only", _cache_only)
 
     @property
-    def key(self) -> Tuple[int, int]:
-        """The key is the tuple (# uninstalled dependencies, sequence)."""
-        return (self.priority, self.sequence)
+    def key(self) -> Tuple[int, float, int]:
+        """The key is the tuple (# uninstalled dependencies, -critical path, sequence)."""
+        return (self.priority, -self.critical_path, self.sequence)
 
     def next_attempt(self, installed) -> "BuildTask":
         """Create a new, updated task for the next installation attempt."""
@@ -1142,11 +1430,17 @@ def __init__(self, installs: List[Tuple["spack.package_base.PackageBase", dict]]
         self.build_requests = [BuildRequest(pkg, install_args) for pkg, install_args in installs]
 
         # Priority queue of build tasks
-        self.build_pq: List[Tuple[Tuple[int, int], BuildTask]] = []
+        self.build_pq: List[Tuple[Tuple[int, float, int], BuildTask]] = []
 
         # Mapping of unique package ids to build task
         self.build_tasks: Dict[str, BuildTask] = {}
 
+        # Durations of previous builds, used to estimate the critical path
+        self.build_durations = BuildDurations()
+
+        # Downloads of binary packages started ahead of their installation
+        self.binary_prefetcher: Optional[BinaryPrefetcher] = None
+
         # Cache of package locks for failed packages, keyed on package's ids
         self.failed: Dict[str, Optional[lk.Lock]] = {}
 
@@ -1166,6 +1460,15 @@ def __init__(self, installs: List[Tuple["spack.package_base.PackageBase", dict]]
         # fast then that option applies to all build requests.
         self.fail_fast = False
 
+        # Maximum number of packages built at the same time. If any build request asks
+        # for more than one, then that applies to all build requests.
+        self.concurrent_packages = max(
+            [r.install_args["concurrent_packages"] for r in self.build_requests], default=1
+        )
+
+        # Build processes running concurrently, keyed on the package's unique id
+        self.running: Dict[str, Tuple[BuildTask, "spack.build_environment.BuildProcess"]] = {}
+
     def __repr__(self) -> str:
         """Returns a formal representation of the package installer."""
         rep = f"{self.__class__.__name__}("
@@ -1641,14 +1944,22 @@ def _add_compiler_package_to_config(self, pkg: "spack.package_base.PackageBase")
             spack.compilers.find_compilers([compiler_search_prefix])
         )
 
-    def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
+    def _install_task(
+        self, task: BuildTask, install_status: InstallStatus, concurrent: bool = False
+    ) -> Optional["spack.build_environment.BuildProcess"]:
         """
         Perform the installation of the requested spec and/or dependency
         represented by the build task.
 
         Args:
             task: the installation build task for a package
-            install_status: the installation status for the package"""
+            install_status: the installation status for the package
+            concurrent: if True, don't wait for the build process to be done
+
+        Return:
+            The running build process, if ``concurrent`` is True and the package is built
+            from sources. The installation is completed by ``_complete_install_task``.
+        """
 
         explicit = task.explicit
         install_args = task.request.install_args
@@ -1666,12 +1977,17 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
 
         # Use the binary cache if requested
         if use_cache:
-            if _install_from_cache(pkg, explicit, unsigned):
+            if concurrent:
+                process = self._start_install_from_cache(task, unsigned)
+                if process is not None:
+                    return process
+            elif _install_from_cache(pkg, explicit, unsigned, prefetcher=self.binary_prefetcher):
                 self._update_installed(task)
                 if task.compiler:
                     self._add_compiler_package_to_config(pkg)
-                return
-            elif cache_only:
+                return None
+
+            if cache_only:
                 raise InstallError("No binary found when cache-only was specified", pkg=pkg)
             else:
                 tty.msg(f"No binary for {pkg_id} found: installing from source")
@@ -1681,7 +1997,7 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
         # hook that allows tests to inspect the Package before installation
         # see unit_test_check() docs.
         if not pkg.unit_test_check():
-            return
+            return None
 
         # Injecting information to know if this installation request is the root one
         # to determine in BuildProcessInstaller whether installation is explicit or not
@@ -1694,24 +2010,125 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
             # way monkeypatch in tests works correctly.
             pkg.stage
 
-            # Create a child process to do the actual installation.
-            # Preserve verbosity settings across installs.
-            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
-                pkg, build_process, install_args
-            )
-            # Note: PARENT of the build process adds the new package to
-            # the database, so that we don't need to re-read from file.
-            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
+            # Create a child process to do the actual installation. Only one of the
+            # child processes can read from stdin, to toggle verbosity.
+            if concurrent:
+                with self._paused_prefetching():
+                    return spack.build_environment.BuildProcess(
+                        pkg, build_process, install_args, forward_stdin=False
+                    ).start()
+
+            # Binary packages keep downloading while the package is built, they are
+            # only paused while the build process is forked.
+            with self._paused_prefetching():
+                process = spack.build_environment.BuildProcess(
+                    pkg, build_process, install_args
+                ).start()
+        except spack.build_environment.StopPhase as e:
+            self._stop_phase(pkg, e)
+            return None
+
+        self._complete_install_task(task, process)
+        return None
 
-            # If a compiler, ensure it is added to the configuration
+    def _start_install_from_cache(
+        self, task: BuildTask, unsigned: Optional[bool]
+    ) -> Optional["spack.build_environment.BuildProcess"]:
+        """Download the binary package of a task, and start extracting and relocating it
+        in a child process.
+
+        Return:
+            The child process, or ``None`` if there is no binary package for the task
+        """
+        pkg = task.pkg
+        t = timer.Timer()
+        download_result = _download_from_binary_cache(
+            pkg, unsigned, timer=t, prefetcher=self.binary_prefetcher
+        )
+        if download_result is None:
+            return None
+
+        tty.msg(f"Extracting {package_id(pkg.spec)} from binary cache")
+        kwargs = {"download_result": download_result, "timer": t, "setup_environment": False}
+        with self._paused_prefetching():
+            return spack.build_environment.BuildProcess(
+                pkg, binary_install_process, kwargs, forward_stdin=False
+            ).start()
+
+    def _complete_install_task(
+        self, task: BuildTask, process: "spack.build_environment.BuildProcess"
+    ) -> None:
+        """Wait for the build process of a task started by ``_install_task`` to be done,
+        and complete the installation.
+        """
+        if process.function is binary_install_process:
+            result = process.complete()
+            if isinstance(result, binary_distribution.NoChecksumException):
+                raise result
+
+            pkg = task.pkg
+            pkg.installed_from_binary_cache = True
+            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=task.explicit)
+            _finalize_install_from_cache(pkg, task.explicit, result)
             if task.compiler:
                 self._add_compiler_package_to_config(pkg)
+            return
+
+        try:
+            spack.package_base.PackageBase._verbose = process.complete()
+            self._register_install_task(task)
         except spack.build_environment.StopPhase as e:
-            # A StopPhase exception means that do_install was asked to
-            # stop early from clients, and is not an error at this point
-            pid = f"{self.pid}: " if tty.show_pid() else ""
-            tty.debug(f"{pid}{str(e)}")
-            tty.debug(f"Package stage directory: {pkg.stage.source_path}")
+            self._stop_phase(task.pkg, e)
+
+    def _register_install_task(self, task: BuildTask) -> None:
+        """Register the package built by a task in the database, and in the configuration
+        if it's a compiler.
+        """
+        # Note: PARENT of the build process adds the new package to
+        # the database, so that we don't need to re-read from file.
+        spack.store.STORE.db.add(task.pkg.spec, spack.store.STORE.layout, explicit=task.explicit)
+        self.build_durations.record(task.pkg)
+
+        # If a compiler, ensure it is added to the configuration
+        if task.compiler:
+            self._add_compiler_package_to_config(task.pkg)
+
+    def _prefetch_binaries(self) -> None:
+        """Start downloading the binary packages of the tasks that may be installed from a
+        binary cache, in the order in which the tasks are queued.
+        """
+        if not spack.mirror.MirrorCollection(binary=True):
+            return
+
+        tasks = [
+            task
+            for _, task in sorted(self.build_pq)
+            if task.status != STATUS_REMOVED and task.use_cache and not task.pkg.spec.external
+        ]
+        for task in tasks:
+            if self._check_db(task.pkg.spec)[1]:
+                continue
+            if self.binary_prefetcher is None:
+                self.binary_prefetcher = BinaryPrefetcher()
+            self.binary_prefetcher.submit(task.pkg.spec, task.request.install_args.get("unsigned"))
+
+    @contextlib.contextmanager
+    def _paused_prefetching(self):
+        """Pause the downloads of binary packages, e.g. to fork a build process"""
+        if self.binary_prefetcher is None:
+            yield
+            return
+        with self.binary_prefetcher.paused_downloads():
+            yield
+
+    def _stop_phase(
+        self, pkg: "spack.package_base.PackageBase", e: "spack.build_environment.StopPhase"
+    ) -> None:
+        # A StopPhase exception means that do_install was asked to
+        # stop early from clients, and is not an error at this point
+        pid = f"{self.pid}: " if tty.show_pid() else ""
+        tty.debug(f"{pid}{str(e)}")
+        tty.debug(f"Package stage directory: {pkg.stage.source_path}")
 
     def _next_is_pri0(self) -> bool:
         """
@@ -1721,9 +2138,10 @@ def _next_is_pri0(self) -> bool:
             True if it does, False otherwise
         """
         # Leverage the fact that the first entry in the queue is the next
-        # one that will be processed
-        task = self.build_pq[0][1]
-        return task.priority == 0
+        # one that will be processed, once removed tasks are discarded
+        while self.build_pq and self.build_pq[0][1].status == STATUS_REMOVED:
+            heapq.heappop(self.build_pq)
+        return bool(self.build_pq) and self.build_pq[0][1].priority == 0
 
     def _pop_task(self) -> Optional[BuildTask]:
         """
@@ -1957,6 +2375,43 @@ def _init_queue(self) -> None:
                 for dependent_id in dependents.difference(task.dependents):
                     task.add_dependent(dependent_id)
 
+        self._prioritize_critical_path()
+
+    def _prioritize_critical_path(self) -> None:
+        """Estimate, for each build task, the time needed to install its package and the
+        longest chain of dependents depending on it, and reorder the build queue so that
+        among tasks with the same number of uninstalled dependencies the ones on the
+        longest chains are installed first.
+
+        Durations of previous builds from sources are used when available. Packages that
+        were never built count as the median of the known durations, or as one second
+        if none is known, so that the depth in the DAG is used when there is no history.
+        """
+        known = {
+            pkg_id: self.build_durations.get(task.pkg.spec)
+            for pkg_id, task in self.build_tasks.items()
+        }
+        values = sorted(x for x in known.values() if x is not None)
+        default = values[len(values) // 2] if values else 1.0
+
+        critical_path: Dict[str, float] = {}
+
+        def _visit(pkg_id: str) -> float:
+            if pkg_id not in critical_path:
+                dependents = self.build_tasks[pkg_id].dependents
+                longest = max(
+                    (_visit(x) for x in dependents if x in self.build_tasks), default=0.0
+                )
+                duration = known[pkg_id]
+                critical_path[pkg_id] = (default if duration is None else duration) + longest
+            return critical_path[pkg_id]
+
+        for pkg_id, task in self.build_tasks.items():
+            task.critical_path = _visit(pkg_id)
+
+        self.build_pq = [(task.key, task) for _, task in self.build_pq]
+        heapq.heapify(self.build_pq)
+
     def _install_action(self, task: BuildTask) -> int:
         """
         Determine whether the installation should be overwritten (if it already
@@ -1993,13 +2448,164 @@ def _install_action(self, task: BuildTask) -> int:
         # back on failure
         return InstallAction.OVERWRITE
 
+    def _start_install(
+        self, task: BuildTask, install_status: InstallStatus, action: int
+    ) -> Optional["spack.build_environment.BuildProcess"]:
+        """Perform the install action for a task. Builds from sources run concurrently,
+        and their process is returned, if more than one package can be built at a time.
+        """
+        if action == InstallAction.INSTALL:
+            concurrent = self.concurrent_packages > 1
+            return self._install_task(task, install_status, concurrent=concurrent)
+
+        if action == InstallAction.OVERWRITE:
+            # spack.store.STORE.db is not really a Database object, but a small
+            # wrapper -- silence mypy
+            OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
+        return None
+
+    def _run_install_step(
+        self,
+        task: BuildTask,
+        install_status: InstallStatus,
+        action: int,
+        step: Callable[[], Optional["spack.build_environment.BuildProcess"]],
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]],
+    ) -> None:
+        """Run a step in the installation of a task, and handle its outcome.
+
+        If the step returns a build process, the installation is still in progress. The
+        process is then tracked in ``self.running``, until its outcome is handled by
+        ``_complete_running_tasks``.
+
+        Args:
+            task: the installation build task for a package
+            install_status: the installation status for the package
+            action: the install action for the task
+            step: function performing the step
+            failed_explicits: explicit specs that failed to install, with their id and error
+        """
+        pkg, pkg_id = task.pkg, task.pkg_id
+        keep_prefix = task.request.install_args.get("keep_prefix")
+        in_progress = False
+        try:
+            process = step()
+            if process is not None:
+                in_progress = True
+                self.running[pkg_id] = (task, process)
+                return
+
+            self._update_installed(task)
+
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, "stop_before_phase", None)
+            last_phase = getattr(pkg, "last_phase", None)
+            keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
+
+        except KeyboardInterrupt as exc:
+            # The build has been terminated with a Ctrl-C so terminate
+            # regardless of the number of remaining specs.
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+            raise
+
+        except binary_distribution.NoChecksumException as exc:
+            if task.cache_only:
+                raise
+
+            # Checking hash on downloaded binary failed.
+            tty.error(
+                f"Failed to install {pkg.name} from binary cache due "
+                f"to {str(exc)}: Requeueing to install from source."
+            )
+            # this overrides a full method, which is ugly.
+            task.use_cache = False  # type: ignore[misc]
+            self._requeue_task(task, install_status)
+            return
+
+        except (Exception, SystemExit) as exc:
+            self._update_failed(task, True, exc)
+
+            # Best effort installs suppress the exception and mark the
+            # package as a failure.
+            if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
+                exc.printed = True  # type: ignore[union-attr]
+                # SpackErrors can be printed by the build process or at
+                # lower levels -- skip printing if already printed.
+                # TODO: sort out this and SpackError.print_context()
+                tty.error(
+                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+                )
+            # Terminate if requested to do so on the first failure.
+            if self.fail_fast:
+                raise InstallError(f"{FAIL_FAST_ERR}: {str(exc)}", pkg=pkg)
+
+            # Terminate at this point if the single explicit spec has
+            # failed to install.
+            if len(self.build_requests) == 1 and task.explicit:
+                raise
+
+            # Track explicit spec id and error to summarize when done
+            if task.explicit:
+                failed_explicits.append((pkg, pkg_id, str(exc)))
+
+        finally:
+            # Remove the install prefix if anything went wrong during
+            # install.
+            if not in_progress and not keep_prefix and not action == InstallAction.OVERWRITE:
+                pkg.remove_prefix()
+
+        # Perform basic task cleanup for the installed spec to
+        # include downgrading the write to a read lock
+        self._cleanup_task(pkg)
+
+    def _complete_running_tasks(
+        self,
+        install_status: InstallStatus,
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]],
+    ) -> None:
+        """Wait for at least one of the running build processes to be done, and complete
+        the installation of the corresponding packages.
+        """
+        processes = [process for _, process in self.running.values()]
+        for process in spack.build_environment.wait_for_build_processes(processes):
+            task, _ = self.running.pop(package_id(process.pkg.spec))
+            step = functools.partial(self._complete_install_task, task, process)
+            self._run_install_step(
+                task, install_status, InstallAction.INSTALL, step, failed_explicits
+            )
+
+    def _terminate_running_tasks(self) -> None:
+        """Terminate the build processes that are still running"""
+        for task, process in self.running.values():
+            tty.debug(f"Terminating the build process of {task.pkg_id}")
+            process.terminate()
+            task.pkg.remove_prefix()
+        self.running.clear()
+
     def install(self) -> None:
         """Install the requested package(s) and or associated dependencies."""
+        # Concurrent builds share a single budget of build jobs. Each build has an implicit
+        # job slot, in addition to the ones in the jobserver.
+        jobs = 1
+        if self.concurrent_packages > 1:
+            jobs = spack.util.cpus.determine_number_of_jobs(parallel=True)
+            jobs = max(jobs - self.concurrent_packages + 1, 1)
+
+        with spack.build_environment.shared_jobserver(jobs):
+            try:
+                self._install_requests()
+            finally:
+                self._terminate_running_tasks()
+                if self.binary_prefetcher is not None:
+                    self.binary_prefetcher.shutdown()
+                    self.binary_prefetcher = None
 
+    def _install_requests(self) -> None:
         self._init_queue()
-        fail_fast_err = "Terminating after first install failure"
-        single_explicit_spec = len(self.build_requests) == 1
-        failed_explicits = []
+        self._prefetch_binaries()
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]] = []
 
         install_status = InstallStatus(len(self.build_pq))
 
@@ -2009,14 +2615,19 @@ def install(self) -> None:
             enabled=sys.stdout.isatty() and tty.msg_enabled() and not tty.is_debug()
         )
 
-        while self.build_pq:
+        while self.build_pq or self.running:
+            # Wait for running builds to be done if no other build can be started, either
+            # because too many are running, or because tasks wait for their dependencies
+            if self.running and (
+                len(self.running) >= self.concurrent_packages or not self._next_is_pri0()
+            ):
+                self._complete_running_tasks(install_status, failed_explicits)
+                continue
+
             task = self._pop_task()
             if task is None:
                 continue
 
-            install_args = task.request.install_args
-            keep_prefix = install_args.get("keep_prefix")
-
             pkg, pkg_id, spec = task.pkg, task.pkg_id, task.pkg.spec
             install_status.next_pkg(pkg)
             install_status.set_term_title(f"Processing {pkg.name}")
@@ -2062,7 +2673,7 @@ def install(self) -> None:
                 self._update_failed(task)
 
                 if self.fail_fast:
-                    raise InstallError(fail_fast_err, pkg=pkg)
+                    raise InstallError(FAIL_FAST_ERR, pkg=pkg)
 
                 continue
 
@@ -2140,81 +2751,9 @@ def install(self) -> None:
             # Proceed with the installation since we have an exclusive write
             # lock on the package.
             install_status.set_term_title(f"Installing {pkg.name}")
-            try:
-                action = self._install_action(task)
-
-                if action == InstallAction.INSTALL:
-                    self._install_task(task, install_status)
-                elif action == InstallAction.OVERWRITE:
-                    # spack.store.STORE.db is not really a Database object, but a small
-                    # wrapper -- silence mypy
-                    OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
-
-                self._update_installed(task)
-
-                # If we installed then we should keep the prefix
-                stop_before_phase = getattr(pkg, "stop_before_phase", None)
-                last_phase = getattr(pkg, "last_phase", None)
-                keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
-
-            except KeyboardInterrupt as exc:
-                # The build has been terminated with a Ctrl-C so terminate
-                # regardless of the number of remaining specs.
-                tty.error(
-                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
-                )
-                raise
-
-            except binary_distribution.NoChecksumException as exc:
-                if task.cache_only:
-                    raise
-
-                # Checking hash on downloaded binary failed.
-                tty.error(
-                    f"Failed to install {pkg.name} from binary cache due "
-                    f"to {str(exc)}: Requeueing to install from source."
-                )
-                # this overrides a full method, which is ugly.
-                task.use_cache = False  # type: ignore[misc]
-                self._requeue_task(task, install_status)
-                continue
-
-            except (Exception, SystemExit) as exc:
-                self._update_failed(task, True, exc)
-
-                # Best effort installs suppress the exception and mark the
-                # package as a failure.
-                if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
-                    exc.printed = True  # type: ignore[union-attr]
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackError.print_context()
-                    tty.error(
-                        f"Failed to install {pkg.name} due to "
-                        f"{exc.__class__.__name__}: {str(exc)}"
-                    )
-                # Terminate if requested to do so on the first failure.
-                if self.fail_fast:
-                    raise InstallError(f"{fail_fast_err}: {str(exc)}", pkg=pkg)
-
-                # Terminate at this point if the single explicit spec has
-                # failed to install.
-                if single_explicit_spec and task.explicit:
-                    raise
-
-                # Track explicit spec id and error to summarize when done
-                if task.explicit:
-                    failed_explicits.append((pkg, pkg_id, str(exc)))
-
-            finally:
-                # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix and not action == InstallAction.OVERWRITE:
-                    pkg.remove_prefix()
-
-            # Perform basic task cleanup for the installed spec to
-            # include downgrading the write to a read lock
-            self._cleanup_task(pkg)
+            action = self._install_action(task)
+            step = functools.partial(self._start_install, task, install_status, action)
+            self._run_install_step(task, install_status, action, step, failed_explicits)
 
         # Cleanup, which includes releasing all of the read locks
         self._cleanup_all_tasks()
@@ -2483,6 +3022,25 @@ def build_process(pkg: "spack.package_base.PackageBase", install_args: dict) ->
         return installer.run()
 
 
+def binary_install_process(
+    pkg: "spack.package_base.PackageBase", install_args: dict
+) -> Union[timer.Timer, "binary_distribution.NoChecksumException"]:
+    """Extract and relocate a downloaded binary package, in a child process started by
+    ``PackageInstaller``. The parent registers the package in the database.
+
+    Return:
+        The timer of the installation, or the error if the checksum of the binary package
+        is wrong, so that the parent can install the package from sources instead.
+    """
+    t = install_args["timer"]
+    try:
+        with t.measure("install"), spack.util.path.filter_padding():
+            _extract_binary_cache_tarball(pkg, install_args["download_result"], timer=t)
+    except binary_distribution.NoChecksumException as e:
+        return e
+    return t
+
+
 class OverwriteInstall:
     def __init__(
         self,
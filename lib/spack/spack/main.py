@@ -35,11 +35,9 @@
 import spack.cmd
 import spack.config
 import spack.environment as ev
-import spack.modules
 import spack.paths
 import spack.platforms
 import spack.repo
-import spack.solver.asp
 import spack.spec
 import spack.store
 import spack.util.debug
@@ -809,6 +807,8 @@ def print_setup_info(*info):
     This is in ``main.py`` to make it fast; the setup scripts need to
     invoke spack in login scripts, and it needs to be quick.
     """
+    import spack.modules.common  # pulls in environments, build environments and templates
+
     shell = "csh" if "csh" in info else "sh"
 
     def shell_set(var, value):
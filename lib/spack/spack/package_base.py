@@ -33,8 +33,11 @@
 from llnl.util.lang import classproperty, memoized
 from llnl.util.link_tree import LinkTree
 
+import spack.build_environment
+import spack.builder
 import spack.compilers
 import spack.config
+import spack.dependency_index
 import spack.deptypes as dt
 import spack.directives
 import spack.directory_layout
@@ -52,6 +55,7 @@
 import spack.store
 import spack.url
 import spack.util.environment
+import spack.util.package_hash
 import spack.util.path
 import spack.util.web
 from spack.filesystem_view import YamlFilesystemView
@@ -66,7 +70,6 @@
 from spack.installer import InstallError, PackageInstaller
 from spack.stage import DevelopStage, ResourceStage, Stage, StageComposite, compute_stage_name
 from spack.util.executable import ProcessError, which
-from spack.util.package_hash import package_hash
 from spack.version import GitVersion, StandardVersion
 
 FLAG_HANDLER_RETURN_TYPE = Tuple[
@@ -809,61 +812,19 @@ def possible_dependencies(
 
         Note: the returned dict *includes* the package itself.
 
+        Direct dependencies of this package are read from the class, and the ones of other
+        packages from the dependency index of the repository, so their classes are not loaded.
         """
-        visited = {} if visited is None else visited
-        missing = {} if missing is None else missing
-
-        visited.setdefault(cls.name, set())
-
-        for name, conditions in cls.dependencies_by_name(when=True).items():
-            # check whether this dependency could be of the type asked for
-            depflag_union = 0
-            for deplist in conditions.values():
-                for dep in deplist:
-                    depflag_union |= dep.depflag
-            if not (depflag & depflag_union):
-                continue
-
-            # expand virtuals if enabled, otherwise just stop at virtuals
-            if spack.repo.PATH.is_virtual(name):
-                if virtuals is not None:
-                    virtuals.add(name)
-                if expand_virtuals:
-                    providers = spack.repo.PATH.providers_for(name)
-                    dep_names = [spec.name for spec in providers]
-                else:
-                    visited.setdefault(cls.name, set()).add(name)
-                    visited.setdefault(name, set())
-                    continue
-            else:
-                dep_names = [name]
-
-            # add the dependency names to the visited dict
-            visited.setdefault(cls.name, set()).update(set(dep_names))
-
-            # recursively traverse dependencies
-            for dep_name in dep_names:
-                if dep_name in visited:
-                    continue
-
-                visited.setdefault(dep_name, set())
-
-                # skip the rest if not transitive
-                if not transitive:
-                    continue
-
-                try:
-                    dep_cls = spack.repo.PATH.get_pkg_class(dep_name)
-                except spack.repo.UnknownPackageError:
-                    # log unknown packages
-                    missing.setdefault(cls.name, set()).add(dep_name)
-                    continue
-
-                dep_cls.possible_dependencies(
-                    transitive, expand_virtuals, depflag, visited, missing, virtuals
-                )
-
-        return visited
+        return spack.repo.PATH.dependency_index.possible_dependencies(
+            cls.name,
+            transitive=transitive,
+            expand_virtuals=expand_virtuals,
+            depflag=depflag,
+            visited=visited,
+            missing=missing,
+            virtuals=virtuals,
+            overrides={cls.name: spack.dependency_index.class_dependencies(cls)},
+        )
 
     @classproperty
     def package_dir(cls):
@@ -1706,7 +1667,9 @@ def content_hash(self, content=None):
             )
 
         # package.py contents
-        hash_content.append(package_hash(self.spec, source=content).encode("utf-8"))
+        hash_content.append(
+            spack.util.package_hash.package_hash(self.spec, source=content).encode("utf-8")
+        )
 
         # put it all together and encode as base32
         b32_hash = base64.b32encode(
@@ -1847,6 +1810,7 @@ def do_install(self, **kwargs):
 
         Args:
             cache_only (bool): Fail if binary package unavailable.
+            concurrent_packages (int): Maximum number of packages built at the same time.
             dirty (bool): Don't clean the build environment before installing.
             explicit (bool): True if package was explicitly installed, False
                 if package was implicitly installed (as a dependency).
@@ -2530,33 +2494,33 @@ def possible_dependencies(
 
     See ``PackageBase.possible_dependencies`` for details.
     """
-    packages = []
+    pkg_names = []
+    overrides = {}
     for pos in pkg_or_spec:
         if isinstance(pos, PackageMeta) and issubclass(pos, PackageBase):
-            packages.append(pos)
+            pkg_names.append(pos.name)
+            overrides[pos.name] = spack.dependency_index.class_dependencies(pos)
             continue
 
         if not isinstance(pos, spack.spec.Spec):
             pos = spack.spec.Spec(pos)
 
         if spack.repo.PATH.is_virtual(pos.name):
-            packages.extend(p.package_class for p in spack.repo.PATH.providers_for(pos.name))
-            continue
+            pkg_names.extend(p.name for p in spack.repo.PATH.providers_for(pos.name))
+        elif spack.repo.PATH.exists(pos.name):
+            pkg_names.append(pos.name)
         else:
-            packages.append(pos.package_class)
-
-    visited: Dict[str, Set[str]] = {}
-    for pkg in packages:
-        pkg.possible_dependencies(
-            visited=visited,
-            transitive=transitive,
-            expand_virtuals=expand_virtuals,
-            depflag=depflag,
-            missing=missing,
-            virtuals=virtuals,
-        )
-
-    return visited
+            raise spack.repo.UnknownPackageError(pos.fullname)
+
+    return spack.repo.PATH.dependency_index.possible_dependencies(
+        *pkg_names,
+        transitive=transitive,
+        expand_virtuals=expand_virtuals,
+        depflag=depflag,
+        missing=missing,
+        virtuals=virtuals,
+        overrides=overrides,
+    )
 
 
 class PackageStillNeededError(InstallError):
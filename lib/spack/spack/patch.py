@@ -496,11 +496,15 @@ def patch_for_package(self, sha256: str, pkg: "spack.package_base.PackageBase")
         patch_dict["sha256"] = sha256
         return from_dict(patch_dict, repository=self.repository)
 
-    def update_package(self, pkg_fullname: str) -> None:
+    def update_package(
+        self, pkg_fullname: str, partial_index: Optional[Dict[Any, Any]] = None
+    ) -> None:
         """Update the patch cache.
 
         Args:
             pkg_fullname: package to update.
+            partial_index: patch index of the package, as returned by ``package_index``.
+                Computed if not given.
         """
         # remove this package from any patch entries that reference it.
         empty = []
@@ -521,12 +525,21 @@ def update_package(self, pkg_fullname: str) -> None:
             del self.index[sha256]
 
         # update the index with per-package patch indexes
-        pkg_cls = self.repository.get_pkg_class(pkg_fullname)
-        partial_index = self._index_patches(pkg_cls, self.repository)
+        if partial_index is None:
+            partial_index = self.package_index(pkg_fullname)
         for sha256, package_to_patch in partial_index.items():
             p2p = self.index.setdefault(sha256, {})
             p2p.update(package_to_patch)
 
+    def package_index(self, pkg_fullname: str) -> Dict[Any, Any]:
+        """Return the patch index of a single package.
+
+        Args:
+            pkg_fullname: package to index.
+        """
+        pkg_cls = self.repository.get_pkg_class(pkg_fullname)
+        return self._index_patches(pkg_cls, self.repository)
+
     def update(self, other: "PatchCache") -> None:
         """Update this cache with the contents of another.
 
@@ -111,11 +111,13 @@ def __init__(
 
             self.update(spec)
 
-    def update(self, spec):
+    def update(self, spec, provided=None):
         """Update the provider index with additional virtual specs.
 
         Args:
             spec: spec potentially providing additional virtual specs
+            provided: virtuals provided by the package of the spec, as in
+                ``PackageBase.provided``. Read from the package if not given.
         """
         if not isinstance(spec, spack.spec.Spec):
             spec = spack.spec.Spec(spec)
@@ -124,10 +126,12 @@ def update(self, spec):
             # Empty specs do not have a package
             return
 
-        msg = "cannot update an index passing the virtual spec '{}'".format(spec.name)
-        assert not self.repository.is_virtual_safe(spec.name), msg
+        if provided is None:
+            msg = "cannot update an index passing the virtual spec '{}'".format(spec.name)
+            assert not self.repository.is_virtual_safe(spec.name), msg
+            provided = self.repository.get_pkg_class(spec.name).provided
 
-        pkg_provided = self.repository.get_pkg_class(spec.name).provided
+        pkg_provided = provided
         for provider_spec_readonly, provided_specs in pkg_provided.items():
             for provided_spec in provided_specs:
                 # TODO: fix this comment.
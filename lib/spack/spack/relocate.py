@@ -495,13 +495,17 @@ def _transform_rpaths(orig_rpaths, orig_root, new_prefixes):
 
 def new_relocate_elf_binaries(binaries, prefix_to_prefix):
     """Take a list of binaries, and an ordered dictionary of
-    prefix to prefix mapping, and update the rpaths accordingly."""
+    prefix to prefix mapping, and update the rpaths accordingly.
+
+    Returns the list of binaries that could not be updated in place, and were
+    rewritten by patchelf instead."""
 
     # Transform to binary string
     prefix_to_prefix = OrderedDict(
         (k.encode("utf-8"), v.encode("utf-8")) for (k, v) in prefix_to_prefix.items()
     )
 
+    rewritten = []
     for path in binaries:
         try:
             elf.substitute_rpath_and_pt_interp_in_place_or_raise(path, prefix_to_prefix)
@@ -510,6 +514,8 @@ def new_relocate_elf_binaries(binaries, prefix_to_prefix):
             rpaths = e.rpath.new_value.decode("utf-8").split(":") if e.rpath else []
             interpreter = e.pt_interp.new_value.decode("utf-8") if e.pt_interp else None
             _set_elf_rpaths_and_interpreter(path, rpaths=rpaths, interpreter=interpreter)
+            rewritten.append(path)
+    return rewritten
 
 
 def relocate_elf_binaries(
@@ -640,7 +646,7 @@ def relocate_text(files, prefixes):
     TextFilePrefixReplacer.from_strings_or_bytes(prefixes).apply(files)
 
 
-def relocate_text_bin(binaries, prefixes):
+def relocate_text_bin(binaries, prefixes, offsets=None):
     """Replace null terminated path strings hard-coded into binaries.
 
     The new install prefix must be shorter than the original one.
@@ -648,11 +654,21 @@ def relocate_text_bin(binaries, prefixes):
     Args:
         binaries (list): binaries to be relocated
         prefixes (OrderedDict): String prefixes which need to be changed.
+        offsets (dict): optional mapping from binaries to the offsets where the old
+            prefixes occur in them, see ``spack.relocate_text.find_prefix_offsets``.
+            Binaries in the mapping are patched at those offsets only, the others are
+            searched.
 
     Raises:
       spack.relocate_text.BinaryTextReplaceError: when the new path is longer than the old path
     """
-    return BinaryFilePrefixReplacer.from_strings_or_bytes(prefixes).apply(binaries)
+    replacer = BinaryFilePrefixReplacer.from_strings_or_bytes(prefixes)
+    if not offsets:
+        return replacer.apply(binaries)
+    indexed = {b: offsets[b] for b in binaries if b in offsets}
+    return replacer.apply([b for b in binaries if b not in indexed]) + replacer.apply_at_offsets(
+        indexed
+    )
 
 
 def is_binary(filename):
@@ -6,9 +6,12 @@
 """This module contains pure-Python classes and functions for replacing
 paths inside text files and binaries."""
 
+import io
+import mmap
+import os
 import re
 from collections import OrderedDict
-from typing import Dict, Union
+from typing import Dict, Iterable, List, Optional, Union
 
 import spack.error
 
@@ -39,6 +42,34 @@ def utf8_paths_to_single_binary_regex(prefixes):
     return _byte_strings_to_single_binary_regex(p.encode("utf-8") for p in prefixes)
 
 
+def find_prefix_offsets(filename: str, prefixes: Iterable[bytes]) -> List[int]:
+    """Return the sorted offsets in a file where any of the prefixes occurs, including
+    overlapping occurrences. These are the only offsets where a ``BinaryFilePrefixReplacer``
+    for the same prefixes can find matches, so it can patch the file without searching it.
+    """
+    prefixes = [p for p in prefixes if p]
+    if not prefixes or os.path.getsize(filename) == 0:
+        return []
+
+    def _occurrences(data, prefix):
+        start = data.find(prefix)
+        while start != -1:
+            yield start
+            start = data.find(prefix, start + 1)
+
+    offsets = set()
+    common_prefix = os.path.commonprefix(prefixes)
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(common_prefix) >= 4:
+            for start in _occurrences(data, common_prefix):
+                if any(data[start : start + len(p)] == p for p in prefixes):
+                    offsets.add(start)
+        else:
+            for prefix in prefixes:
+                offsets.update(_occurrences(data, prefix))
+    return sorted(offsets)
+
+
 def filter_identity_mappings(prefix_to_prefix):
     """Drop mappings that are not changed."""
     # NOTE: we don't guard against the following case:
@@ -145,6 +176,10 @@ def __init__(self, prefix_to_prefix, suffix_safety_size=7):
         super().__init__(prefix_to_prefix)
         self.suffix_safety_size = suffix_safety_size
         self.regex = self.binary_text_regex(self.prefix_to_prefix.keys(), suffix_safety_size)
+        # All the matches start with this, so when it's long enough to be selective it's
+        # used to find candidate matches quickly
+        common_prefix = os.path.commonprefix(list(self.prefix_to_prefix.keys()))
+        self.common_prefix = common_prefix if len(common_prefix) >= 4 else b""
 
     @classmethod
     def binary_text_regex(cls, binary_prefixes, suffix_safety_size=7):
@@ -177,7 +212,23 @@ def from_strings_or_bytes(
         """
         return cls(_prefix_to_prefix_as_bytes(prefix_to_prefix), suffix_safety_size)
 
-    def _apply_to_file(self, f):
+    def apply_at_offsets(self, filename_to_offsets: Dict[str, List[int]]) -> List[str]:
+        """Like ``apply``, but matches are only looked for at the given offsets of each
+        file, as returned by ``find_prefix_offsets``, instead of searching whole files.
+
+        Returns a list of files that were modified"""
+        changed_files = []
+        if self.is_noop:
+            return []
+        for filename, offsets in filename_to_offsets.items():
+            if not offsets:
+                continue
+            with open(filename, "rb+") as f:
+                if self._apply_to_file(f, offsets):
+                    changed_files.append(filename)
+        return changed_files
+
+    def _apply_to_file(self, f, offsets: Optional[List[int]] = None):
         """
         Given a file opened in rb+ mode, apply the string replacements as
         specified by an ordered dictionary of prefix to prefix mappings. This
@@ -197,21 +248,76 @@ def _apply_to_file(self, f):
         sufficiently short (typically the case when going from large padding -> normal path)
         If the replacement string is longer, or all of the above fails, we error out.
 
+        Files are memory mapped, so that they are not read into memory as a whole, and
+        only the bytes that need to be replaced are written.
+
         Arguments:
             f: file opened in rb+ mode
+            offsets: if given, the sorted offsets of the file where prefixes may occur.
+                Other offsets are not searched.
 
         Returns:
             bool: True if file was modified
         """
         assert f.tell() == 0
 
-        # We *could* read binary data in chunks to avoid loading all in memory,
-        # but it's nasty to deal with matches across boundaries, so let's stick to
-        # something simple.
+        try:
+            fileno = f.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            # In-memory file objects can't be memory mapped
+            data = f.read()
+
+            def write(start, replacement):
+                f.seek(start)
+                f.write(replacement)
+
+            return self._apply_to_data(data, write, offsets)
+
+        if os.fstat(fileno).st_size == 0:
+            return True
+
+        with mmap.mmap(fileno, 0) as data:
 
+            def write(start, replacement):
+                data[start : start + len(replacement)] = replacement
+
+            return self._apply_to_data(data, write, offsets)
+
+    def _matches(self, data, offsets: Optional[List[int]] = None):
+        """Iterate over the matches of the regex in data, a bytes-like object.
+
+        Candidate matches are at the given offsets if any, or are found by a plain search
+        of the prefix common to all the prefixes, which is much faster than a search of the
+        regex, and in particular skips files that don't contain any prefix in a single pass.
+        """
+        if offsets is not None:
+            end = 0
+            for start in offsets:
+                if start < end:
+                    continue
+                match = self.regex.match(data, start)
+                if match is not None:
+                    yield match
+                    end = match.end()
+            return
+
+        if not self.common_prefix:
+            yield from self.regex.finditer(data)
+            return
+
+        start = data.find(self.common_prefix)
+        while start != -1:
+            match = self.regex.match(data, start)
+            if match is None:
+                start = data.find(self.common_prefix, start + 1)
+                continue
+            yield match
+            start = data.find(self.common_prefix, match.end())
+
+    def _apply_to_data(self, data, write, offsets=None):
         modified = True
 
-        for match in self.regex.finditer(f.read()):
+        for match in self._matches(data, offsets):
             # The matching prefix (old) and its replacement (new)
             old = match.group(1)
             new = self.prefix_to_prefix[old]
@@ -251,8 +357,7 @@ def _apply_to_file(self, f):
             else:
                 raise CannotShrinkCString(old, new, match.group()[:-1])
 
-            f.seek(match.start())
-            f.write(replacement)
+            write(match.start(), replacement)
             modified = True
 
         return modified
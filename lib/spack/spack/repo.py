@@ -14,6 +14,8 @@
 import importlib.util
 import inspect
 import itertools
+import multiprocessing
+import multiprocessing.pool
 import os
 import os.path
 import random
@@ -22,10 +24,11 @@
 import stat
 import string
 import sys
+import time
 import traceback
 import types
 import uuid
-from typing import Any, Dict, List, Set, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import llnl.path
 import llnl.util.filesystem as fs
@@ -35,15 +38,20 @@
 
 import spack.caches
 import spack.config
+import spack.dependency_index
 import spack.error
 import spack.patch
 import spack.provider_index
 import spack.spec
 import spack.tag
+import spack.util.cpus
 import spack.util.file_cache
 import spack.util.git
+import spack.util.hash
 import spack.util.naming as nm
+import spack.util.package_metadata
 import spack.util.path
+import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
 
 #: Package modules are imported as spack.pkg.<repo-namespace>.<pkg-name>
@@ -344,6 +352,73 @@ def __getattr__(self, name):
         return getattr(self, name)
 
 
+def _git_head(path: str) -> Optional[str]:
+    """Return the commit checked out in the git repository containing a path, or None if the
+    path is not in a git repository. Git files are read directly, to avoid running git."""
+    path = os.path.abspath(path)
+    while not os.path.exists(os.path.join(path, ".git")):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+    try:
+        git_dir = os.path.join(path, ".git")
+        if os.path.isfile(git_dir):
+            # Worktrees and submodules have a .git file pointing to the git directory
+            with open(git_dir) as f:
+                _, _, git_dir = f.read().partition("gitdir:")
+            git_dir = os.path.join(path, git_dir.strip())
+
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+        if not head.startswith("ref:"):
+            return head
+        ref = head[len("ref:") :].strip()
+
+        common_dir = git_dir
+        if os.path.exists(os.path.join(git_dir, "commondir")):
+            with open(os.path.join(git_dir, "commondir")) as f:
+                common_dir = os.path.join(git_dir, f.read().strip())
+
+        for ref_dir in (git_dir, common_dir):
+            if os.path.exists(os.path.join(ref_dir, ref)):
+                with open(os.path.join(ref_dir, ref)) as f:
+                    return f.read().strip()
+
+        if os.path.exists(os.path.join(common_dir, "packed-refs")):
+            with open(os.path.join(common_dir, "packed-refs")) as f:
+                for line in f:
+                    commit, _, name = line.strip().partition(" ")
+                    if name == ref:
+                        return commit
+    except OSError:
+        return None
+
+    # A branch without commits yet
+    return head
+
+
+def _stat_package_files(paths: List[str]) -> List[Optional[os.stat_result]]:
+    """Stat a batch of package files. Files that don't exist, or can't be read, are None."""
+    result: List[Optional[os.stat_result]] = []
+    for path in paths:
+        try:
+            sinfo: Optional[os.stat_result] = os.stat(path)
+        except OSError as e:
+            sinfo = None
+            if e.errno == errno.EACCES:
+                tty.warn("Can't read package file %s." % path)
+            elif e.errno != errno.ENOENT:
+                raise e
+
+        # If it's not a file, skip it.
+        if sinfo is not None and stat.S_ISDIR(sinfo.st_mode):
+            sinfo = None
+        result.append(sinfo)
+    return result
+
+
 class FastPackageChecker(collections.abc.Mapping):
     """Cache that maps package names to the stats obtained on the
     'package.py' files associated with them.
@@ -351,85 +426,168 @@ class FastPackageChecker(collections.abc.Mapping):
     For each repository a cache is maintained at class level, and shared among
     all instances referring to it. Update of the global cache is done lazily
     during instance initialization.
+
+    If a file cache is given, the names of the packages are also persisted in it, together
+    with the modification time of the packages directory and the git commit checked out.
+    When neither changed, package names are read from the file cache, and package files are
+    stat'ed only when their modification times are needed.
     """
 
-    #: Global cache, reused by every instance
-    _paths_cache: Dict[str, Dict[str, os.stat_result]] = {}
+    #: Global cache, reused by every instance. Stats that have not been computed yet are None.
+    _paths_cache: Dict[str, Dict[str, Optional[os.stat_result]]] = {}
+
+    #: Number of package files stat'ed by each thread
+    STAT_BATCH_SIZE = 256
+
+    #: Maximum number of threads used to stat package files
+    STAT_THREADS = 16
 
-    def __init__(self, packages_path):
+    def __init__(
+        self, packages_path, cache: Optional[spack.util.file_cache.FileCache] = None
+    ) -> None:
         # The path of the repository managed by this instance
         self.packages_path = packages_path
+        self.cache = cache
 
         # If the cache we need is not there yet, then build it appropriately
         if packages_path not in self._paths_cache:
-            self._paths_cache[packages_path] = self._create_new_cache()
+            self._paths_cache[packages_path] = self._create_new_cache(use_snapshot=True)
 
         #: Reference to the appropriate entry in the global cache
         self._packages_to_stats = self._paths_cache[packages_path]
 
     def invalidate(self):
         """Regenerate cache for this checker."""
-        self._paths_cache[self.packages_path] = self._create_new_cache()
+        self._paths_cache[self.packages_path] = self._create_new_cache(use_snapshot=False)
         self._packages_to_stats = self._paths_cache[self.packages_path]
 
-    def _create_new_cache(self) -> Dict[str, os.stat_result]:
+    @property
+    def _snapshot_key(self) -> str:
+        digest = spack.util.hash.b32_hash(os.path.abspath(self.packages_path))
+        return f"package-checker/{digest}.json"
+
+    def _read_snapshot(self, mtime: int, head: Optional[str]) -> Optional[Dict[str, List[str]]]:
+        """Return the snapshot in the file cache, if it is still valid."""
+        try:
+            if self.cache is None or not self.cache.init_entry(self._snapshot_key):
+                return None
+            with self.cache.read_transaction(self._snapshot_key) as f:
+                snapshot = sjson.load(f)
+        except (OSError, ValueError, spack.error.SpackError):
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("mtime") != mtime:
+            return None
+        if snapshot.get("head") != head:
+            return None
+        if not all(isinstance(snapshot.get(key), list) for key in ("packages", "empty")):
+            return None
+        return snapshot
+
+    def _write_snapshot(self, mtime: int, head: Optional[str], names: List[str], empty: List[str]):
+        try:
+            if self.cache is None:
+                return
+            self.cache.init_entry(self._snapshot_key)
+            with self.cache.write_transaction(self._snapshot_key) as (old, new):
+                sjson.dump({"mtime": mtime, "head": head, "packages": names, "empty": empty}, new)
+        except (OSError, spack.error.SpackError) as e:
+            tty.debug(f"cannot write the package snapshot of {self.packages_path}: {e}")
+
+    def _create_new_cache(self, use_snapshot: bool) -> Dict[str, Optional[os.stat_result]]:
         """Create a new cache for packages in a repo.
 
         The implementation here should try to minimize filesystem
-        calls.  At the moment, it is O(number of packages) and makes
-        about one stat call per package.  This is reasonably fast, and
-        avoids actually importing packages in Spack, which is slow.
+        calls.  At the moment, it lists the packages directory once with
+        ``os.scandir``, and makes one stat call per package, unless package
+        names can be read from the snapshot in the file cache.  This is
+        reasonably fast, and avoids actually importing packages in Spack,
+        which is slow.
         """
+        # Read the state of the directory before listing it, so that changes made while
+        # listing it invalidate the snapshot
+        dir_mtime = os.stat(self.packages_path).st_mtime_ns
+        head = _git_head(self.packages_path) if self.cache is not None else None
+        snapshot = self._read_snapshot(dir_mtime, head) if use_snapshot else None
+        if snapshot is not None:
+            cache: Dict[str, Optional[os.stat_result]] = dict.fromkeys(snapshot["packages"])
+            # Creating a package.py file in an existing directory doesn't change the
+            # modification time of the packages directory, so check those directories again
+            empty = snapshot["empty"]
+            cache.update((x, sinfo) for x, sinfo in zip(empty, self._stat(empty)) if sinfo)
+            return cache
+
         # Create a dictionary that will store the mapping between a
         # package name and its stat info
-        cache: Dict[str, os.stat_result] = {}
-        for pkg_name in os.listdir(self.packages_path):
-            # Skip non-directories in the package root.
-            pkg_dir = os.path.join(self.packages_path, pkg_name)
-
-            # Warn about invalid names that look like packages.
-            if not nm.valid_module_name(pkg_name):
-                if not pkg_name.startswith(".") and pkg_name != "repo.yaml":
-                    tty.warn(
-                        'Skipping package at {0}. "{1}" is not '
-                        "a valid Spack module name.".format(pkg_dir, pkg_name)
-                    )
-                continue
-
-            # Construct the file name from the directory
-            pkg_file = os.path.join(self.packages_path, pkg_name, package_file_name)
-
-            # Use stat here to avoid lots of calls to the filesystem.
-            try:
-                sinfo = os.stat(pkg_file)
-            except OSError as e:
-                if e.errno == errno.ENOENT:
-                    # No package.py file here.
-                    continue
-                elif e.errno == errno.EACCES:
-                    tty.warn("Can't read package file %s." % pkg_file)
+        candidates = []
+        with os.scandir(self.packages_path) as entries:
+            for entry in entries:
+                # Warn about invalid names that look like packages.
+                if not nm.valid_module_name(entry.name):
+                    if not entry.name.startswith(".") and entry.name != "repo.yaml":
+                        tty.warn(
+                            'Skipping package at {0}. "{1}" is not '
+                            "a valid Spack module name.".format(entry.path, entry.name)
+                        )
                     continue
-                raise e
 
-            # If it's not a file, skip it.
-            if stat.S_ISDIR(sinfo.st_mode):
-                continue
+                # Skip non-directories in the package root.
+                if entry.is_dir():
+                    candidates.append(entry.name)
 
-            # If it is a file, then save the stats under the
-            # appropriate key
-            cache[pkg_name] = sinfo
+        cache = {}
+        empty = []
+        for pkg_name, sinfo in zip(candidates, self._stat(candidates)):
+            if sinfo is None:
+                empty.append(pkg_name)
+            else:
+                cache[pkg_name] = sinfo
 
+        # Directories modified less than a second ago may be modified again without their
+        # modification time changing, on file systems with a coarse resolution
+        if time.time_ns() - dir_mtime > 10**9:
+            self._write_snapshot(dir_mtime, head, sorted(cache), sorted(empty))
         return cache
 
+    def _stat(self, pkg_names: List[str]) -> List[Optional[os.stat_result]]:
+        """Stat the package files of the packages passed as input, in parallel if there are
+        many of them, since latency dominates on network file systems."""
+        paths = [os.path.join(self.packages_path, x, package_file_name) for x in pkg_names]
+        batches = [
+            paths[i : i + self.STAT_BATCH_SIZE] for i in range(0, len(paths), self.STAT_BATCH_SIZE)
+        ]
+        if len(batches) < 2:
+            return _stat_package_files(paths)
+
+        with multiprocessing.pool.ThreadPool(min(len(batches), self.STAT_THREADS)) as pool:
+            return list(itertools.chain.from_iterable(pool.map(_stat_package_files, batches)))
+
+    def _stats(self) -> Dict[str, os.stat_result]:
+        """Return the stats of all package files, computing the ones that are missing."""
+        missing = [name for name, sinfo in self._packages_to_stats.items() if sinfo is None]
+        for pkg_name, sinfo in zip(missing, self._stat(missing)):
+            if sinfo is None:
+                # The package was removed after the snapshot was taken
+                del self._packages_to_stats[pkg_name]
+            else:
+                self._packages_to_stats[pkg_name] = sinfo
+        return {name: sinfo for name, sinfo in self._packages_to_stats.items() if sinfo}
+
     def last_mtime(self):
-        return max(sinfo.st_mtime for sinfo in self._packages_to_stats.values())
+        return max(sinfo.st_mtime for sinfo in self._stats().values())
 
     def modified_since(self, since: float) -> List[str]:
-        return [name for name, sinfo in self._packages_to_stats.items() if sinfo.st_mtime > since]
+        return [name for name, sinfo in self._stats().items() if sinfo.st_mtime > since]
 
     def __getitem__(self, item):
+        if self._packages_to_stats[item] is None:
+            return self._stats()[item]
         return self._packages_to_stats[item]
 
+    def __contains__(self, item):
+        # Don't stat package files just to check whether a package exists
+        return item in self._packages_to_stats
+
     def __iter__(self):
         return iter(self._packages_to_stats)
 
@@ -467,6 +625,19 @@ def needs_update(self, pkg):
         """
         return False
 
+    def cache_key(self) -> Optional[str]:
+        """Key of the code the index depends on, besides package files.
+
+        Indexes computed with different keys are stored in different cache files, so when the
+        key changes the index is computed again for all packages."""
+        return None
+
+    def outdated_packages(self, modified: List[str]) -> Set[str]:
+        """Names of packages whose entries are outdated because other package files were
+        modified, e.g. because they subclass the package classes defined there. This is called
+        after the index is read."""
+        return set()
+
     @abc.abstractmethod
     def read(self, stream):
         """Read this index from a provided file object."""
@@ -475,6 +646,18 @@ def read(self, stream):
     def update(self, pkg_fullname):
         """Update the index in memory with information about a package."""
 
+    def fragment(self, pkg_fullname):
+        """Compute the information about a package that ``merge`` adds to the index.
+
+        This is called in worker processes, before the index is read, so it must not depend on
+        the index, and the result must be picklable. Indexers that return None are updated
+        serially in the parent process instead."""
+        return None
+
+    def merge(self, pkg_fullname, fragment):
+        """Update the index in memory with a fragment computed by ``fragment``."""
+        self.update(pkg_fullname)
+
     @abc.abstractmethod
     def write(self, stream):
         """Write the index to a file object."""
@@ -490,7 +673,16 @@ def read(self, stream):
         self.index = spack.tag.TagIndex.from_json(stream, self.repository)
 
     def update(self, pkg_fullname):
-        self.index.update_package(pkg_fullname.split(".")[-1])
+        self.merge(pkg_fullname, self.fragment(pkg_fullname))
+
+    def fragment(self, pkg_fullname):
+        metadata = self.repository.package_metadata(pkg_fullname)
+        if metadata is not None:
+            return [tag.lower() for tag in metadata.tags]
+        return self._create().package_tags(pkg_fullname.split(".")[-1])
+
+    def merge(self, pkg_fullname, fragment):
+        self.index.update_package(pkg_fullname.split(".")[-1], tags=fragment)
 
     def write(self, stream):
         self.index.to_json(stream)
@@ -505,15 +697,28 @@ def _create(self):
     def read(self, stream):
         self.index = spack.provider_index.ProviderIndex.from_json(stream, self.repository)
 
-    def update(self, pkg_fullname):
+    def _is_virtual(self, pkg_fullname):
         name = pkg_fullname.split(".")[-1]
-        is_virtual = (
-            not self.repository.exists(name) or self.repository.get_pkg_class(name).virtual
-        )
-        if is_virtual:
+        return not self.repository.exists(name) or self.repository.get_pkg_class(name).virtual
+
+    def update(self, pkg_fullname):
+        self.merge(pkg_fullname, self.fragment(pkg_fullname))
+
+    def fragment(self, pkg_fullname):
+        metadata = self.repository.package_metadata(pkg_fullname)
+        if metadata is None and self._is_virtual(pkg_fullname):
+            return {"virtual": True}
+        index = spack.provider_index.ProviderIndex(repository=self.repository)
+        index.update(pkg_fullname, provided=metadata.provided if metadata else None)
+        return {"virtual": False, "providers": index.providers}
+
+    def merge(self, pkg_fullname, fragment):
+        if fragment["virtual"]:
             return
         self.index.remove_provider(pkg_fullname)
-        self.index.update(pkg_fullname)
+        index = spack.provider_index.ProviderIndex(repository=self.repository)
+        index.providers = fragment["providers"]
+        self.index.merge(index)
 
     def write(self, stream):
         self.index.to_json(stream)
@@ -539,7 +744,74 @@ def write(self, stream):
         self.index.to_json(stream)
 
     def update(self, pkg_fullname):
-        self.index.update_package(pkg_fullname)
+        self.merge(pkg_fullname, self.fragment(pkg_fullname))
+
+    def fragment(self, pkg_fullname):
+        metadata = self.repository.package_metadata(pkg_fullname)
+        if metadata is not None and not metadata.patches:
+            return {}
+        return self._create().package_index(pkg_fullname)
+
+    def merge(self, pkg_fullname, fragment):
+        self.index.update_package(pkg_fullname, partial_index=fragment)
+
+
+class DependencyIndexer(Indexer):
+    """Lifecycle methods for the index of direct dependencies."""
+
+    def _create(self):
+        return spack.dependency_index.DependencyIndex(self.repository)
+
+    def cache_key(self):
+        # Dependencies are also added by build systems and directives, which aren't tracked
+        return spack.dependency_index.sources_digest()[:16]
+
+    def read(self, stream):
+        self.index = spack.dependency_index.DependencyIndex.from_json(stream, self.repository)
+
+    def update(self, pkg_fullname):
+        self.merge(pkg_fullname, self.fragment(pkg_fullname))
+
+    def outdated_packages(self, modified):
+        return self.index.packages_importing(modified)
+
+    def fragment(self, pkg_fullname):
+        metadata = self.repository.package_metadata(pkg_fullname)
+        if metadata is not None:
+            return metadata.dependencies, []
+        return self._create().package_dependencies(pkg_fullname.split(".")[-1])
+
+    def merge(self, pkg_fullname, fragment):
+        dependencies, imports = fragment
+        self.index.update_package(
+            pkg_fullname.split(".")[-1], dependencies=dependencies, imports=imports
+        )
+
+    def write(self, stream):
+        self.index.to_json(stream)
+
+
+#: Minimum number of packages to update, for indexes to be updated in parallel
+PARALLEL_INDEX_THRESHOLD = 64
+
+#: Indexers used by the worker processes computing index fragments
+_worker_indexers: Dict[str, Indexer] = {}
+
+
+def _init_index_worker(indexers: Dict[str, Indexer]) -> None:
+    global _worker_indexers
+    _worker_indexers = indexers
+
+
+def _index_fragments(args: Tuple[str, List[str]]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Compute the fragments of a package for the given indexers. Errors are not returned,
+    but raised again when the package is indexed serially by the parent process."""
+    pkg_fullname, names = args
+    try:
+        fragments = {name: _worker_indexers[name].fragment(pkg_fullname) for name in names}
+    except Exception:
+        return pkg_fullname, None
+    return pkg_fullname, fragments
 
 
 class RepoIndex:
@@ -598,15 +870,55 @@ def _build_all_indexes(self):
         because the main bottleneck here is loading all the packages.  It
         can take tens of seconds to regenerate sequentially, and we'd
         rather only pay that cost once rather than on several
-        invocations."""
-        for name, indexer in self.indexers.items():
-            self.indexes[name] = self._build_index(name, indexer)
-
-    def _build_index(self, name: str, indexer: Indexer):
-        """Determine which packages need an update, and update indexes."""
+        invocations.
 
-        # Filename of the provider index cache (we assume they're all json)
-        cache_filename = f"{name}/{self.namespace}-index.json"
+        When many packages need an update, packages are loaded and their
+        index fragments computed by a pool of forked worker processes, and
+        fragments are merged into the indexes by this process."""
+        fragments = self._compute_fragments()
+        for name, indexer in self.indexers.items():
+            self.indexes[name] = self._build_index(name, indexer, fragments.get(name, {}))
+
+    def _cache_filename(self, name: str) -> str:
+        # Filename of the index cache (we assume they're all json)
+        key = self.indexers[name].cache_key()
+        if key:
+            return f"{name}/{self.namespace}-{key}-index.json"
+        return f"{name}/{self.namespace}-index.json"
+
+    def _compute_fragments(self) -> Dict[str, Dict[str, Any]]:
+        """Compute index fragments of packages that need an update in parallel, and return
+        them by indexer name and package full name."""
+        needs_update: Dict[str, List[str]] = {}
+        for name in self.indexers:
+            index_mtime = self.cache.mtime(self._cache_filename(name))
+            for pkg_name in self.checker.modified_since(index_mtime):
+                needs_update.setdefault(f"{self.namespace}.{pkg_name}", []).append(name)
+
+        fragments: Dict[str, Dict[str, Any]] = {name: {} for name in self.indexers}
+        jobs = min(spack.util.cpus.determine_number_of_jobs(parallel=True), len(needs_update))
+        if (
+            len(needs_update) < PARALLEL_INDEX_THRESHOLD
+            or jobs < 2
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            return fragments
+
+        tty.debug(f"[REPO INDEX] computing index fragments of {len(needs_update)} packages")
+        context = multiprocessing.get_context("fork")
+        with context.Pool(jobs, _init_index_worker, (self.indexers,)) as pool:
+            results = pool.imap_unordered(_index_fragments, needs_update.items(), chunksize=16)
+            for pkg_fullname, pkg_fragments in results:
+                for name, fragment in (pkg_fragments or {}).items():
+                    fragments[name][pkg_fullname] = fragment
+        return fragments
+
+    def _build_index(self, name: str, indexer: Indexer, fragments: Dict[str, Any]):
+        """Determine which packages need an update, and update indexes.
+
+        Packages with a precomputed fragment are merged from it, the others are updated
+        by loading them."""
+        cache_filename = self._cache_filename(name)
 
         # Compute which packages needs to be updated in the cache
         index_mtime = self.cache.mtime(cache_filename)
@@ -629,8 +941,16 @@ def _build_index(self, name: str, indexer: Indexer):
                 if new_index_mtime != index_mtime:
                     needs_update = self.checker.modified_since(new_index_mtime)
 
+                outdated = indexer.outdated_packages(needs_update).difference(needs_update)
+                needs_update.extend(sorted(x for x in outdated if x in self.checker))
+
                 for pkg_name in needs_update:
-                    indexer.update(f"{self.namespace}.{pkg_name}")
+                    pkg_fullname = f"{self.namespace}.{pkg_name}"
+                    fragment = fragments.get(pkg_fullname)
+                    if fragment is None:
+                        indexer.update(pkg_fullname)
+                    else:
+                        indexer.merge(pkg_fullname, fragment)
 
                 indexer.write(new)
 
@@ -656,6 +976,7 @@ def __init__(self, *repos, **kwargs):
         self._provider_index = None
         self._patch_index = None
         self._tag_index = None
+        self._dependency_index = None
 
         # Add each repo to this path.
         for repo in repos:
@@ -792,6 +1113,16 @@ def patch_index(self):
 
         return self._patch_index
 
+    @property
+    def dependency_index(self):
+        """Merged DependencyIndex from all Repos in the RepoPath."""
+        if self._dependency_index is None:
+            self._dependency_index = spack.dependency_index.DependencyIndex(repository=self)
+            for repo in reversed(self.repos):
+                self._dependency_index.merge(repo.dependency_index)
+
+        return self._dependency_index
+
     @autospec
     def providers_for(self, vpkg_spec):
         providers = [
@@ -980,6 +1311,9 @@ def check(condition, msg):
         self._repo_index = None
         self._cache = cache or spack.caches.MISC_CACHE
 
+        # Maps package names to the mtime of their package.py, and their static metadata
+        self._metadata: Dict[str, Tuple[float, Any]] = {}
+
     def real_name(self, import_name):
         """Allow users to import Spack packages using Python identifiers.
 
@@ -1100,6 +1434,7 @@ def index(self):
             self._repo_index.add_indexer("providers", ProviderIndexer(self))
             self._repo_index.add_indexer("tags", TagIndexer(self))
             self._repo_index.add_indexer("patches", PatchIndexer(self))
+            self._repo_index.add_indexer("dependencies", DependencyIndexer(self))
         return self._repo_index
 
     @property
@@ -1117,6 +1452,11 @@ def patch_index(self):
         """Index of patches and packages they're defined on."""
         return self.index["patches"]
 
+    @property
+    def dependency_index(self):
+        """Index of the direct dependencies of packages."""
+        return self.index["dependencies"]
+
     @autospec
     def providers_for(self, vpkg_spec):
         providers = self.provider_index.providers_for(vpkg_spec)
@@ -1153,7 +1493,7 @@ def filename_for_package_name(self, pkg_name):
     @property
     def _pkg_checker(self):
         if self._fast_package_checker is None:
-            self._fast_package_checker = FastPackageChecker(self.packages_path)
+            self._fast_package_checker = FastPackageChecker(self.packages_path, cache=self._cache)
         return self._fast_package_checker
 
     def all_package_names(self, include_virtuals=False):
@@ -1222,6 +1562,29 @@ def is_virtual_safe(self, pkg_name):
         """
         return not self.exists(pkg_name) or self.get_pkg_class(pkg_name).virtual
 
+    def package_metadata(
+        self, pkg_name: str
+    ) -> Optional[spack.util.package_metadata.PackageMetadata]:
+        """Return the metadata of a package, read from its ``package.py`` without importing it,
+        or None if the package must be imported to know it."""
+        namespace, pkg_name = self.partition_package_name(pkg_name)
+        if spack.config.get("packages").get(pkg_name, {}).get("package_attributes"):
+            return None
+
+        filename = self.filename_for_package_name(pkg_name)
+        try:
+            mtime = os.stat(filename).st_mtime
+            if pkg_name in self._metadata and self._metadata[pkg_name][0] == mtime:
+                return self._metadata[pkg_name][1]
+            with open(filename, encoding="utf-8") as f:
+                source = f.read()
+        except OSError:
+            return None
+
+        metadata = spack.util.package_metadata.package_metadata(pkg_name, source)
+        self._metadata[pkg_name] = (mtime, metadata)
+        return metadata
+
     def get_pkg_class(self, pkg_name):
         """Get the class for the package out of its module.
 
@@ -1457,6 +1820,8 @@ def add_package(self, name, dependencies=None):
                 Both "dep_type" and "condition" can default to ``None`` in which case
                 ``spack.dependency.default_deptype`` and ``spack.spec.Spec()`` are used.
         """
+        import spack.tengine  # avoid circular import
+
         dependencies = dependencies or []
         context = {"cls_name": spack.util.naming.mod_to_class(name), "dependencies": dependencies}
         template = spack.tengine.make_environment().get_template("mock-repository/package.pyt")
@@ -23,6 +23,7 @@
 import spack.fetch_strategy
 import spack.package_base
 import spack.platforms
+import spack.tengine
 import spack.util.git
 from spack.error import SpackError
 from spack.util.crypto import checksum
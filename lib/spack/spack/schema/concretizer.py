@@ -62,6 +62,16 @@
                 },
             },
             "os_compatible": {"type": "object", "additionalProperties": {"type": "array"}},
+            "cache": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "solutions": {"type": "boolean"},
+                    "package_facts": {"type": "boolean"},
+                    "results": {"type": "boolean"},
+                    "size_limit": {"type": "integer", "minimum": 0},
+                },
+            },
         },
     }
 }
@@ -86,6 +86,7 @@
             "ccache": {"type": "boolean"},
             "concretizer": {"type": "string", "enum": ["original", "clingo"]},
             "db_lock_timeout": {"type": "integer", "minimum": 1},
+            "db_journal": {"type": "boolean"},
             "package_lock_timeout": {
                 "anyOf": [{"type": "integer", "minimum": 1}, {"type": "null"}]
             },
@@ -7,17 +7,33 @@
 import copy
 import enum
 import functools
+import glob
+import hashlib
 import itertools
+import json
 import os
 import pathlib
 import pprint
 import re
 import sys
+import time
 import types
 import typing
 import warnings
 from contextlib import contextmanager
-from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import archspec.cpu
 
@@ -28,19 +44,23 @@
 import spack.binary_distribution
 import spack.cmd
 import spack.compilers
+import spack.concretize
 import spack.config
 import spack.config as sc
 import spack.deptypes as dt
 import spack.directives
 import spack.environment as ev
 import spack.error
+import spack.hash_types as ht
 import spack.package_base
 import spack.package_prefs
 import spack.parser
 import spack.platforms
 import spack.repo
+import spack.solver.cache
 import spack.spec
 import spack.store
+import spack.target
 import spack.util.crypto
 import spack.util.elf
 import spack.util.libc
@@ -80,13 +100,18 @@
 #:     stats (bool): Whether to output Clingo's internal solver statistics.
 #:     out: Optional output stream for the generated ASP program.
 #:     setup_only (bool): if True, stop after setup and don't solve (default False).
+#:     profile (bool): if True, store a profile of the solve in the result (default False).
+#:     profile_grounding (bool): if True, the profile also estimates the time spent grounding
+#:         each logic program, by grounding the problem again once per program (default False).
 OutputConfiguration = collections.namedtuple(
-    "OutputConfiguration", ["timers", "stats", "out", "setup_only"]
+    "OutputConfiguration",
+    ["timers", "stats", "out", "setup_only", "profile", "profile_grounding"],
+    defaults=[False, False],
 )
 
 #: Default output configuration for a solve
 DEFAULT_OUTPUT_CONFIGURATION = OutputConfiguration(
-    timers=False, stats=False, out=None, setup_only=False
+    timers=False, stats=False, out=None, setup_only=False, profile=False
 )
 
 
@@ -376,6 +401,9 @@ def __init__(self, specs, asp=None):
         self._concrete_specs = None
         self._unsolved_specs = None
 
+        # Profile of the solve, if requested
+        self.profile: Optional[Dict[str, Any]] = None
+
     def format_core(self, core):
         """
         Format an unsatisfiable core for human readability
@@ -837,54 +865,61 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             return Result(specs), None, None
         timer.stop("setup")
 
-        timer.start("load")
-        # Add the problem instance
-        self.control.add("base", [], asp_problem)
-        # Load the file itself
-        parent_dir = os.path.dirname(__file__)
-        self.control.load(os.path.join(parent_dir, "concretize.lp"))
-        self.control.load(os.path.join(parent_dir, "heuristic.lp"))
-        self.control.load(os.path.join(parent_dir, "display.lp"))
-        if not setup.concretize_everything:
-            self.control.load(os.path.join(parent_dir, "when_possible.lp"))
+        lp_files = _logic_programs(setup.concretize_everything)
 
-        # Binary compatibility is based on libc on Linux, and on the os tag elsewhere
-        if using_libc_compatibility():
-            self.control.load(os.path.join(parent_dir, "libc_compatibility.lp"))
-        else:
-            self.control.load(os.path.join(parent_dir, "os_compatibility.lp"))
-
-        timer.stop("load")
-
-        # Grounding is the first step in the solve -- it turns our facts
-        # and first-order logic rules into propositional logic.
-        timer.start("ground")
-        self.control.ground([("base", [])])
-        timer.stop("ground")
+        # Look for the answer to the very same problem in the cache
+        cache, cache_key, cached = None, None, None
+        if not output.profile and spack.config.get("concretizer:cache:solutions", False):
+            timer.start("cache")
+            cache = spack.solver.cache.SolverCache("solutions")
+            cache_key = self._solution_cache_key(setup, lp_files)
+            cached = cache.get(cache_key)
+            timer.stop("cache")
 
         # With a grounded program, we can run the solve.
         models = []  # stable models if things go well
         cores = []  # unsatisfiable cores if they do not
 
-        def on_model(model):
-            models.append((model.cost, model.symbols(shown=True, terms=True)))
+        if cached is not None:
+            tty.debug(f"[SOLVER CACHE] reusing solution {cache_key}")
+            models.append((cached["cost"], [parse_term(x) for x in cached["symbols"]]))
+            nmodels, satisfiable = cached["nmodels"], True
 
-        solve_kwargs = {
-            "assumptions": setup.assumptions,
-            "on_model": on_model,
-            "on_core": cores.append,
-        }
+        else:
+            timer.start("load")
+            # Add the problem instance
+            self.control.add("base", [], asp_problem)
+            # Load the file itself
+            for lp_file in lp_files:
+                self.control.load(lp_file)
+            timer.stop("load")
+
+            # Grounding is the first step in the solve -- it turns our facts
+            # and first-order logic rules into propositional logic.
+            timer.start("ground")
+            self.control.ground([("base", [])])
+            timer.stop("ground")
+
+            def on_model(model):
+                models.append((model.cost, model.symbols(shown=True, terms=True)))
+
+            solve_kwargs = {
+                "assumptions": setup.assumptions,
+                "on_model": on_model,
+                "on_core": cores.append,
+            }
 
-        if clingo_cffi():
-            solve_kwargs["on_unsat"] = cores.append
+            if clingo_cffi():
+                solve_kwargs["on_unsat"] = cores.append
 
-        timer.start("solve")
-        solve_result = self.control.solve(**solve_kwargs)
-        timer.stop("solve")
+            timer.start("solve")
+            solve_result = self.control.solve(**solve_kwargs)
+            timer.stop("solve")
+            nmodels, satisfiable = len(models), solve_result.satisfiable
 
         # once done, construct the solve result
         result = Result(specs)
-        result.satisfiable = solve_result.satisfiable
+        result.satisfiable = satisfiable
 
         if result.satisfiable:
             # get the best model
@@ -895,6 +930,17 @@ def on_model(model):
             error_handler = ErrorHandler(best_model)
             error_handler.raise_if_errors()
 
+            if cache is not None and cached is None:
+                cache.put(
+                    cache_key,
+                    {
+                        "cost": list(min_cost),
+                        "symbols": [str(x) for x in best_model],
+                        "nmodels": nmodels,
+                    },
+                )
+                cache.evict()
+
             # build specs from spec attributes in the model
             spec_attrs = [(name, tuple(rest)) for name, *rest in extract_args(best_model, "attr")]
             answers = builder.build_specs(spec_attrs)
@@ -907,7 +953,7 @@ def on_model(model):
             result.criteria = build_criteria_names(min_cost, criteria_args)
 
             # record the number of models the solver considered
-            result.nmodels = len(models)
+            result.nmodels = nmodels
 
             # record the possible dependencies in the solve
             result.possible_dependencies = setup.pkgs
@@ -916,6 +962,11 @@ def on_model(model):
             result.control = self.control
             result.cores.extend(cores)
 
+        if output.profile:
+            result.profile = self._profile(
+                setup, asp_problem, lp_files, timer, grounding=output.profile_grounding
+            )
+
         if output.timers:
             timer.write_tty()
             print()
@@ -936,6 +987,79 @@ def on_model(model):
 
         return result, timer, self.control.statistics
 
+    def _profile(
+        self,
+        setup: "SpackSolverSetup",
+        asp_problem: str,
+        lp_files: List[str],
+        timer,
+        grounding: bool = False,
+    ) -> Dict[str, Any]:
+        """Return a JSON serializable profile of the last solve.
+
+        Clingo grounds all the logic programs at once, so if ``grounding`` is True the time
+        spent grounding each file is estimated by grounding the problem instance with an
+        increasing number of files, in the order they are loaded, and taking the difference
+        between consecutive steps. This grounds the problem ``len(lp_files) + 1`` more times.
+        The time spent profiling is reported in the profile.
+        """
+        profile_start = time.perf_counter()
+        grounding_by_file: Optional[List[Dict[str, Any]]] = None
+        if grounding:
+            grounding_by_file = []
+            previous = 0.0
+            for i in range(len(lp_files) + 1):
+                control = clingo().Control(["--warn=none"])
+                control.add("base", [], asp_problem)
+                for lp_file in lp_files[:i]:
+                    control.load(lp_file)
+                start = time.perf_counter()
+                control.ground([("base", [])])
+                elapsed = time.perf_counter() - start
+                name = os.path.basename(lp_files[i - 1]) if i else "problem instance"
+                grounding_by_file.append({"file": name, "seconds": max(elapsed - previous, 0.0)})
+                previous = elapsed
+
+        lp_statistics = self.control.statistics.get("problem", {}).get("lp", {})
+        conditions = {}
+        for kind, counter in setup.condition_cache_statistics.items():
+            lookups = counter["hits"] + counter["misses"]
+            conditions[kind] = {
+                "hits": counter["hits"],
+                "misses": counter["misses"],
+                "hit_ratio": counter["hits"] / lookups if lookups else None,
+            }
+
+        return {
+            "phases": {name: timer.duration(name) for name in timer.phases},
+            "ground_program": {
+                key: int(lp_statistics.get(key, 0)) for key in ("atoms", "bodies", "rules")
+            },
+            "grounding": grounding_by_file,
+            "conditions": conditions,
+            "package_facts": dict(setup.recipe_facts_statistics),
+            "packages": setup.package_statistics(),
+            "profile_overhead": {
+                "groundings": len(lp_files) + 1 if grounding else 0,
+                "seconds": time.perf_counter() - profile_start,
+            },
+        }
+
+    @staticmethod
+    def _solution_cache_key(setup: "SpackSolverSetup", lp_files: List[str]) -> str:
+        """Return the key of the solution cache for the problem in ``setup``.
+
+        The order of facts and rules doesn't change the meaning of the problem, so
+        they're sorted before hashing.
+        """
+        parts = [f"clingo-{clingo().__version__}"]
+        for lp_file in lp_files:
+            with open(lp_file, encoding="utf-8") as f:
+                parts.append(f.read())
+        parts.extend(str(symbol) for symbol, _ in setup.assumptions)
+        parts.extend(sorted(set(setup.gen.asp_problem)))
+        return spack.solver.cache.cache_key(parts)
+
 
 class ConcreteSpecsByHash(collections.abc.Mapping):
     """Mapping containing concrete specs keyed by DAG hash.
@@ -1014,9 +1138,132 @@ def __iter__(self):
         return iter(self.data)
 
 
+#: Name of the placeholder function used for condition ids in cached package facts
+_RECIPE_ID = "_recipe_id"
+
+#: Matches either a quoted string, or a placeholder for a condition id
+_RECIPE_ID_RE = re.compile(r'"(?:[^"\\]|\\.)*"|' + _RECIPE_ID + r"\((\d+)\)")
+
+#: Version of the format of cached package facts
+_RECIPE_FACTS_VERSION = 1
+
+#: Matches the facts declaring a new condition in the problem instance
+_CONDITION_FACT_RE = re.compile(r'pkg_fact\("?[^,]*"?,condition\(\d+\)\)\.$')
+
+#: Version of the format of cached solve results
+_RESULT_CACHE_VERSION = 2
+
+
+class RecipeFacts(NamedTuple):
+    """Facts derived only from the recipe of a package, with the side effects that
+    computing them has on the solver setup.
+
+    Condition ids in ``text`` are placeholders, numbered from zero, so that the facts can
+    be emitted in any solve after relocating them.
+    """
+
+    text: str
+    ids: int
+    version_constraints: Set[Tuple[str, vn.VersionList]]
+    target_constraints: Set["spack.target.Target"]
+    compiler_version_constraints: Set["spack.spec.CompilerSpec"]
+    variant_values: Set[Tuple[str, str, Any]]
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        """Return a JSON serializable dictionary, or None if the facts can't be serialized"""
+        variant_values = [list(x) for x in sorted(self.variant_values, key=str)]
+        if not all(isinstance(value, (str, bool, int)) for _, _, value in variant_values):
+            return None
+        return {
+            "version": _RECIPE_FACTS_VERSION,
+            "text": self.text,
+            "ids": self.ids,
+            "version_constraints": sorted([x, str(y)] for x, y in self.version_constraints),
+            "target_constraints": sorted(str(x) for x in self.target_constraints),
+            "compiler_version_constraints": sorted(
+                str(x) for x in self.compiler_version_constraints
+            ),
+            "variant_values": variant_values,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> Optional["RecipeFacts"]:
+        """Inverse of ``to_dict``. Returns None if the data is in another format."""
+        if data.get("version") != _RECIPE_FACTS_VERSION:
+            return None
+        return RecipeFacts(
+            text=data["text"],
+            ids=data["ids"],
+            version_constraints={(x, vn.VersionList(y)) for x, y in data["version_constraints"]},
+            target_constraints={spack.target.Target(x) for x in data["target_constraints"]},
+            compiler_version_constraints={
+                spack.spec.CompilerSpec(x) for x in data["compiler_version_constraints"]
+            },
+            variant_values={tuple(x) for x in data["variant_values"]},
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Hash of the content of a file. Modification time and size are there to
+    invalidate the memoized value when the file changes."""
+    return spack.util.crypto.checksum(hashlib.sha256, path)
+
+
+def _logic_programs(concretize_everything: bool) -> List[str]:
+    """Paths of the files with the logic program, in the order they are loaded"""
+    lp_files = ["concretize.lp", "heuristic.lp", "display.lp"]
+    if not concretize_everything:
+        lp_files.append("when_possible.lp")
+
+    # Binary compatibility is based on libc on Linux, and on the os tag elsewhere
+    if using_libc_compatibility():
+        lp_files.append("libc_compatibility.lp")
+    else:
+        lp_files.append("os_compatibility.lp")
+    return [os.path.join(os.path.dirname(__file__), x) for x in lp_files]
+
+
+def _module_digests(*modules: str) -> List[str]:
+    """Hashes of the source files of modules, and of the modules in them if they are
+    packages"""
+    paths = []
+    for name in modules:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if not path:
+            continue
+        if os.path.basename(path) == "__init__.py":
+            paths.extend(sorted(glob.glob(os.path.join(os.path.dirname(path), "*.py"))))
+        else:
+            paths.append(path)
+
+    result = []
+    for path in paths:
+        st = os.stat(path)
+        result.append(_file_digest(path, st.st_mtime_ns, st.st_size))
+    return result
+
+
+def _source_digests(cls: type) -> List[str]:
+    """Hashes of the source files of a class and of its base classes"""
+    result = []
+    for base in cls.__mro__:
+        path = getattr(sys.modules.get(base.__module__), "__file__", None)
+        if not path:
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        result.append(_file_digest(path, st.st_mtime_ns, st.st_size))
+    return result
+
+
 # types for condition caching in solver setup
 ConditionSpecKey = Tuple[str, Optional[TransformFunction]]
-ConditionIdFunctionPair = Tuple[int, List[AspFunction]]
+# condition ids are placeholder functions while recording cached package facts
+ConditionId = Union[int, AspFunction]
+ConditionIdFunctionPair = Tuple[ConditionId, List[AspFunction]]
 ConditionSpecCache = Dict[str, Dict[ConditionSpecKey, ConditionIdFunctionPair]]
 
 
@@ -1046,10 +1293,25 @@ def __init__(self, tests: bool = False):
 
         self.reusable_and_possible: ConcreteSpecsByHash = ConcreteSpecsByHash()
 
-        self._id_counter: Iterator[int] = itertools.count()
+        self._id_counter: Iterator[ConditionId] = itertools.count()
         self._trigger_cache: ConditionSpecCache = collections.defaultdict(dict)
         self._effect_cache: ConditionSpecCache = collections.defaultdict(dict)
 
+        # Persistent cache of the facts derived from package recipes
+        self._recipe_cache: Optional[spack.solver.cache.SolverCache] = None
+        self._recipe_cache_updated = False
+        # Facts derived from package recipes in previous calls to setup(), e.g. in
+        # previous rounds of Solver.solve_in_rounds
+        self._recipe_facts: Dict[str, RecipeFacts] = {}
+
+        # Statistics on the setup, reset at each call to setup()
+        self._package_sections: Dict[str, Tuple[int, int]] = {}
+        self.recipe_facts_statistics: collections.Counter = collections.Counter()
+        self.condition_cache_statistics: Dict[str, collections.Counter] = {
+            "trigger": collections.Counter(),
+            "effect": collections.Counter(),
+        }
+
         # Caches to optimize the setup phase of the solver
         self.target_specs_cache = None
 
@@ -1211,13 +1473,86 @@ def package_requirement_rules(self, pkg):
     def pkg_rules(self, pkg, tests):
         pkg = self.pkg_class(pkg)
 
-        # Namespace of the package
-        self.gen.fact(fn.pkg_fact(pkg.name, fn.namespace(pkg.namespace)))
+        # facts that depend only on the package.py file
+        self.package_recipe_rules(pkg)
 
         # versions
         self.pkg_version_rules(pkg)
         self.gen.newline()
 
+        # virtual preferences
+        self.virtual_preferences(
+            pkg.name,
+            lambda v, p, i: self.gen.fact(fn.pkg_fact(pkg.name, fn.provider_preference(v, p, i))),
+        )
+
+        self.package_requirement_rules(pkg)
+
+        # trigger and effect tables
+        self.trigger_rules()
+        self.effect_rules()
+
+    def package_statistics(self) -> Dict[str, Dict[str, int]]:
+        """Return the number of facts and conditions emitted for each package in the last
+        call to ``setup()``.
+        """
+        result = {}
+        for name, (start, end) in sorted(self._package_sections.items()):
+            lines = "".join(self.gen.asp_problem[start:end]).splitlines()
+            statements = [x for x in lines if x and not x.startswith("%")]
+            result[name] = {
+                "facts": len(statements),
+                "conditions": sum(1 for x in statements if _CONDITION_FACT_RE.match(x)),
+            }
+        return result
+
+    def package_recipe_rules(self, pkg):
+        """Emit the facts that depend only on the recipe of a package, and on the few inputs
+        of the solve that are part of the cache key. Facts are reused across calls to
+        ``setup()`` on the same object and, if ``concretizer:cache:package_facts`` is
+        enabled, across solves.
+        """
+        # Conditions already in the trigger and effect caches would be shared with the
+        # package facts, so in that case the facts can't be cached
+        if self._trigger_cache or self._effect_cache:
+            self.recipe_facts_statistics["uncached"] += 1
+            self._recipe_rules(pkg)
+            return
+
+        key = self._recipe_cache_key(pkg)
+        facts = self._recipe_facts.get(key)
+        source = "reused"
+        if facts is None and self._recipe_cache is not None:
+            data = self._recipe_cache.get(key)
+            facts = RecipeFacts.from_dict(data) if data is not None else None
+            source = "cached"
+        if facts is None:
+            source = "generated"
+            facts = self._record_recipe_rules(pkg)
+            data = facts.to_dict() if self._recipe_cache is not None else None
+            if data is not None:
+                self._recipe_cache.put(key, data)
+                self._recipe_cache_updated = True
+        self._recipe_facts[key] = facts
+        self.recipe_facts_statistics[source] += 1
+
+        ids = [next(self._id_counter) for _ in range(facts.ids)]
+
+        def relocate(match):
+            if match.group(1) is None:
+                return match.group(0)
+            return str(ids[int(match.group(1))])
+
+        self.gen.append(_RECIPE_ID_RE.sub(relocate, facts.text))
+        self.version_constraints.update(facts.version_constraints)
+        self.target_constraints.update(facts.target_constraints)
+        self.compiler_version_constraints.update(facts.compiler_version_constraints)
+        self.variant_values_from_specs.update(facts.variant_values)
+
+    def _recipe_rules(self, pkg):
+        # Namespace of the package
+        self.gen.fact(fn.pkg_fact(pkg.name, fn.namespace(pkg.namespace)))
+
         # languages
         self.package_languages(pkg)
 
@@ -1233,18 +1568,82 @@ def pkg_rules(self, pkg, tests):
         # dependencies
         self.package_dependencies_rules(pkg)
 
-        # virtual preferences
-        self.virtual_preferences(
-            pkg.name,
-            lambda v, p, i: self.gen.fact(fn.pkg_fact(pkg.name, fn.provider_preference(v, p, i))),
-        )
-
-        self.package_requirement_rules(pkg)
-
         # trigger and effect tables
         self.trigger_rules()
         self.effect_rules()
 
+    def _record_recipe_rules(self, pkg) -> RecipeFacts:
+        """Run ``_recipe_rules`` with placeholders for condition ids, and capture its
+        output and side effects.
+        """
+        saved = (
+            self.gen,
+            self._id_counter,
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+            self.variant_values_from_specs,
+        )
+        placeholders = itertools.count()
+        self.gen = ProblemInstanceBuilder()
+        self._id_counter = (AspFunction(_RECIPE_ID, (i,)) for i in placeholders)
+        self.version_constraints = set()
+        self.target_constraints = set()
+        self.compiler_version_constraints = set()
+        self.variant_values_from_specs = set()
+        try:
+            self._recipe_rules(pkg)
+            return RecipeFacts(
+                text=self.gen.value(),
+                ids=next(placeholders),
+                version_constraints=self.version_constraints,
+                target_constraints=self.target_constraints,
+                compiler_version_constraints=self.compiler_version_constraints,
+                variant_values=self.variant_values_from_specs,
+            )
+        finally:
+            (
+                self.gen,
+                self._id_counter,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+            ) = saved
+
+    def _recipe_cache_key(self, pkg) -> str:
+        """Key of the facts of a package in the cache. Besides the package and its base
+        classes, the key accounts for direct dependencies, since their variants are
+        validated, for the providers of the virtuals the package refers to, and for the
+        code generating the facts.
+        """
+        tests = self.tests is True or (not isinstance(self.tests, bool) and pkg.name in self.tests)
+        parts = [str(_RECIPE_FACTS_VERSION), str(spack.spack_version), pkg.fullname, str(tests)]
+        parts.extend(_source_digests(type(self)) + _source_digests(AspFunction))
+        parts.extend(_source_digests(pkg))
+        provided = set(pkg.provided_virtual_names())
+        virtuals = set(provided)
+        for name in sorted(pkg.dependency_names()):
+            if spack.repo.PATH.is_virtual(name):
+                virtuals.add(name)
+            if spack.repo.PATH.exists(name):
+                parts.extend(_source_digests(self.pkg_class(name)))
+        parts.extend(sorted(x for x in provided if x in self.possible_virtuals))
+
+        # Whether a name is virtual, and which packages provide it, changes the facts
+        # emitted for dependencies on that name
+        providers = spack.repo.PATH.provider_index.providers
+        for name in sorted(virtuals):
+            parts.append(f"virtual:{name}")
+            parts.extend(
+                sorted(
+                    f"{when}:{provider}"
+                    for when, specs in providers.get(name, {}).items()
+                    for provider in specs
+                )
+            )
+        return spack.solver.cache.cache_key(parts)
+
     def trigger_rules(self):
         """Flushes all the trigger rules collected so far, and clears the cache."""
         if not self._trigger_cache:
@@ -1374,7 +1773,7 @@ def _get_condition_id(
         cache: ConditionSpecCache,
         body: bool,
         transform: Optional[TransformFunction] = None,
-    ) -> int:
+    ) -> ConditionId:
         """Get the id for one half of a condition (either a trigger or an imposed constraint).
 
         Construct a key from the condition spec and any associated transformation, and
@@ -1389,8 +1788,11 @@ def _get_condition_id(
 
         named_cond_key = (str(named_cond), transform)
         result = pkg_cache.get(named_cond_key)
+        statistics = self.condition_cache_statistics["trigger" if body else "effect"]
         if result:
+            statistics["hits"] += 1
             return result[0]
+        statistics["misses"] += 1
 
         cond_id = next(self._id_counter)
         requirements = self.spec_clauses(named_cond, body=body)
@@ -2431,6 +2833,11 @@ def setup(
                 self.explicitly_required_namespaces[node.name] = node.namespace
 
         self.gen = ProblemInstanceBuilder()
+        self._package_sections.clear()
+        self.recipe_facts_statistics.clear()
+        for counter in self.condition_cache_statistics.values():
+            counter.clear()
+
         compiler_parser = CompilerParser(configuration=spack.config.CONFIG).with_input_specs(specs)
 
         if using_libc_compatibility():
@@ -2507,11 +2914,18 @@ def setup(
         )
 
         self.gen.h1("Package Constraints")
+        if spack.config.get("concretizer:cache:package_facts", False):
+            self._recipe_cache = spack.solver.cache.SolverCache("package_facts")
         for pkg in sorted(self.pkgs):
+            start = len(self.gen.asp_problem)
             self.gen.h2("Package rules: %s" % pkg)
             self.pkg_rules(pkg, tests=self.tests)
             self.gen.h2("Package preferences: %s" % pkg)
             self.preferred_variants(pkg)
+            self._package_sections[pkg] = (start, len(self.gen.asp_problem))
+        if self._recipe_cache is not None and self._recipe_cache_updated:
+            self._recipe_cache.evict()
+            self._recipe_cache_updated = False
 
         self.gen.h1("Develop specs")
         # Inject dev_path from environment
@@ -3063,8 +3477,13 @@ def add_compiler_from_concrete_spec(self, spec: "spack.spec.Spec") -> None:
         self.compilers.add(candidate)
 
     def possible_compilers(self) -> List[KnownCompiler]:
-        # Here we have to sort two times, first sort by name and ascending version
-        result = sorted(self.compilers, key=lambda x: (x.spec.name, x.spec.version), reverse=True)
+        # Here we have to sort two times, first sort by name and ascending version. Sorting
+        # also by os and target keeps the generated problem stable across runs.
+        result = sorted(
+            self.compilers,
+            key=lambda x: (x.spec.name, x.spec.version, x.os, x.target),
+            reverse=True,
+        )
         # Then stable sort to prefer available compilers and account for preferences
         ppk = spack.package_prefs.PackagePrefs("all", "compiler", all=False)
         result.sort(key=lambda x: (not x.available, ppk(x.spec)))
@@ -3855,6 +4274,8 @@ def solve(
         tests=False,
         setup_only=False,
         allow_deprecated=False,
+        profile=False,
+        profile_grounding=False,
     ):
         """
         Arguments:
@@ -3867,20 +4288,134 @@ def solve(
             packages (defaults to False: do not concretize test dependencies).
           setup_only (bool): if True, stop after setup and don't solve (default False).
           allow_deprecated (bool): allow deprecated version in the solve
+          profile (bool): if True, store a profile of the solve in the result
+          profile_grounding (bool): if True, the profile also estimates the time spent
+            grounding each logic program, which grounds the problem once more per program
         """
         # Check upfront that the variants are admissible
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
         reusable_specs.extend(self.selector.reusable_specs(specs))
+
+        # Results are cached only when there's no diagnostic output to produce
+        cache, cache_key = None, None
+        diagnostics = out is not None or timers or stats or setup_only or profile
+        if not diagnostics and spack.config.get("concretizer:cache:results", False):
+            cache = spack.solver.cache.SolverCache("results")
+            cache_key = self._result_cache_key(specs, reusable_specs, tests, allow_deprecated)
+            data = cache.get(cache_key)
+            if data is not None:
+                result = self._result_from_dict(specs, data)
+                if result is not None:
+                    tty.debug(f"[SOLVER CACHE] reusing concrete specs {cache_key}")
+                    return result
+
         setup = SpackSolverSetup(tests=tests)
-        output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=setup_only)
+        output = OutputConfiguration(
+            timers=timers,
+            stats=stats,
+            out=out,
+            setup_only=setup_only,
+            profile=profile,
+            profile_grounding=profile_grounding,
+        )
         result, _, _ = self.driver.solve(
             setup, specs, reuse=reusable_specs, output=output, allow_deprecated=allow_deprecated
         )
+        if cache is not None and result.satisfiable and not result.unsolved_specs:
+            cache.put(cache_key, self._result_to_dict(result))
+            cache.evict()
+        return result
+
+    @staticmethod
+    def _result_cache_key(specs, reusable_specs, tests, allow_deprecated) -> str:
+        """Fingerprint of the inputs of a solve, used as a key in the result cache"""
+        check_packages_exist(specs)
+        parts = [str(_RESULT_CACHE_VERSION), str(spack.spack_version)]
+        parts.extend(_source_digests(SpackSolverSetup) + _source_digests(AspFunction))
+
+        # Logic program, solver, and the code that builds and compares specs
+        parts.append(f"clingo-{clingo().__version__}")
+        parts.extend(_module_digests("spack.spec", "spack.version"))
+        for lp_file in _logic_programs(concretize_everything=True):
+            with open(lp_file, encoding="utf-8") as f:
+                parts.append(f.read())
+        parts.extend([str(tests), str(allow_deprecated)])
+        parts.append(str("SPACK_CONCRETIZER_REQUIRE_CHECKSUM" in os.environ))
+        parts.extend([str(spack.platforms.host()), str(archspec.cpu.host())])
+
+        # Abstract specs, and hashes of their concrete parts
+        for spec in specs:
+            parts.append(str(spec))
+            parts.extend(x.dag_hash() for x in spec.traverse() if x.concrete)
+
+        # Recipes of all the packages that can be part of the solution
+        counter = _create_counter(specs, tests=tests)
+        for name in sorted(counter.possible_dependencies()):
+            if not spack.repo.PATH.exists(name):
+                continue
+            pkg_cls = spack.repo.PATH.get_pkg_class(name)
+            parts.append(pkg_cls.fullname)
+            parts.extend(_source_digests(pkg_cls))
+
+        # Configuration, and the specs that can be reused
+        for section in ("compilers", "concretizer", "config", "packages"):
+            parts.append(json.dumps(spack.config.get(section), sort_keys=True, default=str))
+        env = ev.active_environment()
+        if env:
+            parts.append(json.dumps(env.dev_specs, sort_keys=True, default=str))
+        parts.extend(sorted(x.dag_hash() for x in reusable_specs))
+        return spack.solver.cache.cache_key(str(x) for x in parts)
+
+    @staticmethod
+    def _result_to_dict(result: Result) -> Dict[str, Any]:
+        """Serialize the best answer of a result, for the result cache"""
+        cost, _, answer = min(result.answers)
+        specs = {x.dag_hash(): x for x in answer.values()}
+        dependencies = {x.dag_hash() for spec in specs.values() for x in spec.traverse(root=False)}
+        return {
+            "version": _RESULT_CACHE_VERSION,
+            "cost": list(cost),
+            "criteria": [list(x) for x in result.criteria],
+            "nmodels": result.nmodels,
+            "nodes": [[node.id, node.pkg, spec.dag_hash()] for node, spec in answer.items()],
+            "specs": [
+                spec.to_dict(hash=ht.dag_hash)
+                for h, spec in sorted(specs.items())
+                if h not in dependencies
+            ],
+        }
+
+    @staticmethod
+    def _result_from_dict(specs, data: Dict[str, Any]) -> Optional[Result]:
+        """Inverse of ``_result_to_dict``. Returns None if the data can't be used."""
+        if data.get("version") != _RESULT_CACHE_VERSION:
+            return None
+
+        concrete = ConcreteSpecsByHash()
+        for spec_dict in data["specs"]:
+            concrete.add(spack.spec.Spec.from_dict(spec_dict))
+
+        result = Result(specs)
+        result.satisfiable = True
+        answer = {NodeArgument(id=i, pkg=pkg): concrete[h] for i, pkg, h in data["nodes"]}
+        result.answers.append((data["cost"], 0, answer))
+        result.criteria = [tuple(x) for x in data["criteria"]]
+        result.nmodels = data["nmodels"]
+        if result.unsolved_specs:
+            return None
         return result
 
     def solve_in_rounds(
-        self, specs, out=None, timers=False, stats=False, tests=False, allow_deprecated=False
+        self,
+        specs,
+        out=None,
+        timers=False,
+        stats=False,
+        tests=False,
+        allow_deprecated=False,
+        profile=False,
+        profile_grounding=False,
     ):
         """Solve for a stable model of specs in multiple rounds.
 
@@ -3888,7 +4423,8 @@ def solve_in_rounds(
         solvable in a single round. Each round tries to maximize the reuse of specs
         from previous rounds.
 
-        The function is a generator that yields the result of each round.
+        The function is a generator that yields the result of each round. Facts derived from
+        package recipes are generated once, and reused by later rounds.
 
         Arguments:
             specs (list): list of Specs to solve.
@@ -3897,6 +4433,9 @@ def solve_in_rounds(
             stats (bool): print internal statistics if set to True
             tests (bool): add test dependencies to the solve
             allow_deprecated (bool): allow deprecated version in the solve
+            profile (bool): if True, store a profile of each round in its result
+            profile_grounding (bool): if True, profiles also estimate the time spent
+                grounding each logic program, which grounds each round once more per program
         """
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
@@ -3907,7 +4446,14 @@ def solve_in_rounds(
         setup.concretize_everything = False
 
         input_specs = specs
-        output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=False)
+        output = OutputConfiguration(
+            timers=timers,
+            stats=stats,
+            out=out,
+            setup_only=False,
+            profile=profile,
+            profile_grounding=profile_grounding,
+        )
         while True:
             result, _, _ = self.driver.solve(
                 setup,
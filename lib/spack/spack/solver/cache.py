@@ -0,0 +1,117 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Persistent caches used to speed-up repeated concretizations.
+
+Entries are stored as JSON files in Spack's misc cache, and are addressed by a hash of
+their inputs. Since an entry never changes once written, the caches don't need locks:
+entries are written to a temporary file and moved into place atomically, and concurrent
+writers of the same key write the same content.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Iterable, Optional
+
+import llnl.util.tty as tty
+from llnl.util.filesystem import mkdirp, rename
+
+import spack.caches
+import spack.config
+
+#: Default maximum size of each cache, in megabytes
+DEFAULT_SIZE_LIMIT = 256
+
+
+def cache_key(parts: Iterable[str]) -> str:
+    """Return a key for a cache entry, computed from its inputs"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SolverCache:
+    """Content-addressed cache of JSON entries, with least-recently-used eviction.
+
+    Reading an entry updates its modification time, so that when the total size of the
+    cache exceeds its limit the entries that were not used for the longest time are
+    evicted first. Eviction is explicit, so that clients writing many entries at once
+    can scan the cache only once.
+    """
+
+    def __init__(self, name: str, *, size_limit: Optional[int] = None) -> None:
+        """
+        Args:
+            name: name of the cache, used as its sub-directory in the misc cache
+            size_limit: maximum size of the cache, in bytes. Defaults to
+                ``concretizer:cache:size_limit``
+        """
+        self.root = spack.caches.MISC_CACHE.cache_path(os.path.join("solver", name))
+        if size_limit is None:
+            size_limit = spack.config.get("concretizer:cache:size_limit", DEFAULT_SIZE_LIMIT)
+            size_limit *= 1024 * 1024
+        self.size_limit = size_limit
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under a key, or None if it's not in the cache"""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            tty.debug(f"[SOLVER CACHE] cannot read {path}: {e}")
+            return None
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value under a key. Errors are reported, but not raised."""
+        try:
+            mkdirp(self.root)
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=".json")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(value, f, separators=(",", ":"))
+                rename(tmp, self._path(key))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            tty.debug(f"[SOLVER CACHE] cannot write {self._path(key)}: {e}")
+
+    def evict(self) -> None:
+        """Remove the least recently used entries, until the cache fits its size limit"""
+        entries = []
+        if not os.path.isdir(self.root):
+            return
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.name.startswith(".") or not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.size_limit:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.size_limit:
+                break
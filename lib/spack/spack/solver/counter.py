@@ -105,8 +105,9 @@ def _compute_cache_values(self):
             )
         )
         self._link_run_virtuals.update(self._possible_virtuals)
+        dependency_index = spack.repo.PATH.dependency_index
         for x in self._link_run:
-            build_dependencies = spack.repo.PATH.get_pkg_class(x).dependencies_of_type(dt.BUILD)
+            build_dependencies = dependency_index.dependencies_of_type(x, dt.BUILD)
             virtuals, reals = lang.stable_partition(
                 build_dependencies, spack.repo.PATH.is_virtual_safe
             )
@@ -156,6 +156,8 @@ class Store:
             truncated to this length
         upstreams: optional list of upstream databases
         lock_cfg: lock configuration for the database
+        db_journal: whether the database appends changes to a journal, instead of rewriting
+            its index file on every write
     """
 
     def __init__(
@@ -166,6 +168,7 @@ def __init__(
         hash_length: Optional[int] = None,
         upstreams: Optional[List[spack.database.Database]] = None,
         lock_cfg: spack.database.LockConfiguration = spack.database.NO_LOCK,
+        db_journal: bool = False,
     ) -> None:
         self.root = root
         self.unpadded_root = unpadded_root or root
@@ -173,7 +176,10 @@ def __init__(
         self.hash_length = hash_length
         self.upstreams = upstreams
         self.lock_cfg = lock_cfg
-        self.db = spack.database.Database(root, upstream_dbs=upstreams, lock_cfg=lock_cfg)
+        self.db_journal = db_journal
+        self.db = spack.database.Database(
+            root, upstream_dbs=upstreams, lock_cfg=lock_cfg, journal=db_journal
+        )
 
         timeout_format_str = (
             f"{str(lock_cfg.package_timeout)}s" if lock_cfg.package_timeout else "No timeout"
@@ -203,6 +209,7 @@ def __reduce__(self):
             self.hash_length,
             self.upstreams,
             self.lock_cfg,
+            self.db_journal,
         )
 
 
@@ -230,6 +237,7 @@ def create(configuration: ConfigurationType) -> Store:
         hash_length=hash_length,
         upstreams=upstreams,
         lock_cfg=spack.database.lock_configuration(configuration),
+        db_journal=configuration.get("config:db_journal", False),
     )
 
 
@@ -108,13 +108,15 @@ def merge(self, other):
             spkgs, opkgs = self.tags[tag], other.tags[tag]
             self.tags[tag] = sorted(list(set(spkgs + opkgs)))
 
-    def update_package(self, pkg_name):
+    def update_package(self, pkg_name, tags=None):
         """Updates a package in the tag index.
 
         Args:
             pkg_name (str): name of the package to be removed from the index
+            tags (list): tags of the package. If not given, they are read from the package
         """
-        pkg_cls = self.repository.get_pkg_class(pkg_name)
+        if tags is None:
+            tags = self.package_tags(pkg_name)
 
         # Remove the package from the list of packages, if present
         for pkg_list in self._tag_dict.values():
@@ -122,9 +124,13 @@ def update_package(self, pkg_name):
                 pkg_list.remove(pkg_name)
 
         # Add it again under the appropriate tags
-        for tag in getattr(pkg_cls, "tags", []):
-            tag = tag.lower()
-            self._tag_dict[tag].append(pkg_cls.name)
+        for tag in tags:
+            self._tag_dict[tag].append(pkg_name)
+
+    def package_tags(self, pkg_name):
+        """Returns the lowercase tags of a package, as stored in the index."""
+        pkg_cls = self.repository.get_pkg_class(pkg_name)
+        return [tag.lower() for tag in getattr(pkg_cls, "tags", [])]
 
 
 class TagIndexError(spack.error.SpackError):
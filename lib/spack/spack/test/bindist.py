@@ -2,12 +2,15 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import errno
 import filecmp
 import glob
 import gzip
 import io
 import json
+import multiprocessing.pool
 import os
+import pickle
 import platform
 import sys
 import tarfile
@@ -27,6 +30,7 @@
 import spack.binary_distribution as bindist
 import spack.caches
 import spack.config
+import spack.error
 import spack.fetch_strategy
 import spack.hooks.sbang as sbang
 import spack.main
@@ -34,6 +38,7 @@
 import spack.repo
 import spack.store
 import spack.util.gpg
+import spack.util.s3
 import spack.util.spack_yaml as syaml
 import spack.util.url as url_util
 import spack.util.web as web_util
@@ -1027,6 +1032,31 @@ def test_tarball_normalized_permissions(tmpdir):
     assert path_to_member[f"{expected_prefix}/share/file"].mode == 0o644
 
 
+def test_tarball_relocation_offsets(tmpdir):
+    """Tests that the offsets of prefixes in binaries are stored next to the buildinfo
+    file instead of in it, and that stale offsets in the prefix are not archived."""
+    p = tmpdir.mkdir("prefix")
+    p.mkdir(".spack")
+    p.join(".spack", "binary_distribution_offsets.json").write("stale")
+    tarball = str(tmpdir.join("prefix.tar.gz"))
+
+    offsets = {"bin/app": [3, 10, 4096], "lib/libfoo.so": []}
+    buildinfo = {"relocate_binaries": list(offsets), "relocate_binaries_offsets": offsets}
+    bindist._do_create_tarball(tarball, binaries_dir=p.strpath, buildinfo=buildinfo)
+
+    extracted = tmpdir.join("extracted")
+    with tarfile.open(tarball) as tar:
+        names = [member.name for member in tar.getmembers()]
+        tar.extractall(str(extracted))
+    expected_prefix = p.strpath.lstrip("/")
+    assert names.count(f"{expected_prefix}/.spack/binary_distribution_offsets.json") == 1
+
+    prefix = str(extracted.join(expected_prefix))
+    assert "relocate_binaries_offsets" not in bindist.read_buildinfo_file(prefix)
+    assert bindist.read_relocation_offsets(prefix) == offsets
+    assert bindist.read_relocation_offsets(str(tmpdir)) is None
+
+
 def test_tarball_common_prefix(dummy_prefix, tmpdir):
     """Tests whether Spack can figure out the package directory from the tarball contents, and
     strip them when extracting. This test creates a CURRENT_BUILD_CACHE_LAYOUT_VERSION=1 type
@@ -1232,3 +1262,104 @@ def test_download_tarball_with_unsupported_layout_fails(tmp_path, mutable_config
 
     # And there should be a warning about an unsupported layout version.
     assert f"Layout version {layout_version} is too new" in capsys.readouterr().err
+
+
+def test_no_checksum_exception_is_picklable():
+    e = bindist.NoChecksumException("/path", 10, b"abc", "sha256", "expected", "computed")
+    restored = pickle.loads(pickle.dumps(e))
+    assert str(restored) == str(e)
+
+    e = bindist.NoOverwriteException("/path")
+    assert str(pickle.loads(pickle.dumps(e))) == str(e)
+
+
+class _S3StandIn:
+    """In-memory S3 bucket, implementing what's needed to push to a build cache"""
+
+    class ClientError(Exception):
+        pass
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, local_path, bucket, key, ExtraArgs=None):
+        with open(local_path, "rb") as f:
+            self.objects[f"{bucket}/{key}"] = f.read()
+
+    def head_object(self, Bucket=None, Key=None):
+        if f"{Bucket}/{Key}" not in self.objects:
+            raise self.ClientError(f"{Bucket}/{Key} not found")
+        return {"ResponseMetadata": {"HTTPHeaders": {}}}
+
+
+class _SerialPool:
+    def imap_unordered(self, func, args):
+        return (func(x) for x in args)
+
+
+def test_push_specs_to_s3(mutable_database, monkeypatch):
+    s3 = _S3StandIn()
+    monkeypatch.setattr(spack.util.s3, "get_s3_session", lambda url, method="fetch": s3)
+    monkeypatch.setattr(web_util, "get_s3_session", lambda url, method="fetch": s3)
+
+    specs = [mutable_database.query_local(name, installed=True)[0] for name in ("libelf", "zmpi")]
+    options = bindist.PushOptions(unsigned=True)
+    results = list(bindist.push_specs(specs, "s3://bucket/mirror", options, _SerialPool()))
+
+    assert sorted(spec.name for spec, _ in results) == ["libelf", "zmpi"]
+    assert all(error is None for _, error in results)
+    for spec in specs:
+        assert (
+            f"bucket/mirror/build_cache/{bindist.tarball_path_name(spec, '.spack')}" in s3.objects
+        )
+        assert (
+            f"bucket/mirror/build_cache/{bindist.tarball_name(spec, '.spec.json')}" in s3.objects
+        )
+
+    # Existing specs are reported, and not overwritten
+    results = list(bindist.push_specs(specs, "s3://bucket/mirror", options, _SerialPool()))
+    assert all(isinstance(error, bindist.NoOverwriteException) for _, error in results)
+
+
+class _UnpicklableError(spack.error.SpackError):
+    def __init__(self, name, reason):
+        super().__init__(f"cannot push {name}: {reason}")
+
+
+def test_push_specs_keeps_errors_in_process(mutable_database, monkeypatch):
+    """Tests that errors are reported as they are raised, when specs are pushed in-process"""
+
+    def _push_or_raise(spec, out_url, options):
+        raise _UnpicklableError(spec.name, "no space left")
+
+    monkeypatch.setattr(bindist, "push_or_raise", _push_or_raise)
+    specs = [mutable_database.query_local("libelf", installed=True)[0]]
+    options = bindist.PushOptions(unsigned=True)
+    ((spec, error),) = bindist.push_specs(specs, "file:///nowhere", options, _SerialPool())
+
+    assert isinstance(error, _UnpicklableError)
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="workers need the patched function"
+)
+def test_push_specs_reports_unpicklable_errors(mutable_database, monkeypatch):
+    """Tests that errors of worker processes are reported, even if they can't be pickled"""
+
+    def _push_or_raise(spec, out_url, options):
+        if spec.name == "libelf":
+            raise _UnpicklableError(spec.name, "no space left")
+        raise OSError(errno.EACCES, "Permission denied")
+
+    monkeypatch.setattr(bindist, "push_or_raise", _push_or_raise)
+    specs = [mutable_database.query_local(name, installed=True)[0] for name in ("libelf", "zmpi")]
+    options = bindist.PushOptions(unsigned=True)
+    with multiprocessing.pool.Pool(2) as pool:
+        errors = {
+            spec.name: error
+            for spec, error in bindist.push_specs(specs, "file:///nowhere", options, pool)
+        }
+
+    assert isinstance(errors["libelf"], bindist.PushToBuildCacheError)
+    assert str(errors["libelf"]) == "_UnpicklableError: cannot push libelf: no space left"
+    assert isinstance(errors["zmpi"], OSError) and errors["zmpi"].errno == errno.EACCES
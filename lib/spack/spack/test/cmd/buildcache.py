@@ -5,6 +5,7 @@
 
 import errno
 import json
+import multiprocessing.pool
 import os
 import shutil
 
@@ -16,6 +17,7 @@
 import spack.main
 import spack.spec
 import spack.util.url
+import spack.util.web
 from spack.spec import Spec
 
 buildcache = spack.main.SpackCommand("buildcache")
@@ -397,6 +399,8 @@ def fake_push(node, push_url, options):
         packages_to_push.append(node.name)
 
     monkeypatch.setattr(spack.binary_distribution, "push_or_raise", fake_push)
+    # Push in this process, to record the specs
+    monkeypatch.setattr(spack.cmd.buildcache, "_make_pool", spack.cmd.buildcache.NoPool)
 
     buildcache_create_args = ["create", "--unsigned"]
 
@@ -448,8 +452,88 @@ def test_push_and_install_with_mirror_marked_unsigned_does_not_require_extra_fla
     spec.package.do_install(**kwargs)
 
 
+def test_push_many_specs_concurrently(tmp_path, mutable_database):
+    """Tests pushing many specs with a pool of workers, and updating the index only once"""
+    specs = mutable_database.query_local("mpileaks", installed=True)
+    hashes = {x.dag_hash() for spec in specs for x in spec.traverse(root=True)}
+    mirror_url = spack.util.url.path_to_file_url(str(tmp_path))
+
+    out = buildcache(
+        "push", "--unsigned", "--update-index", mirror_url, *(f"/{h}" for h in hashes)
+    )
+    assert out.count("Pushed") == len(hashes)
+
+    with open(tmp_path / "build_cache" / "index.json") as f:
+        index = json.load(f)
+    assert set(index["database"]["installs"]) == hashes
+
+    out = buildcache("push", "--unsigned", mirror_url, *(f"/{h}" for h in hashes))
+    assert "All specs are already in the buildcache" in out
+
+
+def test_update_index_reads_only_new_spec_files(tmp_path, mutable_database, monkeypatch):
+    libelf, libdwarf, zmpi = (
+        mutable_database.query_local(name, installed=True)[0]
+        for name in ("libelf", "libdwarf", "zmpi")
+    )
+    mirror_url = spack.util.url.path_to_file_url(str(tmp_path))
+    buildcache("push", "--unsigned", "--update-index", mirror_url, f"/{libelf.dag_hash()}")
+    buildcache("push", "--unsigned", "--only=package", mirror_url, f"/{zmpi.dag_hash()}")
+
+    read_urls = []
+    read_from_url = spack.util.web.read_from_url
+
+    def _read_from_url(url, *args, **kwargs):
+        read_urls.append(url)
+        return read_from_url(url, *args, **kwargs)
+
+    monkeypatch.setattr(spack.util.web, "read_from_url", _read_from_url)
+
+    def indexed_hashes():
+        with open(tmp_path / "build_cache" / "index.json") as f:
+            index = json.load(f)
+        return {h for h, rec in index["database"]["installs"].items() if rec["in_buildcache"]}
+
+    # Only the spec file of the spec pushed without updating the index is read
+    buildcache("update-index", mirror_url)
+    assert indexed_hashes() == {libelf.dag_hash(), zmpi.dag_hash()}
+    assert [url for url in read_urls if url.endswith(".spec.json")] == [
+        spack.util.url.join(
+            mirror_url, "build_cache", spack.binary_distribution.tarball_name(zmpi, ".spec.json")
+        )
+    ]
+
+    # Specs whose spec files are removed are dropped from the index
+    os.remove(
+        tmp_path / "build_cache" / spack.binary_distribution.tarball_name(zmpi, ".spec.json")
+    )
+    buildcache("push", "--unsigned", "--only=package", mirror_url, f"/{libdwarf.dag_hash()}")
+    read_urls.clear()
+    buildcache("update-index", mirror_url)
+    assert indexed_hashes() == {libelf.dag_hash(), libdwarf.dag_hash()}
+    assert len([url for url in read_urls if url.endswith(".spec.json")]) == 1
+
+    # A full update reads all spec files
+    read_urls.clear()
+    buildcache("update-index", "--full", mirror_url)
+    assert indexed_hashes() == {libelf.dag_hash(), libdwarf.dag_hash()}
+    assert len([url for url in read_urls if url.endswith(".spec.json")]) == 2
+
+
 def test_skip_no_redistribute(mock_packages, config):
     specs = list(Spec("no-redistribute-dependent").concretized().traverse())
     filtered = spack.cmd.buildcache._skip_no_redistribute_for_public(specs)
     assert not any(s.name == "no-redistribute" for s in filtered)
     assert any(s.name == "no-redistribute-dependent" for s in filtered)
+
+
+def test_jobs_per_push_worker(monkeypatch):
+    """Tests that the threads compressing tarballs are shared among the workers pushing specs
+    concurrently, and not among all the specs"""
+    monkeypatch.setattr(spack.cmd.buildcache, "determine_number_of_jobs", lambda parallel: 8)
+    assert spack.cmd.buildcache._jobs_per_worker(spack.cmd.buildcache.NoPool(), 4) == 8
+
+    with multiprocessing.pool.ThreadPool(1) as pool:
+        assert spack.cmd.buildcache._jobs_per_worker(pool, 2) == 4
+        assert spack.cmd.buildcache._jobs_per_worker(pool, 3) == 2
+        assert spack.cmd.buildcache._jobs_per_worker(pool, 100) == 1
@@ -1180,6 +1180,37 @@ def install_use_buildcache(opt):
             install_use_buildcache(opt)
 
 
+@pytest.mark.not_on_windows("Buildcache not supported on windows")
+def test_install_concurrent_packages_from_buildcache(
+    mock_packages,
+    mock_fetch,
+    mock_archive,
+    mock_binary_index,
+    tmpdir,
+    install_mockery_mutable_config,
+):
+    """Tests extracting several packages from a buildcache at the same time"""
+    mirror_dir = tmpdir.join("mirror_dir")
+    install("dependent-install")
+    buildcache("push", "-u", "-f", mirror_dir.strpath, "dependent-install", "dependency-install")
+    uninstall("-y", "-a")
+    mirror("add", "test-mirror", "file://{0}".format(mirror_dir.strpath))
+
+    out = install(
+        "--no-check-signature",
+        "--cache-only",
+        "--concurrent-packages",
+        "2",
+        "dependent-install",
+        fail_on_error=True,
+    )
+
+    assert "Extracting dependency-install" in out
+    assert "Extracting dependent-install" in out
+    spec = spack.spec.Spec("dependent-install").concretized()
+    assert all(s.installed for s in spec.traverse())
+
+
 @pytest.mark.not_on_windows("Windows logger I/O operation on closed file when install fails")
 @pytest.mark.regression("34006")
 @pytest.mark.disable_clean_stage_check
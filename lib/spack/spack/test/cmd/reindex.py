@@ -22,9 +22,10 @@ def test_reindex_basic(mock_packages, mock_archive, mock_fetch, install_mockery)
 
     all_installed = spack.store.STORE.db.query()
 
-    reindex()
+    output = reindex()
 
     assert spack.store.STORE.db.query() == all_installed
+    assert f"Reindexed {len(all_installed)} specs" in output
 
 
 def test_reindex_db_deleted(mock_packages, mock_archive, mock_fetch, install_mockery):
@@ -0,0 +1,75 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import json
+
+import pytest
+
+from spack.main import SpackCommand
+
+solve = SpackCommand("solve")
+
+pytestmark = pytest.mark.only_clingo("spack solve requires clingo")
+
+
+def test_solve_profile(mutable_config, mock_packages, tmp_path):
+    path = tmp_path / "profile.json"
+    solve("--show=opt", f"--profile={path}", "mpileaks")
+
+    with open(path) as f:
+        data = json.load(f)
+    assert data["specs"] == ["mpileaks"]
+
+    (profile,) = data["solves"]
+    assert {"setup", "ground", "solve"} <= set(profile["phases"])
+    assert profile["grounding"] is None
+    assert profile["profile_overhead"]["groundings"] == 0
+    assert profile["ground_program"]["atoms"] > 0
+
+    # Every possible dependency is reported, with the conditions it declares
+    assert {"mpileaks", "callpath", "mpich", "zmpi"} <= set(profile["packages"])
+    assert profile["packages"]["mpileaks"]["conditions"] > 0
+    assert profile["packages"]["mpileaks"]["facts"] > profile["packages"]["mpileaks"]["conditions"]
+
+    for kind in ("trigger", "effect"):
+        stats = profile["conditions"][kind]
+        assert stats["misses"] > 0
+        assert stats["hit_ratio"] == stats["hits"] / (stats["hits"] + stats["misses"])
+    assert sum(profile["package_facts"].values()) == len(profile["packages"])
+
+
+def test_solve_profile_before_specs(mutable_config, mock_packages, tmp_path):
+    """Tests that the file of the profile is not confused with a spec"""
+    path = tmp_path / "profile.json"
+    solve("--profile", str(path), "mpileaks")
+
+    with open(path) as f:
+        assert json.load(f)["specs"] == ["mpileaks"]
+
+
+def test_solve_profile_to_stdout(mutable_config, mock_packages):
+    """Tests that the profile replaces the usual output, when written to stdout"""
+    data = json.loads(solve("--profile", "-", "mpileaks"))
+    assert data["specs"] == ["mpileaks"]
+    assert "mpileaks" in data["solves"][0]["packages"]
+
+
+def test_solve_profile_grounding(mutable_config, mock_packages, tmp_path):
+    """Tests that the time spent grounding each logic program is estimated only on request,
+    and that the cost of the estimate is reported"""
+    path = tmp_path / "profile.json"
+    solve("--profile-grounding", f"--profile={path}", "mpileaks")
+
+    with open(path) as f:
+        (profile,) = json.load(f)["solves"]
+    files = [x["file"] for x in profile["grounding"]]
+    assert files[:2] == ["problem instance", "concretize.lp"]
+    assert profile["profile_overhead"]["groundings"] == len(files)
+    grounding_seconds = sum(x["seconds"] for x in profile["grounding"])
+    assert profile["profile_overhead"]["seconds"] >= grounding_seconds
+
+
+def test_solve_profile_grounding_requires_profile(mutable_config, mock_packages):
+    with pytest.raises(RuntimeError, match="requires --profile"):
+        solve("--profile-grounding", "mpileaks")
@@ -44,7 +44,9 @@ def test_installed_dependents(mutable_database):
 def test_correct_installed_dependents(mutable_database):
     # Test whether we return the right dependents.
 
-    # Take callpath from the database
+    # Take callpath from the database, after building all the specs so that it knows its
+    # dependents
+    spack.store.STORE.db.load_all_specs()
     callpath = spack.store.STORE.db.query_local("callpath")[0]
 
     # Ensure it still has dependents and dependencies
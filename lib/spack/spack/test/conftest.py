@@ -41,6 +41,7 @@
 import spack.directory_layout
 import spack.environment as ev
 import spack.error
+import spack.installer
 import spack.package_base
 import spack.package_prefs
 import spack.paths
@@ -52,6 +53,7 @@
 import spack.subprocess_context
 import spack.test.cray_manifest
 import spack.util.executable
+import spack.util.file_cache
 import spack.util.git
 import spack.util.gpg
 import spack.util.spack_yaml as syaml
@@ -981,10 +983,17 @@ def install_mockery(temporary_store: spack.store.Store, mutable_config, mock_pac
 
 
 @pytest.fixture(scope="function")
-def temporary_store(tmpdir, request):
+def temporary_store(tmpdir, request, monkeypatch):
     """Hooks a temporary empty store for the test function."""
     ensure_configuration_fixture_run_before(request)
     temporary_store_path = tmpdir.join("opt")
+
+    # Build durations of mock packages would change the order of installs in later tests
+    monkeypatch.setattr(
+        spack.installer.BuildDurations,
+        "cache",
+        spack.util.file_cache.FileCache(str(tmpdir.join("build_durations"))),
+    )
     with spack.store.use_store(str(temporary_store_path)) as s:
         yield s
     temporary_store_path.remove()
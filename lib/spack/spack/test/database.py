@@ -1034,6 +1034,7 @@ def test_reindex_when_all_prefixes_are_removed(mutable_database, mock_store):
 @pytest.mark.regression("11983")
 def test_check_parents(spec_str, parent_name, expected_nparents, database):
     """Check that a spec returns the correct number of parents."""
+    database.load_all_specs()
     s = database.query_one(spec_str)
 
     parents = s.dependents(name=parent_name)
@@ -1055,6 +1056,7 @@ def test_db_all_hashes(database):
 
 def test_consistency_of_dependents_upon_remove(mutable_database):
     # Check the initial state
+    mutable_database.load_all_specs()
     s = mutable_database.query_one("dyninst")
     parents = s.dependents(name="callpath")
     assert len(parents) == 3
@@ -1134,3 +1136,306 @@ def test_database_errors_with_just_a_version_key(tmp_path):
 
     with pytest.raises(spack.database.InvalidDatabaseVersionError):
         spack.database.Database(root).query_local()
+
+
+def _check_index_consistency(db):
+    """Asserts that the secondary indexes agree with the install records"""
+    with db.read_transaction():
+        index = db._index
+        assert len(index) == len(db._data)
+        for key, rec in db._data.items():
+            assert key in index.named(rec.spec.name)
+            assert (key in index.explicit) == rec.explicit
+        assert sum(len(x) for x in index.by_name.values()) == len(db._data)
+        assert index.ordered(db._data) == list(db._data)
+
+
+def test_record_index_is_consistent_after_read(database):
+    _check_index_consistency(database)
+
+
+@pytest.mark.parametrize(
+    "query_args",
+    [
+        {"query_spec": "mpileaks"},
+        {"query_spec": "mpi"},
+        {"query_spec": "mpileaks", "explicit": True},
+        {"explicit": True},
+        {"start_date": datetime.datetime.fromtimestamp(0)},
+    ],
+)
+def test_indexed_queries_keep_database_order(database, query_args):
+    """Tests that queries restricted by the secondary indexes return records in the same order
+    as a scan of the database."""
+    results = database.query_local(**query_args)
+    assert len(results) > 1
+    with database.read_transaction():
+        positions = {key: i for i, key in enumerate(database._data)}
+    assert sorted(results, key=lambda s: positions[s.dag_hash()]) == results
+
+
+def test_record_index_is_updated_by_write_operations(mutable_database):
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.update_explicit(mpileaks, False)
+    assert mpileaks not in mutable_database.query(explicit=True)
+    _check_index_consistency(mutable_database)
+
+    mutable_database.mark(mpileaks, "explicit", True)
+    assert mpileaks in mutable_database.query(explicit=True)
+    _check_index_consistency(mutable_database)
+
+    # Query the providers of a virtual, so that their index is populated
+    assert len(mutable_database.query_local("mpi")) == 3
+    mpich = mutable_database.query_one("mpich")
+    mutable_database.remove(mpileaks)
+    mutable_database.remove(mpich)
+    assert len(mutable_database.query_local("mpi", installed=True)) == 2
+    _check_index_consistency(mutable_database)
+
+    mutable_database.add(mpich, spack.store.STORE.layout)
+    assert len(mutable_database.query_local("mpi", installed=True)) == 3
+    _check_index_consistency(mutable_database)
+
+
+def test_query_by_date_uses_installation_time_buckets(mutable_database):
+    day = datetime.timedelta(days=1)
+    libelf = mutable_database.query_one("libelf")
+    mutable_database.mark(libelf, "installation_time", 0.0)
+
+    epoch = datetime.datetime.fromtimestamp(0.0)
+    assert mutable_database.query(end_date=epoch + day) == [libelf]
+    assert mutable_database.query(start_date=epoch - day, end_date=epoch + day) == [libelf]
+    assert libelf not in mutable_database.query(start_date=epoch + day)
+    assert len(mutable_database.query(start_date=epoch - day)) == 17
+
+
+def test_database_binary_cache_is_written_and_read(mutable_database, monkeypatch):
+    """Tests that a write transaction writes the binary cache of the index, and that a
+    fresh database reads its records from there instead of parsing the JSON file.
+    """
+    with mutable_database.write_transaction():
+        pass
+    assert os.path.exists(mutable_database._binary_cache_path)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the JSON index should not be parsed")
+
+    db = spack.database.Database(mutable_database.root)
+    monkeypatch.setattr(db, "_read_from_file", _fail)
+    with db.read_transaction():
+        assert set(db._data) == set(mutable_database._data)
+        assert db._installed_prefixes == mutable_database._installed_prefixes
+        # Records read from the binary cache are lazy, as when reading from JSON
+        assert not any(rec.is_loaded for rec in db._data.values())
+        # Dependencies are shared among records, as when reading from JSON
+        for rec in db._data.values():
+            for dep in rec.spec.dependencies():
+                assert dep is db._data[dep.dag_hash()].spec
+    _check_index_consistency(db)
+
+    assert db.query("mpileaks ^mpich") == mutable_database.query("mpileaks ^mpich")
+
+
+def test_database_binary_cache_does_not_build_specs(mutable_database):
+    """Tests that writing the index and its binary cache doesn't build lazy specs."""
+    with mutable_database.write_transaction():
+        pass
+
+    db = spack.database.Database(mutable_database.root)
+    with db.write_transaction():
+        assert not any(rec.is_loaded for rec in db._data.values())
+    assert not any(rec.is_loaded for rec in db._data.values())
+
+    with open(db._index_path) as f:
+        installs = json.load(f)["database"]["installs"]
+    other = spack.database.Database(mutable_database.root)
+    with other.read_transaction():
+        records = {k: r.to_dict() for k, r in other._data.items()}
+        assert json.loads(json.dumps(records)) == installs
+
+
+def test_database_binary_cache_is_ignored_when_stale(mutable_database):
+    with mutable_database.write_transaction():
+        pass
+
+    # Drop a record from the JSON index, behind the back of the database
+    with open(mutable_database._index_path) as f:
+        index = json.load(f)
+    installs = index["database"]["installs"]
+    key, rec = next((k, r) for k, r in installs.items() if r["ref_count"] == 0)
+    del installs[key]
+    with open(mutable_database._index_path, "w") as f:
+        json.dump(index, f)
+
+    db = spack.database.Database(mutable_database.root)
+    with db.read_transaction():
+        assert key not in db._data
+        assert len(db._data) == len(installs)
+
+
+def test_database_binary_cache_is_regenerated_when_read(mutable_database, monkeypatch):
+    """Tests that a missing binary cache is written back when reading the index file, so
+    that it is used before the next write transaction."""
+    os.remove(mutable_database._binary_cache_path)
+    db = spack.database.Database(mutable_database.root)
+    with db.read_transaction():
+        assert not any(rec.is_loaded for rec in db._data.values())
+    assert os.path.exists(db._binary_cache_path)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the JSON index should not be parsed")
+
+    other = spack.database.Database(mutable_database.root)
+    monkeypatch.setattr(other, "_read_from_file", _fail)
+    with other.read_transaction():
+        assert set(other._data) == set(db._data)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Files are not owned by uids on Windows")
+def test_database_binary_cache_of_other_users_is_ignored(mutable_database, monkeypatch):
+    """Tests that the binary cache is unpickled only if it is owned by the current user,
+    or by the owner of the store."""
+
+    def _stat(uid):
+        return os.stat_result((0, 0, 0, 0, uid, 0, 0, 0, 0, 0))
+
+    db = spack.database.Database(mutable_database.root)
+    owner = os.stat(db.root).st_uid
+    assert db._binary_cache_is_trusted(_stat(os.getuid()))
+    assert db._binary_cache_is_trusted(_stat(owner))
+    assert not db._binary_cache_is_trusted(_stat(max(os.getuid(), owner) + 1))
+
+    with mutable_database.write_transaction():
+        pass
+    monkeypatch.setattr(spack.database.Database, "_binary_cache_is_trusted", lambda *args: False)
+    with db.read_transaction():
+        assert set(db._data) == set(mutable_database._data)
+    assert not db._read_from_binary_cache()
+
+
+def test_records_read_from_json_are_lazy(mutable_database):
+    """Tests that specs of records read from index.json are built only when needed."""
+    os.remove(mutable_database._binary_cache_path)
+    db = spack.database.Database(mutable_database.root)
+
+    with db.read_transaction():
+        assert not any(rec.is_loaded for rec in db._data.values())
+
+        # Records are checked without building specs
+        assert db.query_by_spec_hash(next(iter(db._data)))[1] is not None
+        assert not any(rec.is_loaded for rec in db._data.values())
+
+        # Querying by name builds only the specs of candidates, and of their dependencies
+        (libelf,) = db.query_local("libelf")
+        loaded = set(key for key, rec in db._data.items() if rec.is_loaded)
+        assert loaded == {libelf.dag_hash()}
+
+        (libdwarf,) = db.query_local("libdwarf")
+        assert libdwarf.dependencies("libelf")[0] is libelf
+        assert libdwarf.concrete and libdwarf.dag_hash() in db._data
+
+        # Records that were never built are written back unchanged
+        with open(db._index_path) as f:
+            installs = json.load(f)["database"]["installs"]
+        for key, rec in db._data.items():
+            if not rec.is_loaded:
+                assert rec.to_dict()["spec"] == installs[key]["spec"]
+
+    # Traversing towards dependents requires all the specs to be built
+    assert len(db.installed_relatives(libelf, direction="parents")) > 1
+    assert all(rec.is_loaded for rec in db._data.values())
+
+
+def test_query_does_not_build_unrelated_specs(mutable_database):
+    """Tests that querying a spec doesn't build the specs of records outside of its DAG,
+    not even the ones of its dependents."""
+    db = spack.database.Database(mutable_database.root)
+    libelf = db.query_one("libelf")
+
+    with db.read_transaction():
+        unrelated = [rec for key, rec in db._data.items() if key != libelf.dag_hash()]
+        assert unrelated and all(rec.is_loaded is False for rec in unrelated)
+        assert not libelf.dependents()
+
+
+def test_database_journal_records_changes(mutable_database, monkeypatch):
+    """Tests that write transactions append to the journal instead of rewriting the
+    index, and that other databases replay only the new entries of the journal.
+    """
+    writer = spack.database.Database(mutable_database.root, journal=True)
+    reader = spack.database.Database(mutable_database.root)
+    reader.query_local()
+    index_stat = os.stat(writer._index_path)
+
+    mpileaks = writer.query_one("mpileaks ^mpich")
+    writer.update_explicit(mpileaks, False)
+    writer.remove(mpileaks)
+    assert os.path.exists(writer._journal_path)
+    assert os.stat(writer._index_path).st_mtime_ns == index_stat.st_mtime_ns
+
+    def _fail():
+        raise AssertionError("the index should not be read again")
+
+    monkeypatch.setattr(reader, "_read_index", _fail)
+    assert mpileaks not in reader.query_local()
+    assert not reader.query_local(mpileaks.dag_hash(), installed=any)
+    monkeypatch.undo()
+
+    # Records added through the journal are equivalent to those in the index
+    writer.add(mpileaks, spack.store.STORE.layout, explicit=True)
+    for db in (reader, spack.database.Database(mutable_database.root)):
+        with db.read_transaction():
+            assert set(db._data) == set(writer._data)
+            db._check_ref_counts()
+            _check_index_consistency(db)
+        assert db.query("mpileaks ^mpich", explicit=True) == [mpileaks]
+
+
+def test_database_journal_is_compacted(mutable_database, monkeypatch):
+    monkeypatch.setattr(spack.database, "_DB_JOURNAL_MIN_COMPACTION_SIZE", 1)
+    monkeypatch.setattr(spack.database, "_DB_JOURNAL_COMPACTION_RATIO", 0)
+    writer = spack.database.Database(mutable_database.root, journal=True)
+
+    libelf = writer.query_one("libelf")
+    writer.update_explicit(libelf, True)
+    assert os.path.exists(writer._journal_path)
+
+    # The next write finds the journal too large, and rewrites the index
+    writer.update_explicit(libelf, False)
+    assert not os.path.exists(writer._journal_path)
+
+    with open(writer._index_path) as f:
+        installs = json.load(f)["database"]["installs"]
+    assert installs[libelf.dag_hash()]["explicit"] is False
+
+
+def test_database_journal_ignores_incomplete_entries(mutable_database):
+    writer = spack.database.Database(mutable_database.root, journal=True)
+    libelf = writer.query_one("libelf")
+    writer.update_explicit(libelf, True)
+
+    with open(writer._journal_path, "a") as f:
+        f.write('{"records": {"')
+
+    db = spack.database.Database(mutable_database.root)
+    assert libelf in db.query(explicit=True)
+
+
+def test_database_journal_appends_after_incomplete_entries(mutable_database):
+    """Tests that an incomplete entry left by an interrupted writer is dropped before
+    appending new entries to the journal.
+    """
+    writer = spack.database.Database(mutable_database.root, journal=True)
+    libelf = writer.query_one("libelf")
+    writer.update_explicit(libelf, True)
+    writer.update_explicit(libelf, False)
+
+    with open(writer._journal_path, "a") as f:
+        f.write('{"records": {"abc')
+
+    writer.update_explicit(libelf, True)
+    with open(writer._journal_path, "rb") as f:
+        assert all(line.endswith(b"\n") for line in f)
+
+    db = spack.database.Database(mutable_database.root)
+    assert libelf in db.query(explicit=True)
@@ -14,6 +14,7 @@
 
 from llnl.path import path_to_os_path
 
+import spack.directory_layout
 import spack.paths
 import spack.repo
 from spack.directory_layout import DirectoryLayout, InvalidDirectoryLayoutParametersError
@@ -217,6 +218,43 @@ def test_find(temporary_store, config, mock_packages):
         assert found_specs[name].eq_dag(spec)
 
 
+@pytest.mark.not_on_windows("spec files are read serially on Windows")
+def test_find_in_parallel(temporary_store, config, mock_packages, monkeypatch):
+    """Test that spec files are read correctly by multiple worker processes."""
+    monkeypatch.setattr(spack.directory_layout, "_PREFIXES_PER_TASK", 2)
+    layout = temporary_store.layout
+    installed_specs = {}
+    for name in ("libelf", "libdwarf", "callpath", "mpileaks", "dttop"):
+        for spec in Spec(name).concretized().traverse():
+            if spec.dag_hash() not in installed_specs:
+                installed_specs[spec.dag_hash()] = spec
+                layout.create_install_directory(spec)
+
+    # Each task reads several prefixes, and there are more tasks than processes
+    processes = 2
+    assert len(installed_specs) > 2 * 4 * processes
+
+    found_specs = layout.all_specs(processes=processes)
+    assert len(found_specs) == len(installed_specs)
+    assert found_specs == layout.all_specs()
+    for spec in found_specs:
+        assert spec.concrete
+        assert spec.eq_dag(installed_specs[spec.dag_hash()])
+
+
+@pytest.mark.parametrize("nprefixes", [0, 5, 64, 131])
+@pytest.mark.parametrize("processes", [1, 2, 4])
+def test_spec_file_tasks_are_contiguous(nprefixes, processes, monkeypatch):
+    monkeypatch.setattr(spack.directory_layout, "_PREFIXES_PER_TASK", 4)
+    prefixes = [f"prefix-{i}" for i in range(nprefixes)]
+    tasks = spack.directory_layout._spec_file_tasks(None, prefixes, processes)
+
+    assert [idx for idx, _, _ in tasks] == list(range(len(tasks)))
+    assert [p for _, _, chunk in tasks for p in chunk] == prefixes
+    sizes = [len(chunk) for _, _, chunk in tasks]
+    assert max(sizes) - min(sizes) <= 1
+
+
 def test_yaml_directory_layout_build_path(tmpdir, default_mock_concretization):
     """This tests build path method."""
     spec = default_mock_concretization("python")
@@ -7,6 +7,7 @@
 import os
 import shutil
 import sys
+import threading
 
 import py
 import pytest
@@ -18,6 +19,7 @@
 import llnl.util.tty as tty
 
 import spack.binary_distribution
+import spack.caches
 import spack.compilers
 import spack.concretize
 import spack.config
@@ -29,6 +31,7 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.util.file_cache
 import spack.util.lock as lk
 import spack.version
 
@@ -813,8 +816,10 @@ def _add(_compilers):
     # Preclude any meaningful side-effects
     monkeypatch.setattr(spack.package_base.PackageBase, "unit_test_check", _true)
     monkeypatch.setattr(inst.PackageInstaller, "_setup_install_dir", _noop)
-    monkeypatch.setattr(spack.build_environment, "start_build_process", _noop)
+    monkeypatch.setattr(spack.build_environment.BuildProcess, "start", lambda self: self)
+    monkeypatch.setattr(spack.build_environment.BuildProcess, "complete", _noop)
     monkeypatch.setattr(spack.database.Database, "add", _noop)
+    monkeypatch.setattr(inst.BuildDurations, "record", _noop)
     monkeypatch.setattr(spack.compilers, "add_compilers_to_config", _add)
 
     installer._install_task(task, None)
@@ -1263,6 +1268,47 @@ def test_install_skip_patch(install_mockery, mock_fetch):
     assert inst.package_id(spec) in installer.installed
 
 
+def test_install_concurrent_packages(install_mockery, mock_fetch, monkeypatch):
+    """Test that independent packages are built at the same time."""
+    const_arg = installer_args(["dtrun3", "trivial-install-test-package"], {"fake": False})
+    const_arg[0][1]["concurrent_packages"] = 2
+    installer = create_installer(const_arg)
+    assert installer.concurrent_packages == 2
+
+    running = []
+    complete = inst.PackageInstaller._complete_running_tasks
+
+    def _complete(self, *args):
+        running.append(len(self.running))
+        return complete(self, *args)
+
+    monkeypatch.setattr(inst.PackageInstaller, "_complete_running_tasks", _complete)
+    installer.install()
+
+    assert max(running) == 2
+    assert not installer.running
+    for spec, _ in const_arg:
+        assert all(x.installed for x in spec.traverse())
+
+
+@pytest.mark.disable_clean_stage_check
+def test_install_concurrent_packages_failure(install_mockery, mock_fetch):
+    """Test that the failure of a build running concurrently with others is reported, and
+    doesn't prevent independent packages from being installed."""
+    const_arg = installer_args(
+        ["failing-build", "trivial-install-test-package"], {"concurrent_packages": 2}
+    )
+    installer = create_installer(const_arg)
+
+    with pytest.raises(inst.InstallError, match="Installation request failed"):
+        installer.install()
+
+    failing, trivial = (spec for spec, _ in const_arg)
+    assert inst.package_id(failing) in installer.failed
+    assert trivial.installed
+    assert not os.path.exists(failing.prefix)
+
+
 def test_install_implicit(install_mockery, mock_fetch):
     """Test the path skip_patch install path."""
     spec_name = "trivial-install-test-package"
@@ -1441,3 +1487,163 @@ def test_print_install_test_log_failures(
     spack.installer.print_install_test_log(pkg)
     out = capfd.readouterr()[0]
     assert "See test results at" in out
+
+
+@pytest.mark.parametrize(
+    "durations,first", [({}, "d"), ({"a": 1.0, "b": 1.0, "c": 100.0, "d": 1.0}, "c")]
+)
+def test_init_queue_prioritizes_critical_path(
+    install_mockery, monkeypatch, tmpdir, durations, first
+):
+    """Tests that among build tasks with no uninstalled dependencies, the ones with the
+    longest chain of dependents, weighted by previous build durations, come first.
+
+               (a)
+              /   \\
+            (b)   (c)
+             |
+            (d)
+    """
+    builder = spack.repo.MockRepositoryBuilder(tmpdir.mkdir("mock-repo"))
+    builder.add_package("a", dependencies=[("b", "build", None), ("c", "build", None)])
+    builder.add_package("b", dependencies=[("d", "build", None)])
+    builder.add_package("c")
+    builder.add_package("d")
+    monkeypatch.setattr(inst.BuildDurations, "get", lambda self, s: durations.get(s.name))
+
+    with spack.repo.use_repositories(builder.root):
+        installer = create_installer(installer_args(["a"], {}))
+        installer._init_queue()
+
+        assert installer._pop_task().pkg.name == first
+
+
+def test_build_durations_are_recorded(tmpdir, monkeypatch):
+    monkeypatch.setattr(
+        spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmpdir.join("cache")))
+    )
+    times_log = tmpdir.join("install_times.json")
+    times_log.write('{"total": 10.0, "phases": []}')
+
+    class MockPackage:
+        name = "pkg"
+        times_log_path = str(times_log)
+
+        def __init__(self, version):
+            self.spec = spack.spec.Spec(f"pkg@={version}")
+
+    inst.BuildDurations().record(MockPackage("1.0"))
+    times_log.write('{"total": 20.0, "phases": []}')
+    inst.BuildDurations().record(MockPackage("2.0"))
+
+    durations = inst.BuildDurations()
+    assert durations.get(spack.spec.Spec("pkg@=1.0")) == 10.0
+    assert durations.get(spack.spec.Spec("pkg@=3.0")) == 15.0
+    assert durations.get(spack.spec.Spec("other@=1.0")) is None
+
+
+def test_binary_prefetcher(mock_packages, config, monkeypatch):
+    """Tests that binary packages are downloaded in other threads, and that downloads
+    that were not used are cleaned up."""
+    downloaded, deleted = [], []
+
+    def _download(spec, unsigned, mirrors_for_spec):
+        if spec.name == "b":
+            raise RuntimeError("cannot download b")
+        downloaded.append(spec.name)
+        return {"name": spec.name}
+
+    monkeypatch.setattr(spack.binary_distribution, "get_mirrors_for_spec", lambda s, **kw: [s])
+    monkeypatch.setattr(spack.binary_distribution, "download_tarball", _download)
+    monkeypatch.setattr(spack.binary_distribution, "_delete_staged_downloads", deleted.append)
+
+    specs = [spack.spec.Spec(x).concretized() for x in ("a", "b", "mpich", "zmpi")]
+    prefetcher = inst.BinaryPrefetcher(workers=2)
+    with prefetcher.paused_downloads():
+        for spec in specs:
+            prefetcher.submit(spec, unsigned=False)
+        assert not prefetcher.running
+
+    assert all(spec in prefetcher for spec in specs)
+    assert prefetcher.download(specs[0]) == {"name": "a"}
+    with pytest.raises(RuntimeError, match="cannot download b"):
+        prefetcher.download(specs[1])
+    assert prefetcher.download(specs[2]) == {"name": "mpich"}
+
+    prefetcher.shutdown()
+    assert sorted(downloaded) == ["a", "mpich", "zmpi"]
+    assert deleted == [{"name": "zmpi"}]
+
+    # Specs that were not submitted, or whose download was already used, are downloaded now
+    assert prefetcher.download(specs[0], unsigned=True) == {"name": "a"}
+    assert sorted(downloaded) == ["a", "a", "mpich", "zmpi"]
+
+
+def test_binary_prefetcher_shutdown_does_not_wait_for_downloads(
+    mock_packages, config, monkeypatch
+):
+    """Tests that shutting down the prefetcher doesn't wait indefinitely for running
+    downloads, and that their results are cleaned up when they are done."""
+    started, release, deleted = threading.Event(), threading.Event(), []
+
+    def _download(spec, unsigned, mirrors_for_spec):
+        started.set()
+        release.wait()
+        return {"name": spec.name}
+
+    monkeypatch.setattr(spack.binary_distribution, "get_mirrors_for_spec", lambda s, **kw: [s])
+    monkeypatch.setattr(spack.binary_distribution, "download_tarball", _download)
+    monkeypatch.setattr(spack.binary_distribution, "_delete_staged_downloads", deleted.append)
+
+    prefetcher = inst.BinaryPrefetcher(workers=1)
+    for name in ("a", "b"):
+        prefetcher.submit(spack.spec.Spec(name).concretized(), unsigned=False)
+    assert started.wait(timeout=10)
+    (thread,) = prefetcher.running.values()
+
+    prefetcher.shutdown(timeout=0.1)
+    assert thread.is_alive() and not prefetcher.running and not prefetcher.pending
+
+    release.set()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert deleted == [{"name": "a"}] and not prefetcher.results
+
+
+def test_binary_downloads_proceed_during_builds(install_mockery, monkeypatch):
+    """Tests that binary packages are downloaded while a package is built from sources,
+    and that downloads are only paused while the build process is started."""
+    downloaded = threading.Event()
+
+    def _download(spec, unsigned, mirrors_for_spec):
+        if spec.name != "b":
+            return None
+        downloaded.set()
+        return {"name": spec.name}
+
+    def _start(process):
+        prefetcher.submit(b, unsigned=False)
+        assert prefetcher.paused and not prefetcher.running
+        return process
+
+    def _complete(process):
+        assert not prefetcher.paused
+        assert downloaded.wait(timeout=10)
+
+    monkeypatch.setattr(spack.binary_distribution, "get_mirrors_for_spec", lambda s, **kw: [s])
+    monkeypatch.setattr(spack.binary_distribution, "download_tarball", _download)
+    monkeypatch.setattr(spack.binary_distribution, "_delete_staged_downloads", _noop)
+    monkeypatch.setattr(spack.build_environment.BuildProcess, "start", _start)
+    monkeypatch.setattr(spack.build_environment.BuildProcess, "complete", _complete)
+    monkeypatch.setattr(spack.package_base.PackageBase, "unit_test_check", _true)
+    monkeypatch.setattr(inst.PackageInstaller, "_setup_install_dir", _noop)
+    monkeypatch.setattr(spack.database.Database, "add", _noop)
+    monkeypatch.setattr(inst.BuildDurations, "record", _noop)
+
+    b = spack.spec.Spec("b").concretized()
+    installer = create_installer(installer_args(["a"], {}))
+    prefetcher = installer.binary_prefetcher = inst.BinaryPrefetcher(workers=1)
+    installer._install_task(create_build_task(installer.build_requests[0].pkg), None)
+
+    assert prefetcher.download(b) == {"name": "b"}
+    prefetcher.shutdown()
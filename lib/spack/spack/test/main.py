@@ -2,7 +2,7 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
-
+import sys
 
 import pytest
 
@@ -97,3 +97,52 @@ def test_get_version_bad_git(tmpdir, working_env, monkeypatch):
 
     monkeypatch.setattr(spack.util.git, "git", lambda: exe.which(bad_git))
     assert spack.spack_version == get_version()
+
+
+#: Subsystems that are expensive to import, and that commands only need when they concretize,
+#: install or render templates.
+HEAVY_MODULES = (
+    "spack.solver.asp",
+    "clingo",
+    "spack.installer",
+    "spack.build_environment",
+    "spack.binary_distribution",
+    "spack.ci",
+    "spack.bootstrap",
+    "spack.tengine",
+    "jinja2",
+)
+
+
+def imported_modules(*args):
+    """Runs spack with the arguments passed as input in a new interpreter, and returns the
+    modules imported at startup, as reported by ``python -X importtime``.
+    """
+    python = exe.Executable(sys.executable)
+    output = python("-X", "importtime", spack.paths.spack_script, *args, output=str, error=str)
+    # Lines look like: "import time:  <self [us]> | <cumulative [us]> | <module>"
+    return {
+        line.split("|")[-1].strip()
+        for line in output.splitlines()
+        if line.startswith("import time:") and "imported package" not in line
+    }
+
+
+@pytest.mark.parametrize(
+    "args,forbidden",
+    [
+        (["--version"], HEAVY_MODULES + ("jsonschema",)),
+        (["config", "-h"], HEAVY_MODULES),
+        (["find", "-h"], HEAVY_MODULES),
+        (["list", "-h"], HEAVY_MODULES),
+        (["location", "-h"], HEAVY_MODULES),
+        (["spec", "-h"], HEAVY_MODULES),
+    ],
+)
+def test_command_startup_budget(args, forbidden):
+    """Tests that commands don't import heavy subsystems at startup. The budget is documented
+    in the "Startup time" section of the developer guide.
+    """
+    modules = imported_modules(*args)
+    assert "spack.main" in modules
+    assert not modules.intersection(forbidden)
@@ -13,7 +13,7 @@
 
 import pytest
 
-from spack.build_environment import MakeExecutable
+from spack.build_environment import MakeExecutable, shared_jobserver
 from spack.util.environment import path_put_first
 
 pytestmark = pytest.mark.skipif(
@@ -118,3 +118,24 @@ def test_make_jobserver_not_supported(monkeypatch):
     monkeypatch.setenv("MAKEFLAGS", "--jobserver-auth=X,Y")
     # Currently fallback on default job count, Maybe it should force -j1 ?
     assert make(output=str).strip() == "-j8"
+
+
+def test_make_shared_jobserver(monkeypatch):
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    make = MakeExecutable("make", 8)
+    with shared_jobserver(4) as jobserver:
+        fds = (jobserver.read_fd, jobserver.write_fd)
+        assert "--jobserver-fds={0},{1}".format(*fds) in os.environ["MAKEFLAGS"]
+        assert all(os.get_inheritable(fd) for fd in fds)
+        # The jobserver replaces the -j argument
+        assert make(output=str).strip() == ""
+        # One job slot is implicit, the others are tokens in the pipe
+        assert os.read(jobserver.read_fd, 16) == b"+++"
+    assert "MAKEFLAGS" not in os.environ
+
+
+def test_make_shared_jobserver_is_not_nested(monkeypatch):
+    monkeypatch.setenv("MAKEFLAGS", "-k --jobserver-auth=X,Y")
+    with shared_jobserver(4) as jobserver:
+        assert jobserver is None
+        assert os.environ["MAKEFLAGS"] == "-k --jobserver-auth=X,Y"
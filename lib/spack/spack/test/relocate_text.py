@@ -237,3 +237,63 @@ def test_relocate_text_filters_redundant_entries():
     replacer_2 = relocate_text.TextFilePrefixReplacer.from_strings_or_bytes(mapping)
     assert not replacer_1.prefix_to_prefix
     assert not replacer_2.prefix_to_prefix
+
+
+def test_binary_replacement_in_files(tmp_path):
+    """Tests that files are relocated in place, including when the candidate matches
+    found by the search of the common prefix are not actual matches."""
+    prefix_to_prefix = OrderedDict(
+        [(b"/old/spack/opt/pkg-a", b"/new/pkg-a"), (b"/old/spack/opt", b"/new/opt")]
+    )
+    before = b"\0/old/spack/opt/pkg-a/lib\0/old/spack/bin\0/old/spack/opt/pkg-b/libexec\0" * 100
+    after = b"\0///////////new/pkg-a/lib\0/old/spack/bin\0///////new/opt/pkg-b/libexec\0" * 100
+    binary, empty = tmp_path / "binary", tmp_path / "empty"
+    binary.write_bytes(before)
+    empty.write_bytes(b"")
+
+    replacer = relocate_text.BinaryFilePrefixReplacer(prefix_to_prefix)
+    assert replacer.common_prefix == b"/old/spack/opt"
+    replacer.apply([str(binary), str(empty)])
+
+    assert binary.read_bytes() == after
+    assert empty.read_bytes() == b""
+
+    # Without a common prefix, the regex is used to find matches
+    binary.write_bytes(before)
+    prefix_to_prefix[b"/x"] = b"/y"
+    replacer = relocate_text.BinaryFilePrefixReplacer(prefix_to_prefix)
+    assert not replacer.common_prefix
+    replacer.apply([str(binary)])
+    assert binary.read_bytes() == after
+
+
+@pytest.mark.parametrize("other_prefix", [b"/old/spack/opt/pkg-b", b"/upstream/pkg-b"])
+def test_binary_replacement_at_offsets(tmp_path, other_prefix):
+    """Tests that patching binaries at the offsets where prefixes were found gives the
+    same result as searching them."""
+    prefix_to_prefix = OrderedDict(
+        [
+            (b"/old/spack/opt/pkg-a", b"/new/pkg-a"),
+            (other_prefix, b"/new/pkg-b"),
+            (b"/old/spack/opt", b"/new/opt"),
+        ]
+    )
+    before = (
+        b"\0/old/spack/opt/pkg-a/lib:/old/spack/opt/pkg-a/lib64\0/old/spack/bin\0"
+        + other_prefix
+        + b"/include\0/old/spack/opt/pkg-c/libexec\0"
+    ) * 10
+    searched, indexed, empty = tmp_path / "searched", tmp_path / "indexed", tmp_path / "empty"
+    searched.write_bytes(before)
+    indexed.write_bytes(before)
+    empty.write_bytes(b"")
+
+    offsets = relocate_text.find_prefix_offsets(str(indexed), list(prefix_to_prefix))
+    assert len(offsets) == 40
+    assert relocate_text.find_prefix_offsets(str(empty), list(prefix_to_prefix)) == []
+
+    replacer = relocate_text.BinaryFilePrefixReplacer(prefix_to_prefix)
+    replacer.apply([str(searched)])
+    replacer.apply_at_offsets({str(indexed): offsets, str(empty): []})
+
+    assert indexed.read_bytes() == searched.read_bytes() != before
@@ -2,13 +2,24 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import functools
+import multiprocessing
+import operator
 import os
+import sys
 
 import pytest
 
+import llnl.util.filesystem as fs
+
+import spack.dependency_index
+import spack.deptypes as dt
 import spack.package_base
 import spack.paths
 import spack.repo
+import spack.util.cpus
+import spack.util.file_cache
+import spack.util.spack_json as sjson
 
 
 @pytest.fixture(params=["packages", "", "foo"])
@@ -193,3 +204,242 @@ def test_path_computation_with_names(method_name, mock_repo_path):
     unqualified = method("mpileaks")
     qualified = method("builtin.mock.mpileaks")
     assert qualified == unqualified
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires forking"
+)
+def test_parallel_index_matches_serial_index(tmp_path, mock_packages, monkeypatch):
+    """Tests that indexes computed by worker processes match the ones computed serially"""
+    monkeypatch.setattr(spack.util.cpus, "determine_number_of_jobs", lambda **kwargs: 4)
+
+    def indexes(threshold):
+        monkeypatch.setattr(spack.repo, "PARALLEL_INDEX_THRESHOLD", threshold)
+        cache = spack.util.file_cache.FileCache(str(tmp_path / f"cache-{threshold}"))
+        repo = spack.repo.Repo(spack.paths.mock_packages_path, cache=cache)
+        return repo.provider_index, repo.tag_index, repo.patch_index, repo.dependency_index
+
+    def _fail(self, pkg_fullname):
+        raise AssertionError("packages should be indexed by worker processes")
+
+    serial_providers, serial_tags, serial_patches, serial_deps = indexes(threshold=10**6)
+    with monkeypatch.context() as m:
+        for indexer in (
+            spack.repo.ProviderIndexer,
+            spack.repo.TagIndexer,
+            spack.repo.PatchIndexer,
+            spack.repo.DependencyIndexer,
+        ):
+            m.setattr(indexer, "update", _fail)
+        providers, tags, patches, deps = indexes(threshold=0)
+
+    assert providers == serial_providers
+    assert dict(tags.tags) == dict(serial_tags.tags)
+    assert patches.index == serial_patches.index
+    assert dict(deps) == dict(serial_deps)
+
+
+def test_dependency_index_matches_package_classes(mock_packages):
+    index = spack.repo.PATH.dependency_index
+    for name in spack.repo.PATH.all_package_names(include_virtuals=True):
+        pkg_cls = spack.repo.PATH.get_pkg_class(name)
+        assert index[name] == {
+            dep_name: functools.reduce(operator.or_, (dep.depflag for dep in deps))
+            for dep_name, deps in pkg_cls.dependencies_by_name().items()
+        }
+        assert index.dependencies_of_type(name, dt.BUILD) == pkg_cls.dependencies_of_type(dt.BUILD)
+
+
+def test_possible_dependencies_do_not_load_packages(mock_packages, monkeypatch):
+    expected = spack.package_base.possible_dependencies("mpileaks", "dtbuild1")
+    assert {"mpileaks", "callpath", "libelf", "dtbuild1", "dtlink2"} <= set(expected)
+
+    def _fail(self, pkg_name):
+        raise AssertionError("package classes should not be loaded")
+
+    monkeypatch.setattr(spack.repo.Repo, "get_pkg_class", _fail)
+    assert spack.package_base.possible_dependencies("mpileaks", "dtbuild1") == expected
+
+
+def test_dependency_index_is_updated_per_package(tmp_path, mutable_config):
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="deps")
+    builder.add_package("pkg-c")
+    builder.add_package("pkg-b", dependencies=[("pkg-c", "link", None)])
+    builder.add_package("pkg-a", dependencies=[("pkg-b", None, None)])
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+
+    repo = spack.repo.Repo(builder.root, cache=cache)
+    possible = repo.dependency_index.possible_dependencies("pkg-a")
+    assert possible == {"pkg-a": {"pkg-b"}, "pkg-b": {"pkg-c"}, "pkg-c": set()}
+
+    builder.add_package("pkg-b", dependencies=[("pkg-d", "build", None)])
+    builder.add_package("pkg-d")
+    index_mtime = cache.mtime(repo.index._cache_filename("dependencies"))
+    os.utime(builder.recipe_filename("pkg-b"), (index_mtime + 1, index_mtime + 1))
+    os.utime(builder.recipe_filename("pkg-d"), (index_mtime + 1, index_mtime + 1))
+
+    repo = spack.repo.Repo(builder.root, cache=cache)
+    repo._pkg_checker.invalidate()
+    assert repo.dependency_index.possible_dependencies("pkg-a", depflag=dt.LINK) == {
+        "pkg-a": {"pkg-b"},
+        "pkg-b": set(),
+    }
+    assert repo.dependency_index.possible_dependencies("pkg-a") == {
+        "pkg-a": {"pkg-b"},
+        "pkg-b": {"pkg-d"},
+        "pkg-d": set(),
+    }
+
+
+def test_dependency_index_is_rebuilt_when_sources_change(tmp_path, mutable_config, monkeypatch):
+    """Tests that dependencies of packages are indexed again when build systems or directives
+    change, even if package files didn't change."""
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="deps")
+    builder.add_package("pkg-b")
+    builder.add_package("pkg-a", dependencies=[("pkg-b", None, None)])
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    repo = spack.repo.Repo(builder.root, cache=cache)
+    assert set(repo.dependency_index["pkg-a"]) == {"pkg-b"}
+
+    # Simulate an index computed with older build systems, that miss a dependency
+    with cache.write_transaction(repo.index._cache_filename("dependencies")) as (old, new):
+        data = sjson.load(old)
+        data["dependencies"]["pkg-a"] = {}
+        sjson.dump(data, new)
+
+    assert spack.repo.Repo(builder.root, cache=cache).dependency_index["pkg-a"] == {}
+
+    monkeypatch.setattr(spack.dependency_index, "sources_digest", lambda: "changed")
+    repo = spack.repo.Repo(builder.root, cache=cache)
+    assert set(repo.dependency_index["pkg-a"]) == {"pkg-b"}
+    assert "changed" in repo.index._cache_filename("dependencies")
+
+
+def test_dependency_index_is_updated_when_base_package_changes(
+    tmp_path, mutable_config, monkeypatch
+):
+    """Tests that packages subclassing the class of another package are indexed again, when
+    only the file of the other package changes."""
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="deps")
+    builder.add_package("pkg-c")
+    builder.add_package("pkg-d")
+    builder.add_package("pkg-b", dependencies=[("pkg-c", None, None)])
+    os.makedirs(os.path.dirname(builder.recipe_filename("pkg-a")))
+    with open(builder.recipe_filename("pkg-a"), "w", encoding="utf-8") as f:
+        f.write(
+            "from spack.package import *\n"
+            "from spack.pkg.deps.pkg_b import PkgB\n\n\n"
+            "class PkgA(PkgB):\n"
+            "    pass\n"
+        )
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+
+    with spack.repo.use_repositories(builder.root):
+        repo = spack.repo.Repo(builder.root, cache=cache)
+        assert set(repo.dependency_index["pkg-a"]) == {"pkg-c"}
+
+    builder.add_package("pkg-b", dependencies=[("pkg-d", None, None)])
+    index_mtime = cache.mtime(repo.index._cache_filename("dependencies"))
+    os.utime(builder.recipe_filename("pkg-b"), (index_mtime + 1, index_mtime + 1))
+    for module_name in [x for x in sys.modules if x.startswith("spack.pkg.deps.")]:
+        monkeypatch.delitem(sys.modules, module_name)
+
+    with spack.repo.use_repositories(builder.root):
+        repo = spack.repo.Repo(builder.root, cache=cache)
+        repo._pkg_checker.invalidate()
+        assert set(repo.dependency_index["pkg-a"]) == {"pkg-d"}
+
+
+def test_possible_dependencies_of_shadowed_package_class(tmp_path, mutable_config):
+    """Tests that dependencies of a package class are not taken from another package with the
+    same name in the repositories."""
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="shadow")
+    builder.add_package("mpileaks", dependencies=[("libelf", None, None)])
+    with spack.repo.use_repositories(spack.paths.mock_packages_path, builder.root) as repo_path:
+        pkg_cls = repo_path.get_pkg_class("shadow.mpileaks")
+        assert pkg_cls is not repo_path.get_pkg_class("mpileaks")
+        assert pkg_cls.possible_dependencies() == {"mpileaks": {"libelf"}, "libelf": set()}
+
+
+@pytest.fixture()
+def package_checker_repo(tmp_path, monkeypatch):
+    """A repository whose packages directory was last modified a while ago, and a file cache
+    to snapshot it."""
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="checker")
+    builder.add_package("pkg-a")
+    builder.add_package("pkg-b")
+    os.makedirs(os.path.join(builder.root, "packages", "pkg-c"))
+    packages_path = os.path.join(builder.root, "packages")
+    os.utime(packages_path, (0, 0))
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    return builder, packages_path, cache
+
+
+def test_package_checker_reads_names_from_snapshot(package_checker_repo, monkeypatch):
+    builder, packages_path, cache = package_checker_repo
+    checker = spack.repo.FastPackageChecker(packages_path, cache=cache)
+    assert set(checker) == {"pkg-a", "pkg-b"}
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the packages directory should not be listed")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "scandir", _fail)
+        m.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+        checker = spack.repo.FastPackageChecker(packages_path, cache=cache)
+        assert "pkg-a" in checker and "pkg-c" not in checker
+        assert all(sinfo is None for sinfo in checker._packages_to_stats.values())
+
+    # Stats are computed lazily, when needed
+    index_mtime = os.path.getmtime(builder.recipe_filename("pkg-a"))
+    os.utime(builder.recipe_filename("pkg-b"), (index_mtime + 1, index_mtime + 1))
+    assert checker.modified_since(index_mtime) == ["pkg-b"]
+    assert checker.last_mtime() == index_mtime + 1
+
+    # A package file created in an existing directory is found
+    builder.add_package("pkg-c")
+    os.utime(packages_path, (0, 0))
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    checker = spack.repo.FastPackageChecker(packages_path, cache=cache)
+    assert set(checker) == {"pkg-a", "pkg-b", "pkg-c"}
+
+
+def test_package_checker_snapshot_is_invalidated(package_checker_repo, monkeypatch):
+    builder, packages_path, cache = package_checker_repo
+    assert set(spack.repo.FastPackageChecker(packages_path, cache=cache)) == {"pkg-a", "pkg-b"}
+
+    # A new package directory changes the modification time of the packages directory
+    builder.add_package("pkg-d")
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    checker = spack.repo.FastPackageChecker(packages_path, cache=cache)
+    assert set(checker) == {"pkg-a", "pkg-b", "pkg-d"}
+
+    # A different commit invalidates the snapshot
+    builder.remove("pkg-d")
+    os.utime(packages_path, (0, 0))
+    monkeypatch.setattr(spack.repo, "_git_head", lambda path: "0123abcd")
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    checker = spack.repo.FastPackageChecker(packages_path, cache=cache)
+    assert set(checker) == {"pkg-a", "pkg-b"}
+
+
+def test_git_head(tmp_path, git):
+    assert spack.repo._git_head(str(tmp_path)) is None
+
+    with fs.working_dir(str(tmp_path)):
+        git("init", "--quiet")
+        git("config", "user.name", "Spack")
+        git("config", "user.email", "spack@spack.io")
+        (tmp_path / "packages").mkdir()
+        (tmp_path / "packages" / "file").write_text("content")
+        git("add", ".")
+        git("commit", "--quiet", "-m", "first")
+        head = git("rev-parse", "HEAD", output=str).strip()
+        assert spack.repo._git_head(str(tmp_path / "packages")) == head
+
+        git("pack-refs", "--all")
+        assert spack.repo._git_head(str(tmp_path / "packages")) == head
+
+        git("checkout", "--quiet", "--detach")
+        assert spack.repo._git_head(str(tmp_path / "packages")) == head
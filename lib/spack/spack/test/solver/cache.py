@@ -0,0 +1,210 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Unit tests for the persistent caches used by the solver."""
+import os
+import types
+
+import pytest
+
+import spack.caches
+import spack.config
+import spack.repo
+import spack.spec
+import spack.util.file_cache
+from spack.solver import asp
+from spack.solver.cache import SolverCache, cache_key
+
+
+@pytest.fixture()
+def misc_cache(tmp_path, monkeypatch):
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "misc_cache"))
+    monkeypatch.setattr(spack.caches, "MISC_CACHE", cache)
+    return cache
+
+
+def test_cache_key_depends_on_all_parts():
+    assert cache_key(["a", "b"]) == cache_key(["a", "b"])
+    assert cache_key(["a", "b"]) != cache_key(["b", "a"])
+    assert cache_key(["ab"]) != cache_key(["a", "b"])
+
+
+def test_solver_cache_evicts_least_recently_used(misc_cache):
+    cache = SolverCache("test", size_limit=30)
+    for i, key in enumerate(("first", "second", "third")):
+        cache.put(key, "x" * 8)
+        # Make modification times distinct, regardless of the filesystem resolution
+        os.utime(cache._path(key), (i, i))
+
+    # Reading an entry marks it as recently used
+    assert cache.get("first") == "x" * 8
+    cache.put("fourth", "x" * 8)
+
+    # Entries are evicted only on request
+    assert os.path.exists(cache._path("second"))
+    cache.evict()
+
+    assert cache.get("second") is None
+    assert all(cache.get(key) == "x" * 8 for key in ("first", "third", "fourth"))
+
+
+def test_solver_cache_ignores_corrupt_entries(misc_cache):
+    cache = SolverCache("test")
+    cache.put("key", {"a": 1})
+    with open(cache._path("key"), "w") as f:
+        f.write("{not json")
+    assert cache.get("key") is None
+
+
+@pytest.mark.only_clingo("the solution cache is specific to clingo")
+def test_solutions_are_reused(mutable_config, mock_packages, misc_cache):
+    spack.config.set("concretizer:cache", {"solutions": True})
+
+    def solve():
+        driver = asp.PyclingoDriver()
+        setup = asp.SpackSolverSetup()
+        result, timer, _ = driver.solve(setup, [spack.spec.Spec("mpileaks")], reuse=[])
+        return result, timer
+
+    first, timer = solve()
+    assert "ground" in timer.phases
+
+    second, timer = solve()
+    assert "ground" not in timer.phases and "solve" not in timer.phases
+    assert [s.dag_hash() for s in first.specs] == [s.dag_hash() for s in second.specs]
+    assert first.criteria == second.criteria
+    assert first.nmodels == second.nmodels
+
+
+@pytest.mark.only_clingo("the package facts cache is specific to clingo")
+def test_package_facts_are_reused(mutable_config, mock_packages, misc_cache, monkeypatch):
+    def setup():
+        return asp.SpackSolverSetup().setup([spack.spec.Spec("mpileaks")], reuse=[])
+
+    expected = setup()
+    spack.config.set("concretizer:cache", {"package_facts": True})
+    first = setup()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("package facts should have been read from the cache")
+
+    monkeypatch.setattr(asp.SpackSolverSetup, "_record_recipe_rules", _fail)
+    second = setup()
+
+    assert first == second
+    assert asp._RECIPE_ID not in second
+    assert len(second.splitlines()) == len(expected.splitlines())
+
+
+def test_package_facts_key_depends_on_providers(mock_packages, monkeypatch):
+    setup = asp.SpackSolverSetup()
+    pkg = spack.repo.PATH.get_pkg_class("mpileaks")
+    key = setup._recipe_cache_key(pkg)
+    assert setup._recipe_cache_key(pkg) == key
+
+    providers = spack.repo.PATH.provider_index.providers
+    new_provider = {spack.spec.Spec("mpi@:10"): {spack.spec.Spec("new-mpi")}}
+    monkeypatch.setitem(providers, "mpi", {**providers["mpi"], **new_provider})
+    assert setup._recipe_cache_key(pkg) != key
+
+
+class _StaticCache:
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key):
+        return self.data
+
+
+def test_package_facts_relocate_condition_ids_only(monkeypatch):
+    """Tests that only placeholders for condition ids, and not their occurrences in
+    strings, are replaced with actual ids.
+    """
+    facts = asp.RecipeFacts(
+        text=f'a({asp._RECIPE_ID}(1),"{asp._RECIPE_ID}(0)").\nb({asp._RECIPE_ID}(0),3).\n',
+        ids=2,
+        version_constraints=set(),
+        target_constraints=set(),
+        compiler_version_constraints=set(),
+        variant_values={("pkg", "shared", True)},
+    )
+    setup = asp.SpackSolverSetup()
+    setup._recipe_cache = _StaticCache(facts.to_dict())
+    monkeypatch.setattr(setup, "_recipe_cache_key", lambda pkg: "key")
+    next(setup._id_counter)
+
+    setup.package_recipe_rules(None)
+
+    assert setup.gen.value() == f'a(2,"{asp._RECIPE_ID}(0)").\nb(1,3).\n'
+    assert setup.variant_values_from_specs == {("pkg", "shared", True)}
+
+
+@pytest.mark.only_clingo("the result cache is specific to clingo")
+def test_results_are_reused(mutable_config, mock_packages, misc_cache, monkeypatch):
+    spack.config.set("concretizer:cache", {"results": True})
+    first = asp.Solver().solve([spack.spec.Spec("mpileaks")])
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the result should have been read from the cache")
+
+    monkeypatch.setattr(asp.PyclingoDriver, "solve", _fail)
+    second = asp.Solver().solve([spack.spec.Spec("mpileaks")])
+
+    assert [x.dag_hash() for x in first.specs] == [x.dag_hash() for x in second.specs]
+    assert all(x.concrete for x in second.specs[0].traverse())
+    assert first.criteria == second.criteria
+
+    # Nodes shared in the DAG are the same object
+    assert len([x for x in second.specs[0].traverse(key=id) if x.name == "mpich"]) == 1
+
+    # A change in the configuration invalidates the cache
+    spack.config.set("packages:mpileaks", {"variants": "+opt"})
+    with pytest.raises(AssertionError, match="read from the cache"):
+        asp.Solver().solve([spack.spec.Spec("mpileaks")])
+
+
+@pytest.mark.only_clingo("Original concretizer cannot concretize in rounds")
+def test_package_facts_are_reused_across_rounds(mutable_config, mock_packages, monkeypatch):
+    recorded = []
+    record = asp.SpackSolverSetup._record_recipe_rules
+
+    def _record(self, pkg):
+        recorded.append(pkg)
+        return record(self, pkg)
+
+    monkeypatch.setattr(asp.SpackSolverSetup, "_record_recipe_rules", _record)
+    solver = asp.Solver()
+    solver.reuse = False
+    specs = [spack.spec.Spec(x) for x in ("hdf5^zmpi", "mpich")]
+    results = list(solver.solve_in_rounds(specs, profile=True))
+
+    assert len(results) == 2
+    assert recorded and len(recorded) == len(set(recorded))
+
+    # The disk cache is disabled, so facts of the second round come from memory
+    second_round = results[1].profile["package_facts"]
+    assert second_round["reused"] > 0 and "cached" not in second_round
+
+
+def test_result_cache_key_depends_on_solver(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Tests that cached results are not reused after an update of the logic program, or of
+    clingo, even if the version of Spack is the same."""
+    specs = [spack.spec.Spec("mpileaks")]
+    key = asp.Solver._result_cache_key(specs, [], False, False)
+    assert asp.Solver._result_cache_key(specs, [], False, False) == key
+
+    programs = asp._logic_programs
+    extra_program = tmp_path / "extra.lp"
+    extra_program.write_text("% an updated rule\n")
+    with monkeypatch.context() as m:
+        m.setattr(
+            asp,
+            "_logic_programs",
+            lambda concretize_everything: programs(concretize_everything) + [str(extra_program)],
+        )
+        assert asp.Solver._result_cache_key(specs, [], False, False) != key
+
+    with monkeypatch.context() as m:
+        m.setattr(asp, "clingo", lambda: types.SimpleNamespace(__version__="0.0.0"))
+        assert asp.Solver._result_cache_key(specs, [], False, False) != key
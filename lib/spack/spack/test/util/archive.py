@@ -5,13 +5,20 @@
 
 import gzip
 import hashlib
+import io
 import os
 import shutil
 import tarfile
 from pathlib import Path, PurePath
 
+import pytest
+
 import spack.util.crypto
-from spack.util.archive import gzip_compressed_tarfile, reproducible_tarfile_from_prefix
+from spack.util.archive import (
+    ParallelGzipWriter,
+    gzip_compressed_tarfile,
+    reproducible_tarfile_from_prefix,
+)
 
 
 def test_gzip_compressed_tarball_is_reproducible(tmpdir):
@@ -155,3 +162,42 @@ def test_gzip_compressed_tarball_is_reproducible(tmpdir):
                 == spack.util.crypto.checksum_stream(hashlib.sha256, f)
                 == spack.util.crypto.checksum_stream(hashlib.sha256, g)
             )
+
+
+@pytest.mark.parametrize("size", [0, 1, 4096, 3 * 4096 + 17])
+def test_parallel_gzip_writer(size):
+    """Test that parallel compression is valid gzip, and does not depend on the number of jobs"""
+    data = (b"spack " * size)[:size] + os.urandom(size)
+    outputs = []
+    for jobs in (1, 4):
+        result = io.BytesIO()
+        writer = ParallelGzipWriter(result, jobs=jobs, block_size=4096)
+        for i in range(0, len(data), 1000):
+            writer.write(data[i : i + 1000])
+        assert writer.tell() == len(data)
+        writer.close()
+        writer.close()
+        outputs.append(result.getvalue())
+
+    assert outputs[0] == outputs[1]
+    assert gzip.decompress(outputs[0]) == data
+
+
+def test_gzip_compressed_tarball_with_jobs(tmp_path):
+    """Test that the checksums of a tarball compressed in parallel are correct"""
+    (tmp_path / "root").mkdir()
+    (tmp_path / "root" / "file").write_bytes(os.urandom(1024 * 1024))
+    for jobs in (1, 4):
+        tarball = str(tmp_path / f"{jobs}.tar.gz")
+        with gzip_compressed_tarfile(tarball, jobs=jobs) as (tar, gzip_checksum, tar_checksum):
+            reproducible_tarfile_from_prefix(tar, str(tmp_path / "root"))
+
+        assert gzip_checksum.hexdigest() == spack.util.crypto.checksum(hashlib.sha256, tarball)
+        with gzip.open(tarball, "rb") as f:
+            assert tar_checksum.hexdigest() == spack.util.crypto.checksum_stream(hashlib.sha256, f)
+        with tarfile.open(tarball, "r:gz") as tar:
+            assert any(name.endswith("root/file") for name in tar.getnames())
+
+    assert spack.util.crypto.checksum(
+        hashlib.sha256, str(tmp_path / "1.tar.gz")
+    ) == spack.util.crypto.checksum(hashlib.sha256, str(tmp_path / "4.tar.gz"))
@@ -0,0 +1,117 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import functools
+import operator
+
+import pytest
+
+import spack.deptypes as dt
+import spack.repo
+from spack.spec import Spec
+from spack.util.package_metadata import package_metadata
+
+
+def test_metadata_matches_package_classes(mock_packages):
+    """Tests that the static metadata of mock packages is the same as the one of their classes"""
+    repo = mock_packages.repos[0]
+    static = 0
+    for name in repo.all_package_names(include_virtuals=True):
+        metadata = repo.package_metadata(name)
+        if metadata is None:
+            continue
+
+        static += 1
+        pkg_cls = repo.get_pkg_class(name)
+        assert metadata.tags == getattr(pkg_cls, "tags", [])
+        assert metadata.provided == pkg_cls.provided
+        assert metadata.dependencies == {
+            name: functools.reduce(operator.or_, (dep.depflag for dep in deps))
+            for name, deps in pkg_cls.dependencies_by_name().items()
+        }
+        assert metadata.versions == list(pkg_cls.versions)
+        assert metadata.variants == set(pkg_cls.variants)
+        assert metadata.patches or not pkg_cls.patches
+
+    # Most packages don't need to be imported
+    assert static > 0.8 * len(repo.all_package_names(include_virtuals=True))
+
+
+def test_metadata_of_declarative_package(mock_packages):
+    metadata = package_metadata(
+        "foo-bar",
+        '''
+class FooBar(AutotoolsPackage):
+    """Docstring"""
+
+    homepage = "https://example.com"
+    tags = ["Tag"]
+    executables = ["^foo$"]
+
+    version("2.0", sha256="abcd")
+    version("1.0", sha256="abcd")
+
+    variant("shared", default=True, description="Build shared libraries")
+    provides("mpi@:3", "blas", when="@2:")
+
+    depends_on("zlib@1.2:", type="link")
+    depends_on("never", when=False)
+
+    with when("+shared"):
+        depends_on("libelf")
+
+    with default_args(type="run"):
+        depends_on("zlib", when="@2:")
+        depends_on("cmake", type="build")
+
+    @when("@2:")
+    def configure_args(self):
+        return []
+''',
+    )
+    assert metadata.tags == ["Tag", "detectable"]
+    assert metadata.provided == {Spec("foo-bar@2:"): {Spec("mpi@:3"), Spec("blas")}}
+    assert metadata.dependencies["zlib"] == dt.LINK | dt.RUN
+    assert metadata.dependencies["libelf"] == dt.BUILD | dt.LINK
+    assert metadata.dependencies["cmake"] == dt.BUILD
+    assert "never" not in metadata.dependencies
+    assert [str(v) for v in metadata.versions] == ["2.0", "1.0"]
+    assert {"shared", "build_system"} <= metadata.variants
+    assert not metadata.patches
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # Directives in loops or conditionals
+        'for v in ("1.0", "2.0"):\n        version(v)',
+        'if True:\n        depends_on("zlib")',
+        # Non-literal arguments
+        "depends_on(DEPENDENCY)",
+        'depends_on("zlib", when=sys.platform == "linux")',
+        "tags = TAGS",
+        'depends_on("zlib", **ARGS)',
+        'with default_args(**ARGS):\n        depends_on("zlib")',
+        # Virtuals provided under a context
+        'with when("+mpi"):\n        provides("mpi")',
+        # Helper functions, which may call directives
+        "add_dependencies()",
+    ],
+)
+def test_metadata_of_dynamic_package(body, mock_packages):
+    assert package_metadata("foo", f"class Foo(Package):\n    {body}\n") is None
+
+
+def test_metadata_requires_known_base_classes(mock_packages):
+    assert package_metadata("foo", "class Foo(Package):\n    pass\n") is not None
+    assert package_metadata("foo", "class Foo(Bar):\n    pass\n") is None
+    assert package_metadata("foo", "class Bar(Package):\n    pass\n") is None
+
+
+def test_package_attributes_require_import(mutable_config, mock_packages):
+    repo = spack.repo.PATH.repos[0]
+    assert repo.package_metadata("libelf") is not None
+    mutable_config.set("packages", {"libelf": {"package_attributes": {"tags": ["x"]}}})
+    assert repo.package_metadata("libelf") is None
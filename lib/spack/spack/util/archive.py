@@ -2,15 +2,19 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import collections
+import concurrent.futures
 import errno
 import hashlib
 import io
 import os
 import pathlib
+import struct
 import tarfile
+import zlib
 from contextlib import closing, contextmanager
 from gzip import GzipFile
-from typing import Callable, Dict, Tuple
+from typing import Callable, Deque, Dict, Optional, Tuple
 
 from llnl.util.symlink import readlink
 
@@ -95,17 +99,123 @@ def readline(self, size=-1):
         raise OSError(errno.EBADF, "readline() on write-only object")
 
 
+def _compress_block(data: bytes, dictionary: bytes, compresslevel: int, last: bool) -> bytes:
+    """Compress a block of data to raw deflate data, which ends on a byte boundary"""
+    args = (compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, 0)
+    compressor = zlib.compressobj(*args, dictionary) if dictionary else zlib.compressobj(*args)
+    return compressor.compress(data) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    )
+
+
+class ParallelGzipWriter(io.BufferedIOBase):
+    """Write-only file object that compresses data to gzip format in a pool of threads, like
+    ``pigz``.
+
+    Data is split into blocks of fixed size, which are compressed concurrently, using the end
+    of the previous block as a preset dictionary. Each compressed block ends on a byte boundary,
+    so that the blocks form a single deflate stream, in a single gzip member. The output only
+    depends on the data, the compression level and the block size, not on the number of
+    threads. Like ``gzip --no-name``, the header has no file name and a zero mtime.
+    """
+
+    #: Size of the deflate window, and of the dictionary used for each block
+    window_size = 32 * 1024
+
+    def __init__(
+        self, fileobj, compresslevel: int = 6, jobs: int = 1, block_size: int = 128 * 1024
+    ):
+        self.fileobj = fileobj
+        self.compresslevel = compresslevel
+        self.block_size = block_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+        # Limit the memory used by blocks waiting to be written
+        self.max_pending = 2 * jobs
+        self.pending: Deque[concurrent.futures.Future] = collections.deque()
+        self.buffer = bytearray()
+        self.dictionary = b""
+        self.crc = zlib.crc32(b"")
+        self.size = 0
+
+        # Same header as GzipFile(filename="", mtime=0)
+        if compresslevel == 9:
+            xfl = b"\002"
+        elif compresslevel == 1:
+            xfl = b"\004"
+        else:
+            xfl = b"\000"
+        self.fileobj.write(b"\037\213\010\000" + struct.pack("<L", 0) + xfl + b"\377")
+
+    def _submit(self, data: bytes, last: bool = False) -> None:
+        self.pending.append(
+            self.executor.submit(_compress_block, data, self.dictionary, self.compresslevel, last)
+        )
+        self.dictionary = data[-self.window_size :]
+        while len(self.pending) > self.max_pending:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def write(self, data):
+        if self.fileobj is None:
+            raise ValueError("write() on closed file")
+        data = memoryview(data).cast("B")
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += data.nbytes
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            block = bytes(self.buffer[: self.block_size])
+            del self.buffer[: self.block_size]
+            self._submit(block)
+        return data.nbytes
+
+    @property
+    def closed(self):
+        return self.fileobj is None
+
+    def close(self):
+        if self.fileobj is None:
+            return
+        try:
+            self._submit(bytes(self.buffer), last=True)
+            self.buffer.clear()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+            self.fileobj.write(struct.pack("<LL", self.crc & 0xFFFFFFFF, self.size & 0xFFFFFFFF))
+        finally:
+            self.executor.shutdown()
+            self.fileobj = None
+
+    def flush(self):
+        self.fileobj.flush()
+
+    def readable(self):
+        return False
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def tell(self):
+        return self.size
+
+
 @contextmanager
-def gzip_compressed_tarfile(path):
+def gzip_compressed_tarfile(path, jobs: Optional[int] = None):
     """Create a reproducible, gzip compressed tarfile, and keep track of shasums of both the
     compressed and uncompressed tarfile. Reproduciblity is achived by normalizing the gzip header
     (no file name and zero mtime).
 
+    If ``jobs`` is given, data is compressed in blocks by that many threads, see
+    ``ParallelGzipWriter``. The output is then the same for any number of jobs, but differs
+    from the output of serial compression.
+
     Yields a tuple of the following:
         tarfile.TarFile: tarfile object
         ChecksumWriter: checksum of the gzip compressed tarfile
         ChecksumWriter: checksum of the uncompressed tarfile
     """
+
     # Create gzip compressed tarball of the install prefix
     # 1) Use explicit empty filename and mtime 0 for gzip header reproducibility.
     #    If the filename="" is dropped, Python will use fileobj.name instead.
@@ -114,8 +224,13 @@ def gzip_compressed_tarfile(path):
     # compresslevel=6 gzip default: llvm takes 4mins, roughly 2.1GB
     # compresslevel=9 python default: llvm takes 12mins, roughly 2.1GB
     # So we follow gzip.
+    def compressor(fileobj):
+        if jobs is None:
+            return GzipFile(filename="", mode="wb", compresslevel=6, mtime=0, fileobj=fileobj)
+        return ParallelGzipWriter(fileobj, compresslevel=6, jobs=jobs)
+
     with open(path, "wb") as f, ChecksumWriter(f) as gzip_checksum, closing(
-        GzipFile(filename="", mode="wb", compresslevel=6, mtime=0, fileobj=gzip_checksum)
+        compressor(gzip_checksum)
     ) as gzip_file, ChecksumWriter(gzip_file) as tarfile_checksum, tarfile.TarFile(
         name="", mode="w", fileobj=tarfile_checksum
     ) as tar:
@@ -0,0 +1,295 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Read the metadata of a package from the AST of its ``package.py``, without importing it.
+
+Only packages that use directives in the common, declarative way are supported: directives
+at the top-level of the class body, or in ``with when(...)`` and ``with default_args(...)``
+blocks, with literal arguments. For any other package, ``package_metadata`` returns None,
+and the package has to be imported.
+"""
+import ast
+import inspect
+import types
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+import llnl.util.lang
+
+import spack.deptypes as dt
+import spack.directives
+import spack.error
+import spack.spec
+import spack.util.naming
+import spack.version
+
+
+class PackageMetadata(NamedTuple):
+    #: Tags of the package, as in ``PackageBase.tags``
+    tags: List[str]
+    #: Virtuals provided by the package, as in ``PackageBase.provided``
+    provided: Dict["spack.spec.Spec", Set["spack.spec.Spec"]]
+    #: Possible dependencies of the package, mapped to the union of their dependency types
+    dependencies: Dict[str, dt.DepFlag]
+    #: Declared versions of the package
+    versions: List["spack.version.StandardVersion"]
+    #: Names of the variants of the package
+    variants: Set[str]
+    #: Whether the package patches itself or any of its dependencies
+    patches: bool
+
+
+class _DynamicPackage(Exception):
+    """Raised when a package cannot be read statically"""
+
+
+def _literal(node: ast.AST) -> Any:
+    """Return the value of a literal node, or raise if the node is not a literal"""
+    try:
+        value = ast.literal_eval(node)
+    except ValueError as e:
+        raise _DynamicPackage(ast.dump(node)) from e
+    return list(value) if isinstance(value, tuple) else value
+
+
+def _keywords(call: ast.Call) -> Dict[str, Any]:
+    """Return the literal keyword arguments of a call, or raise if any is ``**kwargs``"""
+    result = {}
+    for kw in call.keywords:
+        if kw.arg is None:
+            raise _DynamicPackage(ast.dump(call))
+        result[kw.arg] = _literal(kw.value)
+    return result
+
+
+class _DirectivesVisitor:
+    """Collects the metadata of the directives in the body of a package class"""
+
+    #: Calls allowed as context managers around directives
+    contexts = ("when", "default_args")
+
+    def __init__(self, pkg_name: str, provided: Dict["spack.spec.Spec", Set["spack.spec.Spec"]]):
+        self.pkg_name = pkg_name
+        self.tags: Optional[List[str]] = None
+        self.detectable = False
+        self.provided = provided
+        self.dependencies: Dict[str, dt.DepFlag] = {}
+        self.default_args: List[Dict[str, Any]] = []
+        self.versions: Dict["spack.version.StandardVersion", None] = {}
+        self.variants: Set[str] = set()
+        self.patches = False
+
+    def visit_body(self, body: List[ast.stmt], in_context: bool) -> None:
+        for node in body:
+            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                self.visit_directive(node.value, in_context)
+            elif isinstance(node, ast.Expr):
+                # Docstrings, and other unused literals
+                _literal(node.value)
+            elif isinstance(node, ast.With):
+                default_args = {}
+                for item in node.items:
+                    call = item.context_expr
+                    if not (
+                        isinstance(call, ast.Call)
+                        and isinstance(call.func, ast.Name)
+                        and call.func.id in self.contexts
+                    ):
+                        raise _DynamicPackage(ast.dump(call))
+                    args = [_literal(x) for x in call.args]
+                    kwargs = _keywords(call)
+                    if call.func.id == "when" and not all(isinstance(x, str) for x in args):
+                        raise _DynamicPackage(ast.dump(call))
+                    self.patches = self.patches or "patches" in kwargs
+                    if call.func.id == "default_args":
+                        default_args.update(kwargs)
+                self.default_args.append(default_args)
+                self.visit_body(node.body, in_context=True)
+                self.default_args.pop()
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not in_context:
+                targets: List[ast.expr]
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                self.visit_assignment(targets, node.value)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self.detectable = self.detectable or node.name in ("executables", "libraries")
+            elif not isinstance(node, ast.Pass):
+                raise _DynamicPackage(ast.dump(node))
+
+    def visit_assignment(self, targets: List[ast.expr], value: Optional[ast.expr]) -> None:
+        for target in targets:
+            if not isinstance(target, ast.Name):
+                raise _DynamicPackage(ast.dump(target))
+            if target.id == "tags":
+                self.tags = _literal(value) if value is not None else None
+                if not isinstance(self.tags, list) or not all(
+                    isinstance(x, str) for x in self.tags
+                ):
+                    raise _DynamicPackage(ast.dump(target))
+            elif target.id in ("executables", "libraries"):
+                self.detectable = True
+            elif target.id == "virtual":
+                raise _DynamicPackage(ast.dump(target))
+
+        # Directives can't be called on the right-hand side of an assignment
+        for node in ast.walk(value) if value is not None else ():
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Name)
+                and node.func.id in spack.directives.directive_names
+            ):
+                raise _DynamicPackage(ast.dump(node))
+
+    def add_dependency(self, name: str, depflag: dt.DepFlag) -> None:
+        self.dependencies[name] = self.dependencies.get(name, 0) | depflag
+
+    def visit_directive(self, call: ast.Call, in_context: bool) -> None:
+        if not isinstance(call.func, ast.Name) or call.func.id not in (
+            spack.directives.directive_names
+        ):
+            raise _DynamicPackage(ast.dump(call))
+
+        name = call.func.id
+        if any(isinstance(x, ast.Starred) for x in call.args) or any(
+            kw.arg is None for kw in call.keywords
+        ):
+            raise _DynamicPackage(ast.dump(call))
+
+        # Arguments of other directives don't affect the metadata
+        if name not in ("depends_on", "extends", "provides", "version", "variant"):
+            self.patches = self.patches or name == "patch"
+            return
+
+        args = [_literal(x) for x in call.args]
+        # Like directives, keyword arguments override the ones of default_args contexts
+        kwargs: Dict[str, Any] = {}
+        for default_args in self.default_args:
+            kwargs.update(default_args)
+        kwargs.update(_keywords(call))
+        when = kwargs.get("when")
+        if not isinstance(when, (str, bool, type(None))):
+            raise _DynamicPackage(ast.dump(call))
+
+        if name == "variant":
+            self.variants.add(args[0] if args else kwargs["name"])
+
+        elif name == "version":
+            ver = args[0] if args else kwargs["ver"]
+            if not isinstance(ver, (str, int)):
+                raise _DynamicPackage(ast.dump(call))
+            version = spack.version.Version(ver)
+            if not isinstance(version, spack.version.StandardVersion):
+                raise _DynamicPackage(ast.dump(call))
+            self.versions[version] = None
+
+        elif when is False:
+            # Like directives, discard dependencies and virtuals that never apply
+            return
+
+        elif name in ("depends_on", "extends"):
+            spec = spack.spec.Spec(args[0] if args else kwargs["spec"])
+            default_type = dt.DEFAULT_TYPES if name == "depends_on" else ("build", "run")
+            self.add_dependency(spec.name, dt.canonicalize(kwargs.get("type", default_type)))
+            if name == "extends" and spec.name == "python" and self.pkg_name != "python-venv":
+                self.add_dependency("python-venv", dt.BUILD | dt.RUN)
+            self.patches = self.patches or bool(kwargs.get("patches"))
+
+        elif name == "provides":
+            # Conditions of the context would need to be merged with the ones of the directive
+            if in_context or not args or not all(isinstance(x, str) for x in args):
+                raise _DynamicPackage(ast.dump(call))
+            when_spec = spack.spec.Spec(when if isinstance(when, str) else "")
+            when_spec.name = self.pkg_name
+            provided_set = self.provided.setdefault(when_spec, set())
+            provided_set.update(spack.spec.Spec(x) for x in args)
+
+
+def _base_classes(class_def: ast.ClassDef) -> List[type]:
+    """Return the build system classes a package derives from"""
+    import spack.package  # Avoid circular dependency
+    import spack.package_base
+
+    bases = []
+    for base in class_def.bases:
+        cls = getattr(spack.package, base.id, None) if isinstance(base, ast.Name) else None
+        if not inspect.isclass(cls) or not issubclass(cls, spack.package_base.PackageBase):
+            raise _DynamicPackage(ast.dump(base))
+        if any(hasattr(cls, attr) for attr in ("tags", "executables", "libraries")):
+            raise _DynamicPackage(ast.dump(base))
+        bases.append(cls)
+    return bases
+
+
+def _execute_base_directives(pkg_name: str, bases: List[type]) -> types.SimpleNamespace:
+    """Execute the directives of the base classes on a stand-in for the package class, like
+    ``DirectiveMeta`` does for the package class."""
+    pkg = types.SimpleNamespace(name=pkg_name)
+    for name in spack.directives.DirectiveMeta._directive_dict_names:
+        setattr(pkg, name, {})
+
+    directives: List = []
+    for base in reversed(bases):
+        directives.extend(getattr(base, "_directives_to_be_executed", []))
+    try:
+        for directive in llnl.util.lang.dedupe(directives):
+            directive(pkg)
+    except Exception as e:
+        raise _DynamicPackage(str(e)) from e
+    return pkg
+
+
+def package_metadata(pkg_name: str, source: str) -> Optional[PackageMetadata]:
+    """Read the metadata of a package from the source of its ``package.py``.
+
+    Args:
+        pkg_name: name of the package
+        source: content of the ``package.py`` file
+
+    Returns:
+        The metadata of the package, or None if it cannot be determined without importing
+        the package.
+    """
+    try:
+        tree = ast.parse(source)
+        class_name = spack.util.naming.mod_to_class(pkg_name)
+        class_defs = [
+            node
+            for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == class_name
+        ]
+        if len(class_defs) != 1 or class_defs[0].keywords or class_defs[0].decorator_list:
+            return None
+
+        base = _execute_base_directives(pkg_name, _base_classes(class_defs[0]))
+        visitor = _DirectivesVisitor(pkg_name, provided=base.provided)
+        visitor.visit_body(class_defs[0].body, in_context=False)
+    except (
+        _DynamicPackage,
+        SyntaxError,
+        KeyError,
+        IndexError,
+        ValueError,
+        spack.error.SpackError,
+    ):
+        return None
+
+    tags = visitor.tags or []
+    if visitor.detectable:
+        tags = tags + ["detectable"]
+
+    base_patches = bool(base.patches) or any(
+        dependency.patches
+        for deps_by_name in base.dependencies.values()
+        for dependency in deps_by_name.values()
+    )
+    for deps_by_name in base.dependencies.values():
+        for name, dependency in deps_by_name.items():
+            visitor.add_dependency(name, dependency.depflag)
+
+    return PackageMetadata(
+        tags=tags,
+        provided=visitor.provided,
+        dependencies=visitor.dependencies,
+        versions=list(base.versions) + [v for v in visitor.versions if v not in base.versions],
+        variants=set(base.variants) | visitor.variants,
+        patches=visitor.patches or base_patches,
+    )